@@ -0,0 +1,108 @@
+#!/usr/bin/python
+#
+# Copyright (c) 2022, Sensirion AG
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# # Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# # Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# # Neither the name of Sensirion AG nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+# (c) Copyright 2022 Sensirion AG, Switzerland
+
+# Example to stream the flow of a Sensirion LD20 at a high rate with a
+# Raspbery Pi
+#
+# Prerequisites:
+#
+# - open the command line tool
+#
+# - Enable the i2c interface on your Raspbery Pi
+# using 'sudo raspi-config'
+#
+# - Install python3 and pip3 and some tools
+# 'sudo apt-get install python3 python3-pip i2c-dev i2c-tools wget'
+#
+# - Install the smbus2 library
+# 'pip3 install smbus2'
+#
+# - Check if the sensor is recognized on the i2c bus
+# executing the command 'i2cdetect -y 1'
+# the result should look like this:
+#      0  1  2  3  4  5  6  7  8  9  a  b  c  d  e  f
+# 00:          -- -- -- -- -- 08 -- -- -- -- -- -- --
+# 10: -- -- -- -- -- -- -- -- -- -- -- -- -- -- -- --
+# 20: -- -- -- -- -- -- -- -- -- -- -- -- -- -- -- --
+#
+# - For rates above a few hundred samples per second increase the I2C
+# clock, e.g. 'dtparam=i2c_arm_baudrate=400000' in /boot/config.txt
+#
+# - Copy sensirion_crc.py, sensirion_driver.py and sensirion_ld20_stream.py
+# next to this file
+#
+# - Run the example 'python3 LD20_I2C_streaming_example.py'
+
+import time
+from smbus2 import SMBus
+from sensirion_driver import Ld20
+from sensirion_ld20_stream import Ld20Stream
+
+# I2C bus 1 on a Raspberry Pi 3B+
+# SDA on GPIO2=Pin3 and SCL on GPIO3=Pin5
+# sensor +3.3V at Pin1 and GND at Pin6
+DEVICE_BUS = 1
+
+# samples per second, the sensor updates every 0.5 ms
+RATE = 500
+
+# init I2C
+bus = SMBus(DEVICE_BUS)
+ld20 = Ld20(bus)
+
+#wait 1 s for sensor start up (> 25 ms according to datasheet)
+time.sleep(1)
+
+# start in continuous mode for H2O
+ld20.start_continuous_measurement()
+
+# wait for first measurement for 12 ms + 150 ms warm up for highest accuracy
+time.sleep(0.2)
+
+# keep the last 60 s in memory
+stream = Ld20Stream(ld20, rate=RATE, capacity=60 * RATE)
+
+for i in range(10):
+    stream.run(duration=1.0)
+    timestamps, flow, temperature = stream.latest(RATE)
+    statistics = stream.statistics()
+    print("mean flow {:.3f} ml/min, {:.0f} samples/s, {} dropped, jitter {:.3f} ms".format(
+        sum(flow) / max(1, len(flow)), statistics["achieved_rate"],
+        statistics["dropped"], statistics["jitter_std"] * 1000))
+
+# stop the measurement
+# if measurement has not been stopped,
+# sending the start command again will result in i2c error
+ld20.stop_continuous_measurement()
+
+bus.close()
@@ -0,0 +1,117 @@
+#!/usr/bin/python
+#
+# Copyright (c) 2022, Sensirion AG
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# # Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# # Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# # Neither the name of Sensirion AG nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+# (c) Copyright 2022 Sensirion AG, Switzerland
+
+# Example to checkpoint the VOC algorithm state of a Sensirion SEN55 with a
+# Raspbery Pi while the measurement is running
+#
+# Prerequisites:
+#
+# - open the command line tool
+#
+# - Enable the i2c interface on your Raspbery Pi
+# using 'sudo raspi-config'
+#
+# - Install python3 and pip3 and some tools
+# 'sudo apt-get install python3 python3-pip i2c-dev i2c-tools wget'
+#
+# - Install the smbus2 library
+# 'pip3 install smbus2'
+#
+# - Check if the sensor is recognized on the i2c bus
+# executing the command 'i2cdetect -y 1'
+# the result should look like this:
+#      0  1  2  3  4  5  6  7  8  9  a  b  c  d  e  f
+# 00:          -- -- -- -- -- -- -- -- -- -- -- -- --
+# 10: -- -- -- -- -- -- -- -- -- -- -- -- -- -- -- --
+# 20: -- -- -- -- -- -- -- -- -- -- -- -- -- -- -- --
+# 30: -- -- -- -- -- -- -- -- -- -- -- -- -- -- -- --
+# 40: -- -- -- -- -- -- -- -- -- -- -- -- -- -- -- --
+# 50: -- -- -- -- -- -- -- -- -- -- -- -- -- -- -- --
+# 60: -- -- -- -- -- -- -- -- -- 69 -- -- -- -- -- --
+# 70: -- -- -- -- -- -- -- --
+#
+# - Copy sensirion_crc.py, sensirion_driver.py, sensirion_profile.py and
+# sensirion_voc_checkpoint.py next to this file
+#
+# - Run the example 'python3 SEN5x_I2C_VOC_checkpoint_example.py'
+
+import threading
+import time
+from smbus2 import SMBus
+from sensirion_driver import Sen5x
+from sensirion_voc_checkpoint import VocCheckpointer
+
+# I2C bus 1 on a Raspberry Pi 3B+
+# SDA on GPIO2=Pin3 and SCL on GPIO3=Pin5
+# sensor +3.3V at Pin1 and GND at Pin6
+DEVICE_BUS = 1
+
+# directory of the checkpoint files and seconds between two checkpoints
+CHECKPOINT_DIRECTORY = "voc_state"
+CHECKPOINT_INTERVAL = 600
+
+# init I2C
+bus = SMBus(DEVICE_BUS)
+sen5x = Sen5x(bus)
+
+# wait 1 s for sensor start up (> 1000 ms according to datasheet)
+time.sleep(1)
+
+# the checkpointer and the measurement loop share the bus
+lock = threading.Lock()
+checkpointer = VocCheckpointer(sen5x, CHECKPOINT_DIRECTORY,
+                               CHECKPOINT_INTERVAL, lock)
+
+with lock:
+    sen5x.start_measurement()
+checkpointer.start()
+
+# wait for first measurement to be finished
+time.sleep(2)
+
+print("voc \t nox \t checkpoints")
+try:
+    for i in range(2700):
+        with lock:
+            values = Sen5x.decode_measured_values(sen5x.read_measured_values())
+        print("{:.0f} \t {:.0f} \t {}".format(values[6], values[7], checkpointer.checkpoints))
+
+        # wait 1 s for next measurement
+        time.sleep(1)
+finally:
+    # write a last checkpoint before stopping the measurement
+    checkpointer.stop()
+    print("Last checkpoint written for " + checkpointer.serial)
+    with lock:
+        sen5x.stop_measurement()
+    bus.close()
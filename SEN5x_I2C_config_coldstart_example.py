@@ -62,39 +62,15 @@
 # - Retrieve this example file from github
 # 'wget -L URL'
 #
+# - Copy sensirion_crc.py next to this file, it is retrieved the same way
+#
 # - Run the example 'python3 SEN5x_I2C_minimal_example.py.py'
 
 import time
 from smbus2 import SMBus, i2c_msg
+from sensirion_crc import CrcCalculator
 from struct import unpack
 
-def CrcCalculator(data):
-    """
-        Constructs a calculator object with the given CRC parameters.
-        :param int width:
-            Number of bits of the CRC (e.g. 8 for CRC-8).
-        :param int polynomial:
-            The polynomial of the CRC, without leading '1' (e.g. 0x31 for the
-            polynomial x^8 + x^5 + x^4 + 1).
-        :param int init_value:
-            Initialization value of the CRC. Defaults to 0.
-        :param int final_xor:
-            Final XOR value of the CRC. Defaults to 0.
-    """
-    width = 8
-    polynomial = 0x31
-    final_xor = 0x00
-    crc = 0xFF
-    for value in data:
-        crc ^= value
-        for i in range(width):
-            if crc & (1 << (width - 1)):
-                crc = (crc << 1) ^ polynomial
-            else:
-                crc = crc << 1
-            crc &= (1 << width) - 1
-    return crc ^ final_xor
-
 # I2C bus 1 on a Raspberry Pi 3B+
 # SDA on GPIO2=Pin3 and SCL on GPIO3=Pin5
 # sensor +3.3V at Pin1 and GND at Pin6
@@ -0,0 +1,109 @@
+#!/usr/bin/python
+#
+# Copyright (c) 2022, Sensirion AG
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# # Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# # Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# # Neither the name of Sensirion AG nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+# (c) Copyright 2022 Sensirion AG, Switzerland
+
+# Example to configure a Sensirion SEN5x from a single profile with a
+# Raspbery Pi
+#
+# Prerequisites:
+#
+# - open the command line tool
+#
+# - Enable the i2c interface on your Raspbery Pi
+# using 'sudo raspi-config'
+#
+# - Install python3 and pip3 and some tools
+# 'sudo apt-get install python3 python3-pip i2c-dev i2c-tools wget'
+#
+# - Install the smbus2 library
+# 'pip3 install smbus2'
+#
+# - Check if the sensor is recognized on the i2c bus
+# executing the command 'i2cdetect -y 1'
+# the result should look like this:
+#      0  1  2  3  4  5  6  7  8  9  a  b  c  d  e  f
+# 00:          -- -- -- -- -- -- -- -- -- -- -- -- --
+# 10: -- -- -- -- -- -- -- -- -- -- -- -- -- -- -- --
+# 20: -- -- -- -- -- -- -- -- -- -- -- -- -- -- -- --
+# 30: -- -- -- -- -- -- -- -- -- -- -- -- -- -- -- --
+# 40: -- -- -- -- -- -- -- -- -- -- -- -- -- -- -- --
+# 50: -- -- -- -- -- -- -- -- -- -- -- -- -- -- -- --
+# 60: -- -- -- -- -- -- -- -- -- 69 -- -- -- -- -- --
+# 70: -- -- -- -- -- -- -- --
+#
+# - Copy sensirion_crc.py, sensirion_driver.py and sensirion_profile.py
+# next to this file
+#
+# - Run the example 'python3 SEN5x_I2C_config_profile_example.py'
+
+import time
+from smbus2 import SMBus
+from sensirion_driver import Sen5x
+from sensirion_profile import apply_profile
+
+# I2C bus 1 on a Raspberry Pi 3B+
+# SDA on GPIO2=Pin3 and SCL on GPIO3=Pin5
+# sensor +3.3V at Pin1 and GND at Pin6
+DEVICE_BUS = 1
+
+# the settings of the single configuration examples in one profile,
+# raw values according to the datasheet
+PROFILE = {
+    # T offset -5 degC (* 200), slope 0.01 (* 10000), time constant 10 min
+    "temperature_compensation": {"offset": -1000, "slope": 100,
+                                 "time_constant": 600},
+    "voc_tuning": {"index_offset": 250, "learning_time_offset_hours": 6,
+                   "learning_time_gain_hours": 6, "gating_max_duration": 60,
+                   "std_initial": 60, "gain_factor": 200},
+    "nox_tuning": {"index_offset": 100, "learning_time_offset_hours": 6,
+                   "gating_max_duration": 1500, "gain_factor": 250},
+    "rht_acceleration_mode": {"mode": 2},
+}
+
+# init I2C
+bus = SMBus(DEVICE_BUS)
+sen5x = Sen5x(bus)
+
+# wait 1 s for sensor start up (> 1000 ms according to datasheet)
+time.sleep(1)
+
+# the registers can only be written in idle mode
+result = apply_profile(sen5x, PROFILE)
+for name, values in result.before.items():
+    print("Present {}: {}".format(name, values))
+if not result.changed:
+    print("Sensor already matches the profile")
+for name, values in result.written.items():
+    print("New {}: {}".format(name, values))
+print("{} register reads, {} register writes".format(result.reads, result.writes))
+
+bus.close()
@@ -0,0 +1,114 @@
+#!/usr/bin/python
+#
+# Copyright (c) 2022, Sensirion AG
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# # Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# # Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# # Neither the name of Sensirion AG nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+# (c) Copyright 2022 Sensirion AG, Switzerland
+
+# Example to measure PM with a Sensirion SEN55 only while it is needed,
+# the fan and the laser stay off while the particulate readings are stable
+#
+# Prerequisites:
+#
+# - open the command line tool
+#
+# - Enable the i2c interface on your Raspbery Pi
+# using 'sudo raspi-config'
+#
+# - Install python3 and pip3 and some tools
+# 'sudo apt-get install python3 python3-pip i2c-dev i2c-tools wget'
+#
+# - Install the smbus2 library
+# 'pip3 install smbus2'
+#
+# - Check if the sensor is recognized on the i2c bus
+# executing the command 'i2cdetect -y 1'
+# the result should look like this:
+#      0  1  2  3  4  5  6  7  8  9  a  b  c  d  e  f
+# 00:          -- -- -- -- -- -- -- -- -- -- -- -- --
+# 10: -- -- -- -- -- -- -- -- -- -- -- -- -- -- -- --
+# 20: -- -- -- -- -- -- -- -- -- -- -- -- -- -- -- --
+# 30: -- -- -- -- -- -- -- -- -- -- -- -- -- -- -- --
+# 40: -- -- -- -- -- -- -- -- -- -- -- -- -- -- -- --
+# 50: -- -- -- -- -- -- -- -- -- -- -- -- -- -- -- --
+# 60: -- -- -- -- -- -- -- -- -- 69 -- -- -- -- -- --
+# 70: -- -- -- -- -- -- -- --
+#
+# - Copy sensirion_crc.py, sensirion_driver.py and sensirion_duty_cycle.py
+# next to this file
+#
+# - Run the example 'python3 SEN5x_I2C_duty_cycle_example.py'
+
+import math
+import time
+from smbus2 import SMBus
+from sensirion_driver import Sen5x
+from sensirion_duty_cycle import DutyCycleController
+
+# I2C bus 1 on a Raspberry Pi 3B+
+# SDA on GPIO2=Pin3 and SCL on GPIO3=Pin5
+# sensor +3.3V at Pin1 and GND at Pin6
+DEVICE_BUS = 1
+
+# init I2C
+bus = SMBus(DEVICE_BUS)
+sen5x = Sen5x(bus)
+
+# wait 1 s for sensor start up (> 1000 ms according to datasheet)
+time.sleep(1)
+
+# measure PM at least every 15 min, read every 5 s while it is off
+controller = DutyCycleController(sen5x, period=1.0, gas_only_period=5.0,
+                                 max_gas_only_time=900.0)
+
+
+def print_sample(controller, values, timestamp):
+    pm1p0, pm2p5, pm4p0, pm10p0, humidity, temperature, voc, nox = values
+    if math.isnan(pm2p5) and controller.last_pm is not None:
+        # show the last settled PM values while the fan is off
+        pm1p0, pm2p5, pm4p0, pm10p0 = controller.last_pm
+    print("{} \t {:.2f} \t {:.2f} \t {:.2f} \t {:.2f} \t {:.0f} \t {:.0f} \t {:.2f} \t\t {:.2f}".format(
+        controller.mode, pm1p0, pm2p5, pm4p0, pm10p0, voc, nox, temperature, humidity))
+
+
+# repeat read out of sensor data for one hour
+print("mode \t pm1p0 \t pm2p5 \t pm4p0 \t pm10p0\t voc \t nox \t temperature \t humidity")
+controller.run(duration=3600, callback=print_sample)
+
+statistics = controller.statistics()
+print("PM measured {:.0f} % of the time, {:.1f} switches per hour {}".format(
+    statistics["full_share"] * 100, statistics["switches_per_hour"], statistics["reasons"]))
+print("Energy {:.3f} Wh per hour instead of {:.3f} Wh always on ({:.0f} % saved)".format(
+    statistics["energy_wh_per_hour"], statistics["always_on_energy_wh_per_hour"],
+    statistics["energy_saving"] * 100))
+print("Bus load {:.0f} bytes per hour instead of {:.0f} bytes always on".format(
+    statistics["bus_bytes_per_hour"], statistics["always_on_bus_bytes_per_hour"]))
+
+sen5x.stop_measurement()
+bus.close()
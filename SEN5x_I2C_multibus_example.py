@@ -0,0 +1,109 @@
+#!/usr/bin/python
+#
+# Copyright (c) 2022, Sensirion AG
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# # Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# # Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# # Neither the name of Sensirion AG nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+# (c) Copyright 2022 Sensirion AG, Switzerland
+
+# Example to read SEN55 sensors on several I2C buses in parallel, e.g. on a
+# Compute Module 4 or Raspberry Pi 5
+#
+# Prerequisites:
+#
+# - open the command line tool
+#
+# - Enable the i2c interface on your Raspbery Pi
+# using 'sudo raspi-config'
+#
+# - Install python3 and pip3 and some tools
+# 'sudo apt-get install python3 python3-pip i2c-dev i2c-tools wget'
+#
+# - Install the smbus2 library
+# 'pip3 install smbus2'
+#
+# - Check if the sensor is recognized on the i2c bus
+# executing the command 'i2cdetect -y 1'
+# the result should look like this:
+#      0  1  2  3  4  5  6  7  8  9  a  b  c  d  e  f
+# 00:          -- -- -- -- -- -- -- -- -- -- -- -- --
+# 10: -- -- -- -- -- -- -- -- -- -- -- -- -- -- -- --
+# 20: -- -- -- -- -- -- -- -- -- -- -- -- -- -- -- --
+# 30: -- -- -- -- -- -- -- -- -- -- -- -- -- -- -- --
+# 40: -- -- -- -- -- -- -- -- -- -- -- -- -- -- -- --
+# 50: -- -- -- -- -- -- -- -- -- -- -- -- -- -- -- --
+# 60: -- -- -- -- -- -- -- -- -- 69 -- -- -- -- -- --
+# 70: -- -- -- -- -- -- -- --
+#
+# - Enable the additional i2c buses, e.g. with 'dtoverlay=i2c3' and
+# 'dtoverlay=i2c4' in /boot/config.txt, and connect one sensor to each bus
+#
+# - Copy sensirion_crc.py, sensirion_driver.py, sensirion_scheduler.py and
+# sensirion_multibus.py next to this file
+#
+# - Run the example 'python3 SEN5x_I2C_multibus_example.py'
+
+import time
+from smbus2 import SMBus
+from sensirion_driver import Sen5x
+from sensirion_multibus import ParallelAcquisition
+
+# I2C buses, N of /dev/i2c-N
+DEVICE_BUSES = [1, 3, 4]
+
+acquisition = ParallelAcquisition(SMBus, queue_size=1000)
+entries = [acquisition.add(number, Sen5x, period=1.0, offset=2.0)
+           for number in DEVICE_BUSES]
+
+# wait 1 s for sensor start up (> 1000 ms according to datasheet)
+time.sleep(1)
+
+for entry in entries:
+    entry.device.start_measurement()
+
+# the workers read the buses, this loop only consumes the samples
+acquisition.start(duration=60)
+print("bus \t pm2p5 \t voc \t temperature \t humidity")
+while acquisition.running() or acquisition.queue.qsize():
+    sample = acquisition.get(timeout=0.5)
+    if sample is None:
+        continue
+    values = Sen5x.decode_measured_values(sample.words)
+    print("{} \t {:.2f} \t {:.0f} \t {:.2f} \t\t {:.2f}".format(
+        sample.bus, values[1], values[6], values[5], values[4]))
+
+statistics = acquisition.statistics()
+for number, bus in statistics["buses"].items():
+    print("Bus {}: {:.2f} samples/s, {} dropped, {} missed, max queue depth {}".format(
+        number, bus["rate"], bus["dropped"], bus["missed"], bus["max_queue_depth"]))
+print("Total: {:.2f} samples/s".format(statistics["rate"]))
+
+for entry in entries:
+    entry.device.stop_measurement()
+for worker in acquisition.workers.values():
+    worker.bus.close()
@@ -0,0 +1,115 @@
+#!/usr/bin/python
+#
+# Copyright (c) 2022, Sensirion AG
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# # Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# # Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# # Neither the name of Sensirion AG nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+# (c) Copyright 2022 Sensirion AG, Switzerland
+
+# Example to read several Sensirion SEN55 behind TCA9548A I2C multiplexers
+# with a Raspbery Pi
+#
+# Prerequisites:
+#
+# - open the command line tool
+#
+# - Enable the i2c interface on your Raspbery Pi
+# using 'sudo raspi-config'
+#
+# - Install python3 and pip3 and some tools
+# 'sudo apt-get install python3 python3-pip i2c-dev i2c-tools wget'
+#
+# - Install the smbus2 library
+# 'pip3 install smbus2'
+#
+# - Check if the sensor is recognized on the i2c bus
+# executing the command 'i2cdetect -y 1'
+# the result should look like this:
+#      0  1  2  3  4  5  6  7  8  9  a  b  c  d  e  f
+# 00:          -- -- -- -- -- -- -- -- -- -- -- -- --
+# 10: -- -- -- -- -- -- -- -- -- -- -- -- -- -- -- --
+# 20: -- -- -- -- -- -- -- -- -- -- -- -- -- -- -- --
+# 30: -- -- -- -- -- -- -- -- -- -- -- -- -- -- -- --
+# 40: -- -- -- -- -- -- -- -- -- -- -- -- -- -- -- --
+# 50: -- -- -- -- -- -- -- -- -- -- -- -- -- -- -- --
+# 60: -- -- -- -- -- -- -- -- -- 69 -- -- -- -- -- --
+# 70: -- -- -- -- -- -- -- --
+#
+# - Connect the multiplexers with the address pins set to 0x70, 0x71, ...
+# and the sensors to their channels, 'i2cdetect -y 1' then shows 70, 71, ...
+# instead of 69
+#
+# - Copy sensirion_crc.py, sensirion_driver.py, sensirion_scheduler.py and
+# sensirion_mux.py next to this file
+#
+# - Run the example 'python3 SEN5x_I2C_multiplexer_example.py'
+
+from smbus2 import SMBus
+from sensirion_driver import Sen5x
+from sensirion_mux import MuxScheduler, SensorLocation
+
+# I2C bus 1 on a Raspberry Pi 3B+
+# SDA on GPIO2=Pin3 and SCL on GPIO3=Pin5
+DEVICE_BUS = 1
+
+# multiplexer addresses and used channels
+MUX_ADDRS = [0x70, 0x71]
+MUX_CHANNELS = range(8)
+
+# device address SEN55
+DEVICE_ADDR = 0x69
+
+
+def print_sample(entry, words, timestamp):
+    values = Sen5x.decode_measured_values(words)
+    print("{} \t {:.2f} \t {:.2f} \t {:.0f} \t {:.2f} \t\t {:.2f}".format(
+        entry.name, values[0], values[1], values[6], values[5], values[4]))
+
+
+scheduler = MuxScheduler(SMBus)
+for mux in MUX_ADDRS:
+    for channel in MUX_CHANNELS:
+        scheduler.add(Sen5x, SensorLocation(DEVICE_BUS, mux, channel, DEVICE_ADDR), 1.0, print_sample)
+
+scheduler.start_measurements()
+print("sensor \t\t\t\t pm1p0 \t pm2p5 \t voc \t temperature \t humidity")
+try:
+    scheduler.run(duration=60)
+finally:
+    scheduler.stop_measurements()
+
+for number, statistics in scheduler.statistics().items():
+    print("Bus {}: {} switches in {:.3f} s, {} data transfers in {:.3f} s, {:.1%} of the bus time for switching".format(
+        number, statistics["switches"], statistics["switch_time"], statistics["data_transfers"],
+        statistics["data_time"], statistics["switch_share"]))
+for entry in scheduler.devices:
+    if entry.missed or entry.io_errors or entry.crc_errors:
+        print("{}: {} missed, {} I/O errors, {} CRC errors".format(entry.name, entry.missed, entry.io_errors, entry.crc_errors))
+
+for mux_bus in scheduler.buses.values():
+    mux_bus.bus.close()
@@ -0,0 +1,118 @@
+#!/usr/bin/python
+#
+# Copyright (c) 2022, Sensirion AG
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# # Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# # Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# # Neither the name of Sensirion AG nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+# (c) Copyright 2022 Sensirion AG, Switzerland
+
+# Example to read a Sensirion SEN55 with a Raspbery Pi and retry failed
+# reads within the same measurement period
+#
+# Prerequisites:
+#
+# - open the command line tool
+#
+# - Enable the i2c interface on your Raspbery Pi
+# using 'sudo raspi-config'
+#
+# - Install python3 and pip3 and some tools
+# 'sudo apt-get install python3 python3-pip i2c-dev i2c-tools wget'
+#
+# - Install the smbus2 library
+# 'pip3 install smbus2'
+#
+# - Check if the sensor is recognized on the i2c bus
+# executing the command 'i2cdetect -y 1'
+# the result should look like this:
+#      0  1  2  3  4  5  6  7  8  9  a  b  c  d  e  f
+# 00:          -- -- -- -- -- -- -- -- -- -- -- -- --
+# 10: -- -- -- -- -- -- -- -- -- -- -- -- -- -- -- --
+# 20: -- -- -- -- -- -- -- -- -- -- -- -- -- -- -- --
+# 30: -- -- -- -- -- -- -- -- -- -- -- -- -- -- -- --
+# 40: -- -- -- -- -- -- -- -- -- -- -- -- -- -- -- --
+# 50: -- -- -- -- -- -- -- -- -- -- -- -- -- -- -- --
+# 60: -- -- -- -- -- -- -- -- -- 69 -- -- -- -- -- --
+# 70: -- -- -- -- -- -- -- --
+#
+# - Optionally install RPi.GPIO to release a stuck bus by clocking SCL
+# 'pip3 install RPi.GPIO'
+#
+# - Copy sensirion_crc.py, sensirion_driver.py, sensirion_scheduler.py and
+# sensirion_recovery.py next to this file
+#
+# - Run the example 'python3 SEN5x_I2C_recovery_example.py'
+
+import time
+from sensirion_driver import Sen5x
+from sensirion_recovery import RecoveringBus, RecoveryEngine
+from sensirion_scheduler import BusScheduler
+
+# I2C bus 1 on a Raspberry Pi 3B+
+# SDA on GPIO2=Pin3 and SCL on GPIO3=Pin5
+# sensor +3.3V at Pin1 and GND at Pin6
+DEVICE_BUS = 1
+SDA_PIN = 2
+SCL_PIN = 3
+
+
+def print_retry(retry):
+    print("{:.3f} retry {} of 0x{:04X} after {}: {}, waiting {:.0f} ms".format(
+        retry.timestamp, retry.attempt, retry.code, retry.error_class, retry.error, retry.delay * 1000))
+
+
+def print_sample(entry, words, timestamp):
+    values = Sen5x.decode_measured_values(words)
+    print("{:.3f} \t {:.2f} \t {:.2f} \t {:.0f} \t {:.2f} \t\t {:.2f}".format(
+        timestamp, values[0], values[1], values[6], values[5], values[4]))
+
+
+# init I2C, the bus is re-opened if it locks up
+bus = RecoveringBus(DEVICE_BUS, scl=SCL_PIN, sda=SDA_PIN)
+engine = RecoveryEngine(bus, on_retry=print_retry)
+sen5x = Sen5x(bus)
+
+# wait 1 s for sensor start up (> 1000 ms according to datasheet)
+time.sleep(1)
+
+# the commands outside of the scheduler are retried as well
+engine.attach(sen5x)
+sen5x.start_measurement()
+
+scheduler = BusScheduler(bus, recovery=engine)
+entry = scheduler.add(sen5x, period=1.0, callback=print_sample, offset=2.0)
+
+print("time \t\t pm1p0 \t pm2p5 \t voc \t temperature \t humidity")
+scheduler.run(duration=600)
+
+print("{} samples, {} retried, {} missed cycles".format(entry.samples, entry.retries, entry.missed))
+for name, value in engine.statistics().items():
+    print("{}: {}".format(name, value))
+
+sen5x.stop_measurement()
+bus.close()
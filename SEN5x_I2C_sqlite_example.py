@@ -0,0 +1,121 @@
+#!/usr/bin/python
+#
+# Copyright (c) 2022, Sensirion AG
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# # Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# # Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# # Neither the name of Sensirion AG nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+# (c) Copyright 2022 Sensirion AG, Switzerland
+
+# Example to store the samples of a Sensirion SEN55 and their 1 min, 15 min
+# and 1 h aggregates in a SQLite database with a Raspbery Pi
+#
+# Prerequisites:
+#
+# - open the command line tool
+#
+# - Enable the i2c interface on your Raspbery Pi
+# using 'sudo raspi-config'
+#
+# - Install python3 and pip3 and some tools
+# 'sudo apt-get install python3 python3-pip i2c-dev i2c-tools wget'
+#
+# - Install the smbus2 library
+# 'pip3 install smbus2'
+#
+# - Check if the sensor is recognized on the i2c bus
+# executing the command 'i2cdetect -y 1'
+# the result should look like this:
+#      0  1  2  3  4  5  6  7  8  9  a  b  c  d  e  f
+# 00:          -- -- -- -- -- -- -- -- -- -- -- -- --
+# 10: -- -- -- -- -- -- -- -- -- -- -- -- -- -- -- --
+# 20: -- -- -- -- -- -- -- -- -- -- -- -- -- -- -- --
+# 30: -- -- -- -- -- -- -- -- -- -- -- -- -- -- -- --
+# 40: -- -- -- -- -- -- -- -- -- -- -- -- -- -- -- --
+# 50: -- -- -- -- -- -- -- -- -- -- -- -- -- -- -- --
+# 60: -- -- -- -- -- -- -- -- -- 69 -- -- -- -- -- --
+# 70: -- -- -- -- -- -- -- --
+#
+# - Copy sensirion_crc.py, sensirion_driver.py, sensirion_records.py,
+# sensirion_aggregation.py and sensirion_sqlite.py next to this file
+#
+# - Run the example 'python3 SEN5x_I2C_sqlite_example.py', stop it with
+# Ctrl+C or 'kill', the buffered samples are written before it ends
+#
+# - Read the database with 'sqlite3 samples.db "SELECT * FROM windows"'
+
+import signal
+import sys
+import time
+from smbus2 import SMBus
+from sensirion_aggregation import RollingAggregator
+from sensirion_driver import Sen5x
+from sensirion_records import SEN5X_FULL
+from sensirion_sqlite import SqliteWriter
+
+# I2C bus 1 on a Raspberry Pi 3B+
+# SDA on GPIO2=Pin3 and SCL on GPIO3=Pin5
+# sensor +3.3V at Pin1 and GND at Pin6
+DEVICE_BUS = 1
+
+# id of the sensor in the database
+DEVICE_ID = 0
+
+# 'kill' ends the script like Ctrl+C, so the buffered samples are written
+signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+# init I2C
+bus = SMBus(DEVICE_BUS)
+sen5x = Sen5x(bus)
+
+# wait 1 s for sensor start up (> 1000 ms according to datasheet)
+time.sleep(1)
+
+sen5x.start_measurement()
+
+# commit every 300 samples or 5 min, whatever comes first
+writer = SqliteWriter("samples.db", batch_size=300, flush_interval=300)
+aggregator = RollingAggregator(on_window=writer.add_window)
+
+try:
+    next_read = time.monotonic() + 1
+    while True:
+        # read once per second on absolute deadlines
+        time.sleep(max(0, next_read - time.monotonic()))
+        next_read += 1
+        words = sen5x.read_measured_values()
+        record = SEN5X_FULL.record(time.time(), words)
+        writer.add_record(DEVICE_ID, record)
+        aggregator.add_record(record, ("pm2p5", "voc", "nox"))
+except KeyboardInterrupt:
+    pass
+finally:
+    aggregator.flush()
+    writer.close()
+    print("{} samples in {} commits".format(writer.rows, writer.commits))
+    sen5x.stop_measurement()
+    bus.close()
@@ -0,0 +1,115 @@
+#!/usr/bin/python
+#
+# Copyright (c) 2022, Sensirion AG
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# # Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# # Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# # Neither the name of Sensirion AG nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+# (c) Copyright 2022 Sensirion AG, Switzerland
+
+# Example to restart a Sensirion SEN55 with a Raspbery Pi from the last VOC
+# algorithm state checkpoint, see SEN5x_I2C_VOC_checkpoint_example.py
+#
+# The reported time to a valid VOC index is only meaningful on a real
+# sensor, the simulator returns its assumed start up times
+#
+# Prerequisites:
+#
+# - open the command line tool
+#
+# - Enable the i2c interface on your Raspbery Pi
+# using 'sudo raspi-config'
+#
+# - Install python3 and pip3 and some tools
+# 'sudo apt-get install python3 python3-pip i2c-dev i2c-tools wget'
+#
+# - Install the smbus2 library
+# 'pip3 install smbus2'
+#
+# - Check if the sensor is recognized on the i2c bus
+# executing the command 'i2cdetect -y 1'
+# the result should look like this:
+#      0  1  2  3  4  5  6  7  8  9  a  b  c  d  e  f
+# 00:          -- -- -- -- -- -- -- -- -- -- -- -- --
+# 10: -- -- -- -- -- -- -- -- -- -- -- -- -- -- -- --
+# 20: -- -- -- -- -- -- -- -- -- -- -- -- -- -- -- --
+# 30: -- -- -- -- -- -- -- -- -- -- -- -- -- -- -- --
+# 40: -- -- -- -- -- -- -- -- -- -- -- -- -- -- -- --
+# 50: -- -- -- -- -- -- -- -- -- -- -- -- -- -- -- --
+# 60: -- -- -- -- -- -- -- -- -- 69 -- -- -- -- -- --
+# 70: -- -- -- -- -- -- -- --
+#
+# - Copy sensirion_crc.py, sensirion_driver.py, sensirion_profile.py and
+# sensirion_voc_checkpoint.py next to this file
+#
+# - Run the example 'python3 SEN5x_I2C_warm_restart_example.py'
+
+import time
+from smbus2 import SMBus
+from sensirion_driver import Sen5x
+from sensirion_voc_checkpoint import warm_restart
+
+# I2C bus 1 on a Raspberry Pi 3B+
+# SDA on GPIO2=Pin3 and SCL on GPIO3=Pin5
+# sensor +3.3V at Pin1 and GND at Pin6
+DEVICE_BUS = 1
+
+# directory written by SEN5x_I2C_VOC_checkpoint_example.py
+CHECKPOINT_DIRECTORY = "voc_state"
+
+# warm start parameter, 65535 for a sensor which was only shortly off
+WARM_START = 65535
+
+# init I2C
+bus = SMBus(DEVICE_BUS)
+sen5x = Sen5x(bus)
+
+# wait 1 s for sensor start up (> 1000 ms according to datasheet)
+time.sleep(1)
+
+result = warm_restart(sen5x, CHECKPOINT_DIRECTORY, WARM_START)
+if result.restored:
+    print("Restored VOC state of {}, {:.0f} s old".format(result.serial, result.checkpoint_age))
+else:
+    print("No VOC state checkpoint of {}, cold start".format(result.serial))
+print("Idle window: {:.3f} s".format(result.idle_window))
+if result.time_to_valid_voc is None:
+    print("VOC index not valid after {} reads".format(result.polls))
+else:
+    print("Time to valid VOC index: {:.1f} s".format(result.time_to_valid_voc))
+
+# repeat read out of sensor data
+print("voc \t nox")
+for i in range(10):
+    values = Sen5x.decode_measured_values(sen5x.read_measured_values())
+    print("{:.0f} \t {:.0f}".format(values[6], values[7]))
+
+    # wait 1 s for next measurement
+    time.sleep(1)
+
+sen5x.stop_measurement()
+bus.close()
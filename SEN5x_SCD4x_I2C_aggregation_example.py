@@ -0,0 +1,125 @@
+#!/usr/bin/python
+#
+# Copyright (c) 2022, Sensirion AG
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# # Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# # Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# # Neither the name of Sensirion AG nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+# (c) Copyright 2022 Sensirion AG, Switzerland
+
+# Example to compute min, max, mean and p95 of PM2.5, VOC and CO2 over 1 min,
+# 15 min and 1 h windows while reading a Sensirion SEN5x and SCD4x with a
+# Raspbery Pi
+#
+# Prerequisites:
+#
+# - open the command line tool
+#
+# - Enable the i2c interface on your Raspbery Pi
+# using 'sudo raspi-config'
+#
+# - Install python3 and pip3 and some tools
+# 'sudo apt-get install python3 python3-pip i2c-dev i2c-tools wget'
+#
+# - Install the smbus2 library
+# 'pip3 install smbus2'
+#
+# - Check if the sensors are recognized on the i2c bus
+# executing the command 'i2cdetect -y 1'
+# the result should show the addresses 62 (SCD4x) and 69 (SEN5x)
+#
+# - Copy sensirion_crc.py, sensirion_driver.py, sensirion_scheduler.py and
+# sensirion_aggregation.py next to this file
+#
+# - Run the example 'python3 SEN5x_SCD4x_I2C_aggregation_example.py'
+
+import time
+from smbus2 import SMBus
+from sensirion_aggregation import RollingAggregator
+from sensirion_driver import Scd4x, Sen5x
+from sensirion_scheduler import BusScheduler
+
+# I2C bus 1 on a Raspberry Pi 3B+
+# SDA on GPIO2=Pin3 and SCL on GPIO3=Pin5
+# sensor +3.3V at Pin1 and GND at Pin6
+DEVICE_BUS = 1
+
+
+def print_window(summary):
+    print("{} {:>5.0f} s {:<6} n {:>4}  min {:.1f}  max {:.1f}  mean {:.1f}  p95 {:.1f}".format(
+        time.strftime("%H:%M:%S", time.localtime(summary.start)), summary.length,
+        summary.metric, summary.count, summary.min, summary.max, summary.mean,
+        summary.percentile))
+
+
+# windows start at full minutes, quarter hours and hours of the wall clock
+aggregator = RollingAggregator(windows=(60, 900, 3600), percentile=0.95,
+                               on_window=print_window)
+
+# the scheduler timestamps come from time.monotonic(), which does not jump
+# when the system time is set, shifted once to the wall clock
+EPOCH = time.time() - time.monotonic()
+
+
+def aggregate_sen5x(entry, words, timestamp):
+    pm1p0, pm2p5, pm4p0, pm10p0, humidity, temperature, voc, nox = \
+        Sen5x.decode_measured_values(words)
+    aggregator.add(EPOCH + timestamp, "pm2p5", pm2p5)
+    aggregator.add(EPOCH + timestamp, "voc", voc)
+
+
+def aggregate_scd4x(entry, words, timestamp):
+    co2, temperature, humidity = Scd4x.decode_measured_values(words)
+    aggregator.add(EPOCH + timestamp, "co2", co2)
+
+
+# init I2C, the bus is shared by both sensors
+bus = SMBus(DEVICE_BUS)
+sen5x = Sen5x(bus)
+scd4x = Scd4x(bus)
+
+# wait 1 s for sensor start up (> 1000 ms according to datasheet)
+time.sleep(1)
+
+sen5x.start_measurement()
+scd4x.start_periodic_measurement()
+
+scheduler = BusScheduler(bus)
+# SEN5x updates every 1 s, SCD4x every 5 s
+scheduler.add(sen5x, period=1.0, callback=aggregate_sen5x, offset=1.0)
+scheduler.add(scd4x, period=5.0, callback=aggregate_scd4x, offset=5.0)
+scheduler.run(duration=2 * 3600)
+
+# the windows which are still open
+for summary in aggregator.partial():
+    print("partial", summary)
+aggregator.flush()
+
+sen5x.stop_measurement()
+scd4x.stop_periodic_measurement()
+
+bus.close()
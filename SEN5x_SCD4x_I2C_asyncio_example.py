@@ -0,0 +1,98 @@
+#!/usr/bin/python
+#
+# Copyright (c) 2022, Sensirion AG
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# # Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# # Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# # Neither the name of Sensirion AG nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+# (c) Copyright 2022 Sensirion AG, Switzerland
+
+# Example to read a Sensirion SEN5x and SCD4x from one asyncio event loop
+# with a Raspbery Pi
+#
+# Prerequisites:
+#
+# - open the command line tool
+#
+# - Enable the i2c interface on your Raspbery Pi
+# using 'sudo raspi-config'
+#
+# - Install python3 and pip3 and some tools
+# 'sudo apt-get install python3 python3-pip i2c-dev i2c-tools wget'
+#
+# - Install the smbus2 library
+# 'pip3 install smbus2'
+#
+# - Check if the sensors are recognized on the i2c bus
+# executing the command 'i2cdetect -y 1'
+# the result should show the addresses 62 (SCD4x) and 69 (SEN5x)
+#
+# - Copy sensirion_crc.py, sensirion_driver.py and sensirion_async.py
+# next to this file
+#
+# - Run the example 'python3 SEN5x_SCD4x_I2C_asyncio_example.py'
+
+import asyncio
+from smbus2 import SMBus
+from sensirion_async import AsyncBus, AsyncScd4x, AsyncSen5x
+
+# I2C bus 1 on a Raspberry Pi 3B+
+# SDA on GPIO2=Pin3 and SCL on GPIO3=Pin5
+# sensor +3.3V at Pin1 and GND at Pin6
+DEVICE_BUS = 1
+
+
+async def read_sen5x(sen5x):
+    await sen5x.start_measurement()
+    # wait for first measurement to be finished
+    await asyncio.sleep(2)
+    async for values in sen5x.samples(period=1.0, count=60):
+        pm1p0, pm2p5, pm4p0, pm10p0, humidity, temperature, voc, nox = values
+        print("SEN5x  pm2p5 {:.1f}  voc {:.0f}  nox {:.0f}  temperature {:.2f}  humidity {:.2f}".format(
+            pm2p5, voc, nox, temperature, humidity))
+    await sen5x.stop_measurement()
+
+
+async def read_scd4x(scd4x):
+    await scd4x.start_measurement()
+    # wait for first measurement to be finished
+    await asyncio.sleep(5)
+    async for values in scd4x.samples(period=5.0, count=12):
+        print("SCD4x  co2 {}  temperature {:.2f}  humidity {:.2f}".format(*values))
+    await scd4x.stop_measurement()
+
+
+async def main():
+    bus = AsyncBus(SMBus(DEVICE_BUS))
+    # wait 1 s for sensor start up (> 1000 ms according to datasheet)
+    await asyncio.sleep(1)
+    await asyncio.gather(read_sen5x(AsyncSen5x(bus)), read_scd4x(AsyncScd4x(bus)))
+    bus.close()
+    bus.bus.close()
+
+
+asyncio.run(main())
@@ -0,0 +1,104 @@
+#!/usr/bin/python
+#
+# Copyright (c) 2022, Sensirion AG
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# # Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# # Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# # Neither the name of Sensirion AG nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+# (c) Copyright 2022 Sensirion AG, Switzerland
+
+# Example to export the readings of a Sensirion SEN5x, SCD4x and LD20 on the
+# same I2C bus to Prometheus or any other OpenMetrics scraper
+#
+# Prerequisites:
+#
+# - open the command line tool
+#
+# - Enable the i2c interface on your Raspbery Pi
+# using 'sudo raspi-config'
+#
+# - Install python3 and pip3 and some tools
+# 'sudo apt-get install python3 python3-pip i2c-dev i2c-tools wget'
+#
+# - Install the smbus2 library
+# 'pip3 install smbus2'
+#
+# - Check if the sensors are recognized on the i2c bus
+# executing the command 'i2cdetect -y 1'
+# the result should show the addresses 08 (LD20), 62 (SCD4x) and 69 (SEN5x)
+#
+# - Copy sensirion_crc.py, sensirion_driver.py, sensirion_scheduler.py and
+# sensirion_exporter.py next to this file
+#
+# - Run the example 'python3 SEN5x_SCD4x_LD20_I2C_exporter_example.py' and
+# scrape http://<raspberry pi>:9100/metrics, e.g. with
+# 'curl http://localhost:9100/metrics'
+
+import time
+from smbus2 import SMBus
+from sensirion_driver import Ld20, Scd4x, Sen5x
+from sensirion_exporter import MetricsExporter
+from sensirion_scheduler import BusScheduler
+
+# I2C bus 1 on a Raspberry Pi 3B+
+# SDA on GPIO2=Pin3 and SCL on GPIO3=Pin5
+# sensor +3.3V at Pin1 and GND at Pin6
+DEVICE_BUS = 1
+
+# port of the metrics endpoint
+METRICS_PORT = 9100
+
+exporter = MetricsExporter(METRICS_PORT)
+
+# init I2C, the latency of every transfer is recorded
+bus = exporter.timed_bus(SMBus(DEVICE_BUS), str(DEVICE_BUS))
+sen5x = Sen5x(bus)
+scd4x = Scd4x(bus)
+ld20 = Ld20(bus)
+
+# wait 1 s for sensor start up (> 1000 ms according to datasheet)
+time.sleep(1)
+
+sen5x.start_measurement()
+scd4x.start_periodic_measurement()
+ld20.start_continuous_measurement()
+
+scheduler = BusScheduler(bus)
+scheduler.add(sen5x, period=1.0, offset=1.0)
+scheduler.add(scd4x, period=5.0, offset=5.0)
+scheduler.add(ld20, period=0.1, offset=0.2)
+exporter.watch(scheduler)
+exporter.start()
+
+try:
+    scheduler.run()
+finally:
+    exporter.stop()
+    sen5x.stop_measurement()
+    scd4x.stop_periodic_measurement()
+    ld20.stop_continuous_measurement()
+    bus.close()
@@ -0,0 +1,127 @@
+#!/usr/bin/python
+#
+# Copyright (c) 2022, Sensirion AG
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# # Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# # Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# # Neither the name of Sensirion AG nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+# (c) Copyright 2022 Sensirion AG, Switzerland
+
+# Example to read a Sensirion SEN5x, SCD4x and LD20 on the same I2C bus
+# from a single script with a Raspbery Pi
+#
+# Prerequisites:
+#
+# - open the command line tool
+#
+# - Enable the i2c interface on your Raspbery Pi
+# using 'sudo raspi-config'
+#
+# - Install python3 and pip3 and some tools
+# 'sudo apt-get install python3 python3-pip i2c-dev i2c-tools wget'
+#
+# - Install the smbus2 library
+# 'pip3 install smbus2'
+#
+# - Check if the sensors are recognized on the i2c bus
+# executing the command 'i2cdetect -y 1'
+# the result should show the addresses 08 (LD20), 62 (SCD4x) and 69 (SEN5x)
+#
+# - Copy sensirion_crc.py, sensirion_driver.py and sensirion_scheduler.py
+# next to this file
+#
+# - Run the example 'python3 SEN5x_SCD4x_LD20_I2C_scheduler_example.py'
+
+import time
+from smbus2 import SMBus
+from sensirion_driver import Ld20, Scd4x, Sen5x
+from sensirion_scheduler import BusScheduler
+
+# I2C bus 1 on a Raspberry Pi 3B+
+# SDA on GPIO2=Pin3 and SCL on GPIO3=Pin5
+# sensor +3.3V at Pin1 and GND at Pin6
+DEVICE_BUS = 1
+
+
+def print_sen5x(entry, words, timestamp):
+    pm1p0, pm2p5, pm4p0, pm10p0, humidity, temperature, voc, nox = \
+        Sen5x.decode_measured_values(words)
+    print("{:.3f} SEN5x  pm2p5 {:.1f}  voc {:.0f}  nox {:.0f}  temperature {:.2f}  humidity {:.2f}".format(
+        timestamp, pm2p5, voc, nox, temperature, humidity))
+
+
+def print_scd4x(entry, words, timestamp):
+    co2, temperature, humidity = Scd4x.decode_measured_values(words)
+    print("{:.3f} SCD4x  co2 {}  temperature {:.2f}  humidity {:.2f}".format(
+        timestamp, co2, temperature, humidity))
+
+
+flow_sum = 0.0
+flow_count = 0
+
+
+def collect_ld20(entry, words, timestamp):
+    # the flow is read every 20 ms and printed as mean once per second
+    global flow_sum, flow_count
+    flow_sum += Ld20.decode_measured_values(words)[0]
+    flow_count += 1
+    if flow_count == 50:
+        print("{:.3f} LD20   flow {:.2f}".format(timestamp, flow_sum / flow_count))
+        flow_sum = 0.0
+        flow_count = 0
+
+
+# init I2C, the bus is shared by all sensors
+bus = SMBus(DEVICE_BUS)
+sen5x = Sen5x(bus)
+scd4x = Scd4x(bus)
+ld20 = Ld20(bus)
+
+# wait 1 s for sensor start up (> 1000 ms according to datasheet)
+time.sleep(1)
+
+sen5x.start_measurement()
+scd4x.start_periodic_measurement()
+ld20.start_continuous_measurement()
+
+scheduler = BusScheduler(bus)
+# SEN5x updates every 1 s, SCD4x every 5 s
+scheduler.add(sen5x, period=1.0, callback=print_sen5x, offset=1.0)
+scheduler.add(scd4x, period=5.0, callback=print_scd4x, offset=5.0)
+# LD20 needs 12 ms for the first measurement and 150 ms for warm up
+scheduler.add(ld20, period=0.02, callback=collect_ld20, offset=0.2)
+scheduler.run(duration=600)
+
+for entry in scheduler.devices:
+    print("{}: {} samples, {} missed cycles, {} CRC errors, {} I/O errors".format(
+        entry.name, entry.samples, entry.missed, entry.crc_errors, entry.io_errors))
+
+sen5x.stop_measurement()
+scd4x.stop_periodic_measurement()
+ld20.stop_continuous_measurement()
+
+bus.close()
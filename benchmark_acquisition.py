@@ -0,0 +1,275 @@
+#!/usr/bin/python
+#
+# Copyright (c) 2022, Sensirion AG
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# # Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# # Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# # Neither the name of Sensirion AG nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+# (c) Copyright 2022 Sensirion AG, Switzerland
+
+# Benchmark suite for the acquisition hot path
+#
+# Runs every stage of the SEN5x acquisition (CRC, decoding, formatting and
+# the complete polling loop) against a bus which answers with a fixed frame
+# (FrameBus of sensirion_simulator.py), once in the decode style of the
+# example scripts and once with the optimized modules, and
+# writes the results as JSON: samples per second, latency percentiles per
+# stage and memory allocated per sample.
+#
+# - Run the benchmark 'python3 benchmark_acquisition.py --output result.json'
+
+import argparse
+import gc
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from smbus2 import i2c_msg
+
+from sensirion_binlog import SampleLogWriter
+from sensirion_crc import pack_words, verify_frame
+from sensirion_driver import Sen5x
+from sensirion_simulator import (FrameBus, SimulatedBus, SimulatedSen5x,
+                                 VirtualClock)
+from sensirion_trace import Tracer
+
+try:
+    from sensirion_batch_decode import decode_sen5x_measured_values
+except ImportError:
+    # NumPy is not installed
+    decode_sen5x_measured_values = None
+
+DEVICE_ADDR = 0x69
+FORMAT = "{:.2f} \t {:.2f} \t {:.2f} \t {:.2f} \t {:.0f} \t {:.0f} \t {:.2f} \t\t {:.2f}"
+FRAME = bytes(pack_words([12, 25, 31, 40, 4500, 5100, 1000, 10]))
+
+
+def bitwise_crc(data):
+    # CRC loop as previously copied into the SEN5x example scripts
+    crc = 0xFF
+    for value in data:
+        crc ^= value
+        for i in range(8):
+            if crc & 0x80:
+                crc = (crc << 1) ^ 0x31
+            else:
+                crc = crc << 1
+            crc &= 0xFF
+    return crc
+
+
+def legacy_crc(frame):
+    for i in range(0, len(frame), 3):
+        if bitwise_crc(frame[i:i + 2]) != frame[i + 2]:
+            return False
+    return True
+
+
+def legacy_decode(msg):
+    # decode style of SEN5x_I2C_minimal_example.py
+    pm1p0 = (msg.buf[0][0] << 8 | msg.buf[1][0])/10
+    pm2p5 = (msg.buf[3][0] << 8 | msg.buf[4][0])/10
+    pm4p0 = (msg.buf[6][0] << 8 | msg.buf[7][0])/10
+    pm10p0 = (msg.buf[9][0] << 8 | msg.buf[10][0])/10
+    temperature = (msg.buf[15][0] << 8 | msg.buf[16][0]) / 200
+    humidity = (msg.buf[12][0] << 8 | msg.buf[13][0]) / 100
+    voc = (msg.buf[18][0] << 8 | msg.buf[19][0]) / 10
+    nox = (msg.buf[21][0] << 8 | msg.buf[22][0]) / 10
+    return pm1p0, pm2p5, pm4p0, pm10p0, humidity, temperature, voc, nox
+
+
+def legacy_sample(bus):
+    msg = i2c_msg.write(DEVICE_ADDR, [0x03, 0xC4])
+    bus.i2c_rdwr(msg)
+    msg = i2c_msg.read(DEVICE_ADDR, 24)
+    bus.i2c_rdwr(msg)
+    return legacy_decode(msg)
+
+
+def format_values(values):
+    pm1p0, pm2p5, pm4p0, pm10p0, humidity, temperature, voc, nox = values
+    return FORMAT.format(pm1p0, pm2p5, pm4p0, pm10p0, voc, nox, temperature,
+                         humidity)
+
+
+def percentiles(durations):
+    durations = sorted(durations)
+    n = len(durations)
+
+    def pick(p):
+        return durations[min(n - 1, int(p / 100.0 * n))] * 1e6
+
+    return {"p50_us": pick(50), "p90_us": pick(90), "p99_us": pick(99),
+            "max_us": durations[-1] * 1e6}
+
+
+def run_stage(function, iterations, per_call=1):
+    """
+        Measures the throughput, the latency distribution and the memory
+        allocated per call of function().
+        :param int per_call:
+            Number of samples one call processes, e.g. the batch size.
+    """
+    timer = time.perf_counter
+    for i in range(min(iterations, 1000)):
+        function()
+    start = timer()
+    for i in range(iterations):
+        function()
+    elapsed = timer() - start
+
+    durations = []
+    for i in range(iterations):
+        t0 = timer()
+        function()
+        durations.append(timer() - t0)
+
+    # memory allocated and freed within one call, and memory retained. The
+    # current size is read before the peak is reset, so the int holding it
+    # is not counted, and the garbage collector must not run within a call.
+    calls = min(iterations, 1000)
+    get_traced_memory = tracemalloc.get_traced_memory
+    reset_peak = tracemalloc.reset_peak
+    peaks = 0
+    gc.disable()
+    tracemalloc.start()
+    try:
+        start = get_traced_memory()[0]
+        for i in range(calls):
+            before = get_traced_memory()[0]
+            reset_peak()
+            function()
+            peaks += get_traced_memory()[1] - before
+        net = get_traced_memory()[0] - start
+    finally:
+        tracemalloc.stop()
+        gc.enable()
+
+    result = {"samples_per_second": iterations * per_call / elapsed}
+    result.update(percentiles(durations))
+    if per_call != 1:
+        result["per_call"] = per_call
+    result["allocated_bytes_per_sample"] = peaks / calls / per_call
+    result["retained_bytes_per_sample"] = net / calls / per_call
+    return result
+
+
+def run(iterations, batch_size):
+    # The stages run against FrameBus, which neither costs time nor
+    # allocates memory, so the figures are those of the code under test.
+    # The simulator only provides the bus time below.
+    clock = VirtualClock()
+    bus = FrameBus(FRAME)
+    sen5x = Sen5x(bus, sleep=clock.sleep)
+
+    msg = i2c_msg.read(DEVICE_ADDR, 24)
+    bus.i2c_rdwr(i2c_msg.write(DEVICE_ADDR, [0x03, 0xC4]))
+    bus.i2c_rdwr(msg)
+    command = sen5x.measurement_command()
+    sen5x.read_measured_values()
+    values = legacy_decode(msg)
+
+    stages = {
+        "crc/legacy": run_stage(lambda: legacy_crc(FRAME), iterations),
+        "crc/table": run_stage(lambda: verify_frame(FRAME), iterations),
+        "decode/legacy": run_stage(lambda: legacy_decode(msg), iterations),
+        # the words only, scaling them creates the floats of the values
+        "decode/driver": run_stage(command.decode, iterations),
+        "decode/driver+scale": run_stage(
+            lambda: Sen5x.decode_measured_values(command.decode()),
+            iterations),
+        "format/legacy": run_stage(lambda: format_values(values), iterations),
+        "loop/legacy": run_stage(
+            lambda: format_values(legacy_sample(bus)), iterations),
+        "loop/driver": run_stage(sen5x.read_measured_values, iterations),
+        "loop/driver+decode": run_stage(
+            lambda: Sen5x.decode_measured_values(
+                sen5x.read_measured_values()), iterations),
+    }
+    # the tracing overhead, without a tracer file
+    traced = Sen5x(bus, sleep=clock.sleep)
+    Tracer(clock=clock.monotonic).attach(traced)
+    stages["loop/driver+trace"] = run_stage(
+        traced.read_measured_values, iterations)
+    with tempfile.TemporaryDirectory() as directory:
+        with SampleLogWriter(directory) as log:
+            words = sen5x.read_measured_values()
+            stages["format/binlog"] = run_stage(
+                lambda: log.append(1.0, 1, words), iterations)
+    if decode_sen5x_measured_values is not None:
+        frames = FRAME * batch_size
+        stages["decode/numpy_batch"] = run_stage(
+            lambda: decode_sen5x_measured_values(frames),
+            max(1, iterations // batch_size), per_call=batch_size)
+
+    # bus time of one sample at 100 kHz (9 bit times per byte)
+    timed_bus = SimulatedBus([SimulatedSen5x()], clock=clock.monotonic,
+                             sleep=clock.sleep, byte_time=90e-6)
+    timed = Sen5x(timed_bus, sleep=clock.sleep)
+    timed.start_measurement()
+    clock.sleep(2)
+    before = timed_bus.bus_time
+    timed.read_measured_values()
+    bus_time = timed_bus.bus_time - before
+
+    cpu = stages["loop/driver+decode"]["samples_per_second"]
+    return {
+        "python": sys.version.split()[0],
+        "machine": platform.machine(),
+        "iterations": iterations,
+        "stages": stages,
+        "bus_time_per_sample_us_100khz": bus_time * 1e6,
+        # sensors read once per second one process can keep up with
+        "max_sensors_at_1hz": {
+            "cpu_bound": int(cpu),
+            "bus_bound_100khz": int(1.0 / bus_time),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the stages of the SEN5x acquisition and "
+        "write the results as JSON")
+    parser.add_argument("--iterations", type=int, default=10000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--output", help="JSON file, stdout if omitted")
+    args = parser.parse_args()
+    result = run(args.iterations, args.batch_size)
+    text = json.dumps(result, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/python
+#
+# Copyright (c) 2022, Sensirion AG
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# # Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# # Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# # Neither the name of Sensirion AG nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+# (c) Copyright 2022 Sensirion AG, Switzerland
+
+# Micro-benchmark of the table driven CRC-8 in sensirion_crc.py against the
+# bit by bit loop the example scripts used before
+#
+# - Run the benchmark 'python3 benchmark_crc.py'
+
+import timeit
+
+from sensirion_crc import crc8, crc8_word, pack_words, verify_frame
+
+
+def bitwise_crc(data):
+    # CRC loop as previously copied into the SEN5x example scripts
+    width = 8
+    polynomial = 0x31
+    final_xor = 0x00
+    crc = 0xFF
+    for value in data:
+        crc ^= value
+        for i in range(width):
+            if crc & (1 << (width - 1)):
+                crc = (crc << 1) ^ polynomial
+            else:
+                crc = crc << 1
+            crc &= (1 << width) - 1
+    return crc ^ final_xor
+
+
+def bitwise_verify_frame(frame):
+    for i in range(0, len(frame), 3):
+        if bitwise_crc(frame[i:i + 2]) != frame[i + 2]:
+            return False
+    return True
+
+
+def run(name, function, number):
+    seconds = min(timeit.repeat(function, number=number, repeat=5))
+    print("{:<36} {:>10.3f} us".format(name, seconds / number * 1e6))
+    return seconds
+
+
+# one "read measured values" frame (0x03C4): 8 words, 24 bytes
+FRAME = bytes(pack_words([12, 25, 31, 40, 4500, 5100, 100, 10]))
+WORD = [0xBE, 0xEF]
+
+# both implementations have to agree on every possible word
+for msb in range(256):
+    for lsb in range(256):
+        assert bitwise_crc([msb, lsb]) == crc8_word(msb, lsb)
+
+print("{:<36} {:>13}".format("operation", "time/call"))
+words_bitwise = run("single word, bit loop", lambda: bitwise_crc(WORD), 100000)
+words_table = run("single word, table", lambda: crc8(WORD), 100000)
+run("single word, table (crc8_word)", lambda: crc8_word(0xBE, 0xEF), 100000)
+frame_bitwise = run("24 byte frame, bit loop", lambda: bitwise_verify_frame(FRAME), 20000)
+frame_table = run("24 byte frame, verify_frame", lambda: verify_frame(FRAME), 20000)
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+if numpy is not None:
+    array = numpy.frombuffer(FRAME, dtype=numpy.uint8)
+    run("24 byte frame, verify_frame(ndarray)", lambda: verify_frame(array), 20000)
+
+print("speedup single word: {:.1f}x".format(words_bitwise / words_table))
+print("speedup 24 byte frame: {:.1f}x".format(frame_bitwise / frame_table))
@@ -0,0 +1,128 @@
+#!/usr/bin/python
+#
+# Copyright (c) 2022, Sensirion AG
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# # Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# # Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# # Neither the name of Sensirion AG nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+# (c) Copyright 2022 Sensirion AG, Switzerland
+
+# Memory per stored sample of the schemas in sensirion_records.py compared
+# with a list of floats (timestamp and the values scaled by the drivers)
+#
+# - Install NumPy in addition to smbus2
+# 'pip3 install numpy'
+#
+# - Run the benchmark 'python3 benchmark_records.py'
+
+import random
+import timeit
+import tracemalloc
+
+import numpy
+
+from sensirion_driver import Ld20, Scd4x, Sen5x
+from sensirion_records import (LD20, SCD4X, SEN5X_FULL, SEN5X_GAS_ONLY,
+                               SEN5X_RAW, RecordBuffer)
+
+SAMPLES = 100000
+
+
+def gas_only(words):
+    return Sen5x.decode_measured_values(words)[4:]
+
+
+def raw(words):
+    # the repository has no driver scaling for raw values
+    return SEN5X_RAW.record(0.0, words).values()
+
+
+# schema, words returned by the driver, scaling of the driver
+BENCHMARKS = (
+    (SEN5X_FULL, 8, Sen5x.decode_measured_values),
+    (SEN5X_GAS_ONLY, 8, gas_only),
+    (SEN5X_RAW, 4, raw),
+    (SCD4X, 3, Scd4x.decode_measured_values),
+    (LD20, 2, Ld20.decode_measured_values),
+)
+
+
+def bytes_per_sample(create):
+    tracemalloc.start()
+    stored = create()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del stored
+    return size / SAMPLES
+
+
+def run(schema, length, decode):
+    random.seed(1)
+    samples = [(1.6e9 + i, [random.randrange(3000) for _ in range(length)])
+               for i in range(SAMPLES)]
+
+    def floats():
+        return [[timestamp] + list(decode(words))
+                for timestamp, words in samples]
+
+    def records():
+        return [schema.record(timestamp, words)
+                for timestamp, words in samples]
+
+    def buffer():
+        buffer = RecordBuffer(schema, SAMPLES)
+        for timestamp, words in samples:
+            buffer.append(timestamp, words)
+        return buffer
+
+    list_size = bytes_per_sample(floats)
+    record_size = bytes_per_sample(records)
+    buffer_size = bytes_per_sample(buffer)
+    print("{:<14} {:>8.1f} B {:>8.1f} B {:>5.1f}x {:>8.1f} B {:>5.1f}x".format(
+        schema.name, list_size, record_size, list_size / record_size,
+        buffer_size, list_size / buffer_size))
+
+
+print("{:<14} {:>10} {:>10} {:>6} {:>10} {:>6}".format(
+    "schema", "floats", "record", "", "buffer", ""))
+for benchmark in BENCHMARKS:
+    run(*benchmark)
+
+# price of the lazy scaling
+record = SEN5X_FULL.record(1.6e9, [12, 25, 31, 40, 4500, 5100, 100, 10])
+number = 100000
+seconds = min(timeit.repeat(lambda: record.pm2p5, number=number, repeat=5))
+print("record.pm2p5: {:.3f} us".format(seconds / number * 1e6))
+seconds = min(timeit.repeat(record.values, number=number, repeat=5))
+print("record.values(): {:.3f} us".format(seconds / number * 1e6))
+buffer = RecordBuffer(SEN5X_FULL, SAMPLES)
+buffer.array["pm2p5"] = numpy.arange(SAMPLES) % 3000
+buffer.count = SAMPLES
+seconds = min(timeit.repeat(lambda: buffer.column("pm2p5"), number=10,
+                            repeat=5))
+print("buffer.column() of {} samples: {:.3f} ms".format(
+    SAMPLES, seconds / 10 * 1e3))
@@ -0,0 +1,148 @@
+#!/usr/bin/python
+#
+# Copyright (c) 2022, Sensirion AG
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# # Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# # Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# # Neither the name of Sensirion AG nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+# (c) Copyright 2022 Sensirion AG, Switzerland
+
+# Compares the storage of SEN5x samples in SQLite batches with writing one
+# text line per sample, as print() redirected to a file does
+#
+# Reported per variant: samples per second, bytes passed to write() and
+# number of write() calls per hour at 1 sample per second, the size of the
+# files and the 4 KiB flash pages written per hour if every write() reaches
+# the SD card, which is the case when the file is synced after each line.
+# An SD card programs at least one page per write, however small it is.
+#
+# - Run the benchmark 'python3 benchmark_storage.py [directory]', the
+# directory should be on the SD card
+
+import argparse
+import os
+import tempfile
+import time
+
+from sensirion_records import SEN5X_FULL
+from sensirion_sqlite import SqliteWriter
+
+SAMPLES = 20000
+WORDS = [12, 25, 31, 40, 4500, 5100, 1000, 10]
+PAGE_SIZE = 4096
+LINE = "{:.3f}\t{:.2f}\t{:.2f}\t{:.2f}\t{:.2f}\t{:.0f}\t{:.0f}\t{:.2f}\t{:.2f}"
+
+
+def io_counters():
+    # bytes passed to write() and number of write() calls of this process
+    counters = {}
+    with open("/proc/self/io") as f:
+        for line in f:
+            name, value = line.split(":")
+            counters[name] = int(value)
+    return counters["wchar"], counters["syscw"]
+
+
+def words(i):
+    return [(word + i) % 3000 for word in WORDS]
+
+
+def text(path, sync):
+    with open(path, "w") as f:
+        for i in range(SAMPLES):
+            values = SEN5X_FULL.record(1.6e9 + i, words(i)).values()
+            print(LINE.format(1.6e9 + i, *values), file=f, flush=True)
+            if sync:
+                os.fsync(f.fileno())
+
+
+def sqlite(path, batch_size, synchronous):
+    with SqliteWriter(path, batch_size=batch_size, flush_interval=None,
+                      synchronous=synchronous, flush_at_exit=False) as writer:
+        for i in range(SAMPLES):
+            writer.add(SEN5X_FULL, 0, 1.6e9 + i, words(i))
+
+
+def size(path):
+    return sum(os.path.getsize(path + suffix)
+               for suffix in ("", "-wal", "-shm")
+               if os.path.exists(path + suffix))
+
+
+def run(name, function, path, *args):
+    written, calls = io_counters()
+    start = time.perf_counter()
+    function(path, *args)
+    seconds = time.perf_counter() - start
+    written_after, calls_after = io_counters()
+    # one sample per second
+    hours = SAMPLES / 3600.0
+    written = written_after - written
+    calls = calls_after - calls
+    pages = max(calls, -(-written // PAGE_SIZE))
+    print("{:<28} {:>10.0f} {:>12.0f} {:>10.0f} {:>10.0f} {:>12.0f}".format(
+        name, SAMPLES / seconds, written / hours, calls / hours,
+        size(path) / hours, pages * PAGE_SIZE / hours))
+
+
+def run_all(directory):
+    print("{} samples in {}".format(SAMPLES, directory))
+    print("{:<28} {:>10} {:>12} {:>10} {:>10} {:>12}".format(
+        "variant", "samples/s", "bytes/h", "writes/h", "size/h", "pages B/h"))
+    run("text, flush per line", text, os.path.join(directory, "flush.txt"),
+        False)
+    run("text, fsync per line", text, os.path.join(directory, "fsync.txt"),
+        True)
+    run("sqlite, commit per sample", sqlite, os.path.join(directory, "1.db"),
+        1, "NORMAL")
+    run("sqlite, batch 60", sqlite, os.path.join(directory, "60.db"),
+        60, "NORMAL")
+    run("sqlite, batch 300", sqlite, os.path.join(directory, "300.db"),
+        300, "NORMAL")
+    run("sqlite, batch 3600", sqlite, os.path.join(directory, "3600.db"),
+        3600, "NORMAL")
+    run("sqlite, batch 300, FULL", sqlite,
+        os.path.join(directory, "300full.db"), 300, "FULL")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare storing SEN5x samples in SQLite batches with "
+        "writing one text line per sample")
+    parser.add_argument("directory", nargs="?",
+                        help="directory for the files, e.g. on the SD card, "
+                        "a temporary directory if omitted")
+    args = parser.parse_args()
+    if args.directory:
+        run_all(args.directory)
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            run_all(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/python
+#
+# Copyright (c) 2022, Sensirion AG
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# # Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# # Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# # Neither the name of Sensirion AG nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+# (c) Copyright 2022 Sensirion AG, Switzerland
+
+# Compression ratio and decode throughput of sensirion_tick_archive.py for
+# a week of SEN5x raw values at 1 sample per second
+#
+# The samples are synthetic: timestamps with a few milliseconds of jitter,
+# VOC and NOx ticks as random walks with sensor noise, humidity and
+# temperature moving by single digits. The ratio is given against the raw
+# samples (float64 timestamp and 4 words, 16 bytes) and against the CSV
+# lines of SEN5x_I2C_read_raw.py.
+#
+# - Install NumPy in addition to smbus2
+# 'pip3 install numpy'
+#
+# - Run the benchmark 'python3 benchmark_tick_archive.py'
+
+import os
+import random
+import tempfile
+import time
+
+from sensirion_records import SEN5X_RAW
+from sensirion_tick_archive import TickArchive, TickArchiveWriter
+
+SAMPLES = 7 * 86400
+
+
+def samples():
+    random.seed(1)
+    timestamp = 1.6e9
+    humidity, temperature, voc, nox = 4500, 4600, 30000, 16000
+    for i in range(SAMPLES):
+        timestamp += 1 + random.randint(-3, 3) / 1000.0
+        if i % 60 == 0:
+            humidity += random.randint(-2, 2)
+            temperature += random.randint(-1, 1)
+        voc += random.randint(-20, 20)
+        nox += random.randint(-4, 4)
+        yield timestamp, (humidity + random.randint(-1, 1),
+                          temperature + random.randint(-1, 1),
+                          voc & 0xFFFF, nox & 0xFFFF)
+
+
+data = list(samples())
+csv_bytes = sum(len("{:.2f},{:.2f},{:.2f},{:.2f}\n".format(
+    words[2], words[3], words[1] / 200, words[0] / 100))
+    for _, words in data)
+
+with tempfile.TemporaryDirectory() as directory:
+    print("{} samples".format(SAMPLES))
+    print("{:<22} {:>10} {:>9} {:>8} {:>8} {:>12} {:>12}".format(
+        "variant", "bytes", "B/sample", "vs raw", "vs CSV", "encode/s",
+        "decode/s"))
+    for chunk_samples, compress in ((600, False), (3600, False), (600, True),
+                                    (3600, True), (86400, True)):
+        path = os.path.join(directory, "{}-{}.bin".format(chunk_samples,
+                                                           compress))
+        start = time.perf_counter()
+        with TickArchiveWriter(path, SEN5X_RAW, chunk_samples=chunk_samples,
+                               compress=compress, sync=False) as writer:
+            for timestamp, words in data:
+                writer.append(timestamp, words)
+        encode = time.perf_counter() - start
+        size = os.path.getsize(path)
+        archive = TickArchive(path)
+        start = time.perf_counter()
+        decoded = archive.read()
+        decode = time.perf_counter() - start
+        assert len(decoded) == SAMPLES
+        assert decoded["voc_ticks"][-1] == data[-1][1][2]
+        print("{:<22} {:>10} {:>9.2f} {:>7.1f}x {:>7.1f}x {:>12.0f} {:>12.0f}"
+              .format("chunk {}{}".format(chunk_samples,
+                                          ", zlib" if compress else ""),
+                      size, size / SAMPLES, writer.raw_bytes / size,
+                      csv_bytes / size, SAMPLES / encode, SAMPLES / decode))
+
+    # one hour in the middle of the week, from the 3600 samples chunks
+    archive = TickArchive(os.path.join(directory, "3600-True.bin"))
+    start = data[SAMPLES // 2][0]
+    number = 20
+    began = time.perf_counter()
+    for _ in range(number):
+        hour = archive.read(start, start + 3600)
+    seconds = (time.perf_counter() - began) / number
+    print("read 1 h of {} chunks: {} samples in {:.2f} ms".format(
+        len(archive.chunks), len(hour), seconds * 1e3))
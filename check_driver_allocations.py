@@ -0,0 +1,121 @@
+#!/usr/bin/python
+#
+# Copyright (c) 2022, Sensirion AG
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# # Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# # Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# # Neither the name of Sensirion AG nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+# (c) Copyright 2022 Sensirion AG, Switzerland
+
+# Checks that the measurement loop of sensirion_driver.py does not allocate
+# memory per sample, using tracemalloc and a fake I2C bus. The peak of the
+# traced memory is taken per sample, so memory which is allocated and freed
+# again within the sample is counted as well.
+#
+# - Run the check 'python3 check_driver_allocations.py'
+
+import gc
+import sys
+import tracemalloc
+
+from smbus2 import i2c_msg
+
+from sensirion_crc import pack_words
+from sensirion_driver import Sen5x
+from sensirion_simulator import FrameBus
+
+ITERATIONS = 100000
+
+
+def driver_sample(sen5x):
+    sen5x.read_measured_values()
+
+
+def legacy_sample(bus):
+    # decode style of SEN5x_I2C_minimal_example.py
+    msg = i2c_msg.write(0x69, [0x03, 0xC4])
+    bus.i2c_rdwr(msg)
+    msg = i2c_msg.read(0x69, 24)
+    bus.i2c_rdwr(msg)
+    pm1p0 = (msg.buf[0][0] << 8 | msg.buf[1][0])/10
+    pm2p5 = (msg.buf[3][0] << 8 | msg.buf[4][0])/10
+    pm4p0 = (msg.buf[6][0] << 8 | msg.buf[7][0])/10
+    pm10p0 = (msg.buf[9][0] << 8 | msg.buf[10][0])/10
+    temperature = (msg.buf[15][0] << 8 | msg.buf[16][0]) / 200
+    humidity = (msg.buf[12][0] << 8 | msg.buf[13][0]) / 100
+    voc = (msg.buf[18][0] << 8 | msg.buf[19][0]) / 10
+    nox = (msg.buf[21][0] << 8 | msg.buf[22][0]) / 10
+
+
+def measure(name, sample):
+    """
+        Takes ITERATIONS samples and returns the bytes allocated by each,
+        with the garbage collector disabled so it does not run within one.
+    """
+    # warm up, e.g. the commands of the driver are created on first use
+    for i in range(1000):
+        sample()
+    allocated = [0] * ITERATIONS
+    get_traced_memory = tracemalloc.get_traced_memory
+    reset_peak = tracemalloc.reset_peak
+    gc.disable()
+    tracemalloc.start()
+    try:
+        for i in range(ITERATIONS):
+            # the current size is read before the reset, so the int holding
+            # it is not counted as allocated by the sample
+            before = get_traced_memory()[0]
+            reset_peak()
+            sample()
+            allocated[i] = get_traced_memory()[1] - before
+    finally:
+        tracemalloc.stop()
+        gc.enable()
+    allocated.sort()
+    print("{:<8} allocated per sample: median {:>4} bytes, "
+          "max {:>5} bytes, {:>6} of {} samples allocate".format(
+              name, allocated[ITERATIONS // 2], allocated[-1],
+              ITERATIONS - allocated.count(0), ITERATIONS))
+    return allocated
+
+
+bus = FrameBus(bytes(pack_words([12, 25, 31, 40, 4500, 5100, 100, 10])))
+sen5x = Sen5x(bus, sleep=lambda seconds: None)
+assert Sen5x.decode_measured_values(sen5x.read_measured_values()) == (
+    1.2, 2.5, 3.1, 4.0, 45.0, 25.5, 10.0, 1.0)
+
+legacy = measure("legacy", lambda: legacy_sample(bus))
+driver = measure("driver", lambda: driver_sample(sen5x))
+
+if legacy[0] == 0:
+    print("FAILED: the measurement does not see the allocations of the "
+          "legacy loop")
+    sys.exit(1)
+if driver[-1] > 0:
+    print("FAILED: the driver loop allocates memory per sample")
+    sys.exit(1)
+print("OK: the legacy loop allocates per sample, the driver loop does not")
@@ -0,0 +1,71 @@
+#!/usr/bin/python
+#
+# Copyright (c) 2022, Sensirion AG
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# # Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# # Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# # Neither the name of Sensirion AG nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+# (c) Copyright 2022 Sensirion AG, Switzerland
+
+# Checks that ParallelAcquisition.stop() ends every worker, also when it is
+# called right after start(), before the worker threads entered their
+# scheduler loop
+#
+# - Run the check 'python3 check_multibus_stop.py'
+
+import sys
+
+from sensirion_driver import Sen5x
+from sensirion_multibus import ParallelAcquisition
+from sensirion_simulator import SimulatedBus, SimulatedSen5x
+
+TRIALS = 300
+
+# switch threads as often as possible to provoke the race
+sys.setswitchinterval(1e-6)
+
+hanging = 0
+for trial in range(TRIALS):
+    acquisition = ParallelAcquisition(
+        open_bus=lambda number: SimulatedBus([SimulatedSen5x()]))
+    for number in (1, 2):
+        entry = acquisition.add(number, Sen5x, period=0.01)
+        entry.device.start_measurement()
+    # no duration: only stop() ends the workers
+    acquisition.start()
+    if not acquisition.stop(timeout=2.0):
+        hanging += 1
+        for worker in acquisition.workers.values():
+            # end the daemon threads of this trial
+            worker.stop()
+
+if hanging:
+    print("FAILED: workers still running after stop() in {} of {} "
+          "trials".format(hanging, TRIALS))
+    sys.exit(1)
+print("OK: stop() right after start() ended all workers in {} "
+      "trials".format(TRIALS))
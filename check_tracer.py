@@ -0,0 +1,135 @@
+#!/usr/bin/python
+#
+# Copyright (c) 2022, Sensirion AG
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# # Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# # Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# # Neither the name of Sensirion AG nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+# (c) Copyright 2022 Sensirion AG, Switzerland
+
+# Checks that Tracer records the write, wait and read phase of every traced
+# command, counts the commands which fail and leaves the driver as it was
+# after detach(), also together with a RecoveryEngine, using the simulated
+# bus
+#
+# - Run the check 'python3 check_tracer.py'
+
+import sys
+
+from sensirion_crc import CrcError
+from sensirion_driver import Sen5x
+from sensirion_recovery import RecoveryEngine
+from sensirion_simulator import SimulatedBus, SimulatedSen5x, VirtualClock
+from sensirion_trace import Tracer
+
+failures = []
+
+
+def check(condition, message):
+    if not condition:
+        failures.append(message)
+
+
+clock = VirtualClock()
+bus = SimulatedBus([SimulatedSen5x()], clock=clock.monotonic,
+                   sleep=clock.sleep)
+sen5x = Sen5x(bus, sleep=clock.sleep)
+sen5x.start_measurement()
+clock.sleep(2)
+
+tracer = Tracer(clock=clock.monotonic)
+tracer.attach(sen5x, "sen5x")
+for i in range(5):
+    words = sen5x.read_measured_values()
+check(Sen5x.decode_measured_values(words)[1] > 0, "no measured values")
+for phase in ("write", "wait", "read"):
+    histogram = tracer.histograms.get(("sen5x", 0x03C4, phase))
+    check(histogram is not None and histogram.count == 5,
+          "{} phase not recorded 5 times".format(phase))
+wait = tracer.histograms[("sen5x", 0x03C4, "wait")].statistics()
+check(abs(wait["mean"] - 0.02) < 1e-9, "wait phase is not the 20 ms delay")
+check(tracer.errors == 0, "errors counted without failure")
+
+# a command which fails is counted once and the exception reaches the caller
+bus.inject("nack")
+try:
+    sen5x.read_measured_values()
+    check(False, "injected NACK did not raise")
+except OSError:
+    pass
+bus.inject("crc")
+try:
+    sen5x.read_measured_values()
+    check(False, "injected CRC error did not raise")
+except CrcError:
+    pass
+check(tracer.errors == 2, "errors is {} instead of 2".format(tracer.errors))
+
+# parameter writes are not traced
+keys = set(tracer.histograms)
+# temperature compensation, writable during the measurement
+sen5x.write(0x60B2, [0, 0, 0], 0.02)
+check(set(tracer.histograms) == keys, "write() was traced")
+
+Tracer.detach(sen5x)
+check(sen5x.bus is bus, "detach() did not restore the bus")
+check("execute" not in sen5x.__dict__, "detach() did not restore execute()")
+count = tracer.histograms[("sen5x", 0x03C4, "read")].count
+sen5x.read_measured_values()
+check(tracer.histograms[("sen5x", 0x03C4, "read")].count == count,
+      "commands are traced after detach()")
+
+# a RecoveryEngine attached before the tracer is kept by detach()
+recovery = RecoveryEngine(clock=clock.monotonic, sleep=clock.sleep)
+recovery.attach(sen5x, "sen5x")
+retrying_execute = sen5x.execute
+tracer.attach(sen5x, "sen5x")
+Tracer.detach(sen5x)
+check(sen5x.execute is retrying_execute,
+      "detach() removed the RecoveryEngine attached before")
+
+# one attached after the tracer is not removed silently
+tracer.attach(sen5x, "sen5x")
+recovery.attach(sen5x, "sen5x")
+outer_execute = sen5x.execute
+try:
+    Tracer.detach(sen5x)
+    check(False, "detach() below a RecoveryEngine did not raise")
+except ValueError:
+    pass
+check(sen5x.execute is outer_execute,
+      "detach() removed the RecoveryEngine attached after")
+bus.inject("nack")
+sen5x.read_measured_values()
+check(sum(recovery.retries.values()) == 1,
+      "the RecoveryEngine does not retry after the failed detach()")
+
+if failures:
+    for message in failures:
+        print("FAILED: " + message)
+    sys.exit(1)
+print("OK: phases, errors and detach() of the tracer")
@@ -0,0 +1,310 @@
+# Copyright (c) 2022, Sensirion AG
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# # Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# # Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# # Neither the name of Sensirion AG nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+# (c) Copyright 2022 Sensirion AG, Switzerland
+
+# Streaming min, max, mean and percentile over fixed time windows
+#
+# RollingAggregator keeps one accumulator per metric and window length, by
+# default 1 min, 15 min and 1 h windows aligned to multiples of their length
+# (e.g. 10:00 to 10:15). A sample updates every accumulator in constant
+# time. The percentile is estimated with the P-square algorithm of Jain and
+# Chlamtac, which needs five markers instead of the samples, so the memory
+# does not grow with the window length or the runtime. When a sample falls
+# behind the end of a window, the window is closed and passed to the
+# on_window callback, e.g. to store it, and the accumulator is reused.
+#
+# Usage:
+#
+#   aggregator = RollingAggregator(on_window=store_window)
+#   aggregator.add(time.time(), "pm2p5", pm2p5)
+#   print(aggregator.partial("pm2p5"))
+
+import math
+from collections import namedtuple
+
+WINDOWS = (60.0, 900.0, 3600.0)
+
+WindowSummary = namedtuple("WindowSummary", (
+    "metric", "length", "start", "end", "count", "min", "max", "mean",
+    "percentile", "closed"))
+
+
+class P2Quantile(object):
+    """
+        Estimates a quantile of a stream with the P-square algorithm, the
+        first five values are kept and give the exact result.
+        :param float p:
+            Quantile between 0 and 1, e.g. 0.95.
+    """
+
+    __slots__ = ("p", "count", "_heights", "_positions", "_desired",
+                 "_increments")
+
+    def __init__(self, p):
+        self.p = p
+        self._increments = (0.0, p / 2, p, (1 + p) / 2, 1.0)
+        self._heights = []
+        self._positions = [0, 1, 2, 3, 4]
+        self._desired = [0.0, 0.0, 0.0, 0.0, 0.0]
+        self.count = 0
+
+    def reset(self):
+        p = self.p
+        del self._heights[:]
+        self._positions[:] = (0, 1, 2, 3, 4)
+        self._desired[:] = (0.0, 2 * p, 4 * p, 2 + 2 * p, 4.0)
+        self.count = 0
+
+    def add(self, x):
+        heights = self._heights
+        self.count += 1
+        if self.count <= 5:
+            heights.append(x)
+            if self.count == 5:
+                heights.sort()
+                self._desired[:] = (0.0, 2 * self.p, 4 * self.p,
+                                    2 + 2 * self.p, 4.0)
+            return
+        positions = self._positions
+        desired = self._desired
+        if x < heights[0]:
+            heights[0] = x
+            k = 0
+        elif x >= heights[4]:
+            heights[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= heights[k + 1]:
+                k += 1
+        for i in range(k + 1, 5):
+            positions[i] += 1
+        for i in range(5):
+            desired[i] += self._increments[i]
+        # move the three middle markers towards their desired positions
+        for i in range(1, 4):
+            d = desired[i] - positions[i]
+            if (d >= 1 and positions[i + 1] - positions[i] > 1) or \
+                    (d <= -1 and positions[i - 1] - positions[i] < -1):
+                d = 1 if d > 0 else -1
+                height = self._parabolic(i, d)
+                if not heights[i - 1] < height < heights[i + 1]:
+                    height = heights[i] + d * \
+                        (heights[i + d] - heights[i]) / \
+                        (positions[i + d] - positions[i])
+                heights[i] = height
+                positions[i] += d
+
+    def _parabolic(self, i, d):
+        q = self._heights
+        n = self._positions
+        return q[i] + d / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i]) +
+            (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1]))
+
+    def value(self):
+        """
+            Returns the estimated quantile, NaN without values.
+        """
+        if self.count == 0:
+            return float("nan")
+        if self.count < 5:
+            # linear interpolation between the closest ranks
+            values = sorted(self._heights)
+            rank = self.p * (len(values) - 1)
+            low = int(rank)
+            high = min(low + 1, len(values) - 1)
+            return values[low] + (values[high] - values[low]) * (rank - low)
+        return self._heights[2]
+
+
+class WindowAccumulator(object):
+    """
+        Statistics of one metric over the current window of one length.
+    """
+
+    __slots__ = ("length", "start", "count", "min", "max", "sum",
+                 "quantile")
+
+    def __init__(self, length, p):
+        self.length = length
+        self.start = None
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self.sum = 0.0
+        self.quantile = P2Quantile(p)
+
+    def reset(self, start):
+        self.start = start
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self.sum = 0.0
+        self.quantile.reset()
+
+    def add(self, value):
+        self.count += 1
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.sum += value
+        self.quantile.add(value)
+
+    def summary(self, metric, closed):
+        if self.count == 0:
+            nan = float("nan")
+            low = high = mean = nan
+        else:
+            low, high, mean = self.min, self.max, self.sum / self.count
+        return WindowSummary(metric, self.length, self.start,
+                             self.start + self.length, self.count, low, high,
+                             mean, self.quantile.value(), closed)
+
+
+class RollingAggregator(object):
+    """
+        Aggregates metrics over tumbling windows of several lengths.
+        :param windows:
+            Window lengths in seconds. Windows start at multiples of their
+            length, counted from timestamp 0.
+        :param float percentile:
+            Quantile reported as WindowSummary.percentile, 0.95 for p95.
+        :param on_window:
+            Called as on_window(summary) with a WindowSummary (closed=True)
+            for every window which received at least one value. Windows
+            without values are skipped.
+        :ivar int samples:
+            Number of values added, NaN values are not counted.
+        :ivar int closed_windows:
+            Number of windows passed to on_window.
+    """
+
+    def __init__(self, windows=WINDOWS, percentile=0.95, on_window=None):
+        self.windows = tuple(windows)
+        self.percentile = percentile
+        self.on_window = on_window
+        self.samples = 0
+        self.closed_windows = 0
+        self._metrics = {}
+
+    def _accumulators(self, metric):
+        accumulators = self._metrics.get(metric)
+        if accumulators is None:
+            accumulators = [WindowAccumulator(length, self.percentile)
+                            for length in self.windows]
+            self._metrics[metric] = accumulators
+        return accumulators
+
+    def _close(self, metric, accumulator):
+        if accumulator.count:
+            self.closed_windows += 1
+            if self.on_window is not None:
+                self.on_window(accumulator.summary(metric, True))
+
+    def add(self, timestamp, metric, value):
+        """
+            Adds one value, NaN (not available) is ignored. Timestamps of a
+            metric have to increase, a value before the start of the current
+            window is counted in the current window.
+        """
+        if value != value:
+            return
+        self.samples += 1
+        for accumulator in self._accumulators(metric):
+            start = accumulator.start
+            if start is None or timestamp >= start + accumulator.length:
+                if start is not None:
+                    self._close(metric, accumulator)
+                length = accumulator.length
+                accumulator.reset(timestamp // length * length)
+            accumulator.add(value)
+
+    def add_values(self, timestamp, values):
+        """
+            Adds several metrics of one sample.
+            :param values:
+                Dictionary metric -> value, or an iterable of such pairs.
+        """
+        if hasattr(values, "items"):
+            values = values.items()
+        for metric, value in values:
+            self.add(timestamp, metric, value)
+
+    def add_record(self, record, fields, prefix=""):
+        """
+            Adds fields of a record of sensirion_records.py under the names
+            prefix + field, e.g. add_record(record, ("pm2p5", "voc"),
+            "sen5x.").
+        """
+        timestamp = record.timestamp
+        for field in fields:
+            self.add(timestamp, prefix + field, getattr(record, field))
+
+    def advance(self, timestamp):
+        """
+            Closes the windows which ended before timestamp, e.g. from a
+            timer when a sensor stopped delivering values.
+        """
+        for metric, accumulators in self._metrics.items():
+            for accumulator in accumulators:
+                if accumulator.start is not None and \
+                        timestamp >= accumulator.start + accumulator.length:
+                    self._close(metric, accumulator)
+                    accumulator.start = None
+
+    def partial(self, metric=None):
+        """
+            Returns the current, not yet closed windows.
+            :param metric:
+                Name of one metric, None for all metrics.
+            :return:
+                List of WindowSummary with closed=False, one per window
+                length and metric which received values.
+        """
+        if metric is None:
+            metrics = list(self._metrics.items())
+        else:
+            metrics = [(metric, self._metrics.get(metric, ()))]
+        return [accumulator.summary(name, False)
+                for name, accumulators in metrics
+                for accumulator in accumulators
+                if accumulator.start is not None]
+
+    def flush(self):
+        """
+            Closes all current windows, e.g. before the program ends.
+        """
+        for metric, accumulators in self._metrics.items():
+            for accumulator in accumulators:
+                if accumulator.start is not None:
+                    self._close(metric, accumulator)
+                    accumulator.start = None
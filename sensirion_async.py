@@ -0,0 +1,229 @@
+# Copyright (c) 2022, Sensirion AG
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# # Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# # Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# # Neither the name of Sensirion AG nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+# (c) Copyright 2022 Sensirion AG, Switzerland
+
+# asyncio drivers for the Sensirion I2C sensors in this repository
+#
+# The blocking i2c_rdwr() calls of smbus2 run in a bounded thread pool, one
+# thread per bus by default, and the execution times of the commands are
+# waited with asyncio.sleep(). Many sensors can therefore be served from a
+# single event loop. The commands use the preallocated messages of the
+# drivers in sensirion_driver.py.
+#
+# Usage:
+#
+#   bus = AsyncBus(SMBus(1))
+#   sen5x = AsyncSen5x(bus)
+#   await sen5x.start_measurement()
+#   async for values in sen5x.samples(period=1.0):
+#       print(values)
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from sensirion_driver import Ld20, Scd4x, Sen5x
+
+
+class AsyncBus(object):
+    """
+        Runs the transfers of one I2C bus in an executor.
+        :param bus:
+            An smbus2.SMBus or any object implementing i2c_rdwr().
+        :param executor:
+            concurrent.futures executor shared with other buses, a private
+            executor with max_workers threads is created if None.
+        :param int max_workers:
+            Size of the private executor.
+    """
+
+    def __init__(self, bus, executor=None, max_workers=1):
+        self.bus = bus
+        self._owns_executor = executor is None
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=max_workers,
+                                          thread_name_prefix="i2c")
+        self.executor = executor
+        self._lock = None
+
+    async def i2c_rdwr(self, *msgs):
+        """
+            Executes the messages in the executor, transfers on the same bus
+            are serialized.
+        """
+        if self._lock is None:
+            # created lazily to bind it to the running event loop
+            self._lock = asyncio.Lock()
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            await loop.run_in_executor(self.executor, self.bus.i2c_rdwr, *msgs)
+
+    def close(self):
+        """
+            Shuts the private executor down, the SMBus is not closed.
+        """
+        if self._owns_executor:
+            self.executor.shutdown(wait=True)
+
+
+class AsyncSensirionI2cDevice(object):
+    """
+        Base class of the asyncio drivers.
+        :param AsyncBus bus:
+            The bus the sensor is connected to.
+        :param int address:
+            I2C address, the default address of the sensor if None.
+    """
+
+    DRIVER = None
+
+    def __init__(self, bus, address=None):
+        self.bus = bus
+        # the blocking driver provides the preallocated commands and the
+        # conversion of the measured values
+        self.driver = self.DRIVER(bus.bus, address)
+        self.address = self.driver.address
+        self._lock = None
+
+    async def execute(self, command):
+        """
+            Sends the command, waits for its execution and reads and checks
+            the response.
+            :return:
+                The array of received words, it is overwritten by the next
+                execution of the same command.
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        # the lock protects the preallocated buffers of this sensor
+        async with self._lock:
+            if command.write_msg is not None:
+                await self.bus.i2c_rdwr(command.write_msg)
+                if command.delay:
+                    await asyncio.sleep(command.delay)
+            if command.read_msg is None:
+                return command.words
+            await self.bus.i2c_rdwr(command.read_msg)
+            return command.decode()
+
+    async def send(self, code, delay=0.0):
+        return await self.execute(self.driver.command(code, delay))
+
+    async def read(self, code, read_words, delay=0.0):
+        return await self.execute(self.driver.command(code, delay, read_words))
+
+    async def read_measured_values(self):
+        """
+            :return:
+                Raw words as returned by the blocking driver.
+        """
+        return await self.execute(self.driver.measurement_command())
+
+    def decode_measured_values(self, words):
+        return self.driver.decode_measured_values(words)
+
+    async def samples(self, period, count=None):
+        """
+            Asynchronous iterator over the scaled measured values.
+            :param float period:
+                Time between two reads in seconds, the reads are scheduled on
+                absolute deadlines so the period does not drift.
+            :param int count:
+                Number of samples, None for an endless iterator.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time()
+        n = 0
+        while count is None or n < count:
+            words = await self.read_measured_values()
+            yield self.decode_measured_values(words)
+            n += 1
+            deadline += period
+            now = loop.time()
+            if deadline < now:
+                # too late, continue with the next deadline in the future
+                deadline += ((now - deadline) // period + 1) * period
+            await asyncio.sleep(deadline - now)
+
+
+class AsyncSen5x(AsyncSensirionI2cDevice):
+    """
+        asyncio driver for the SEN50, SEN54 and SEN55 sensor modules.
+    """
+
+    DRIVER = Sen5x
+
+    async def start_measurement(self):
+        await self.send(0x0021, 0.05)
+
+    async def start_measurement_rht_gas_only(self):
+        await self.send(0x0037, 0.05)
+
+    async def stop_measurement(self):
+        await self.send(0x0104, 0.2)
+
+    async def read_data_ready(self):
+        return bool((await self.read(0x0202, 1, 0.02))[0] & 0x01)
+
+    async def read_raw_values(self):
+        return await self.read(0x03D2, 4, 0.02)
+
+
+class AsyncScd4x(AsyncSensirionI2cDevice):
+    """
+        asyncio driver for the SCD40 and SCD41 CO2 sensors.
+    """
+
+    DRIVER = Scd4x
+
+    async def start_measurement(self):
+        await self.send(0x21B1)
+
+    async def stop_measurement(self):
+        await self.send(0x3F86, 0.5)
+
+    async def read_data_ready(self):
+        return bool((await self.read(0xE4B8, 1, 0.001))[0] & 0x07FF)
+
+
+class AsyncLd20(AsyncSensirionI2cDevice):
+    """
+        asyncio driver for the LD20 liquid flow sensor.
+    """
+
+    DRIVER = Ld20
+
+    async def start_measurement(self):
+        """
+            Starts the continuous measurement for H2O.
+        """
+        await self.send(0x3608)
+
+    async def stop_measurement(self):
+        await self.send(0x3FF9)
@@ -0,0 +1,110 @@
+# Copyright (c) 2022, Sensirion AG
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# # Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# # Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# # Neither the name of Sensirion AG nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+# (c) Copyright 2022 Sensirion AG, Switzerland
+
+# Vectorized decoder for SEN5x "read measured values" frames (0x03C4)
+#
+# Decodes any number of 24 byte frames stacked into one contiguous buffer in
+# a single NumPy pass: CRC check, merge of MSB and LSB, scaling and handling
+# of the "not available" values 0xFFFF (unsigned) and 0x7FFF (signed). Values
+# which are not available or fail the CRC check are returned as NaN.
+#
+# - Install NumPy in addition to smbus2
+# 'pip3 install numpy'
+
+import numpy as np
+
+from sensirion_crc import CRC8_INIT, CRC8_TABLE
+
+SEN5X_FRAME_SIZE = 24
+
+# name, signed, scale factor according to the SEN5x datasheet, in the order
+# the words are sent by the sensor
+SEN5X_MEASURED_VALUES = (
+    ("pm1p0", False, 10),
+    ("pm2p5", False, 10),
+    ("pm4p0", False, 10),
+    ("pm10p0", False, 10),
+    ("humidity", True, 100),
+    ("temperature", True, 200),
+    ("voc", True, 10),
+    ("nox", True, 10),
+)
+
+_CRC8_TABLE = np.frombuffer(CRC8_TABLE, dtype=np.uint8)
+_UNSIGNED = np.array([not signed for _, signed, _ in SEN5X_MEASURED_VALUES])
+_SCALE = np.array([scale for _, _, scale in SEN5X_MEASURED_VALUES],
+                  dtype=np.float64)
+
+
+def _as_uint8(buffer):
+    if isinstance(buffer, np.ndarray):
+        return np.ascontiguousarray(buffer, dtype=np.uint8).reshape(-1)
+    # bytes, bytearray, memoryview, mmap, ...
+    return np.frombuffer(buffer, dtype=np.uint8)
+
+
+def decode_sen5x_measured_values(buffer, dtype=np.float64):
+    """
+        Decodes N stacked 0x03C4 frames.
+        :param buffer:
+            Contiguous buffer of N * 24 bytes, e.g. a bytearray the received
+            frames were appended to, or a NumPy uint8 array.
+        :param dtype:
+            Floating point type of the returned columns.
+        :return:
+            Dictionary with one array of length N per measured value (pm1p0,
+            pm2p5, pm4p0, pm10p0, humidity, temperature, voc, nox) and the
+            boolean array "crc_ok" which is False for frames with at least
+            one corrupted word.
+    """
+    raw = _as_uint8(buffer)
+    if raw.size % SEN5X_FRAME_SIZE:
+        raise ValueError("buffer size {} is not a multiple of {}".format(
+            raw.size, SEN5X_FRAME_SIZE))
+    triplets = raw.reshape(-1, len(SEN5X_MEASURED_VALUES), 3)
+    msb = triplets[:, :, 0]
+    lsb = triplets[:, :, 1]
+
+    crc_ok = _CRC8_TABLE[_CRC8_TABLE[msb ^ CRC8_INIT] ^ lsb] == triplets[:, :, 2]
+
+    words = msb.astype(np.uint16) << 8 | lsb
+    # 0xFFFF marks unavailable unsigned values, 0x7FFF signed ones
+    available = crc_ok & (words != np.where(_UNSIGNED, 0xFFFF, 0x7FFF))
+    values = np.where(_UNSIGNED, words, words.view(np.int16)) / _SCALE
+    values = np.where(available, values, np.nan)
+    # one contiguous row per measured value
+    columns = np.ascontiguousarray(values.T, dtype=dtype)
+
+    result = {}
+    for i, (name, _, _) in enumerate(SEN5X_MEASURED_VALUES):
+        result[name] = columns[i]
+    result["crc_ok"] = crc_ok.all(axis=1)
+    return result
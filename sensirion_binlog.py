@@ -0,0 +1,282 @@
+# Copyright (c) 2022, Sensirion AG
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# # Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# # Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# # Neither the name of Sensirion AG nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+# (c) Copyright 2022 Sensirion AG, Switzerland
+
+# Append-only binary log of raw sensor samples
+#
+# Every sample is stored as a fixed width little endian record: timestamp
+# (float64, seconds), device id (uint16) and a fixed number of raw 16 bit
+# words as received from the sensor. Records are appended to segment files
+# of a limited size, each starting with a small header. Writing needs no
+# formatting and readers can memory-map the segments into NumPy without
+# copying. The command line converts a log to CSV or TSV:
+#
+#   python3 sensirion_binlog.py log_directory --tsv > samples.tsv
+
+import argparse
+import os
+import struct
+import sys
+
+MAGIC = b"SNSRLOG1"
+# magic, number of words per record
+HEADER = struct.Struct("<8sH6x")
+HEADER_SIZE = HEADER.size
+SEGMENT_PATTERN = "samples-{:06d}.bin"
+
+
+def record_struct(words_per_record):
+    return struct.Struct("<dH{}H".format(words_per_record))
+
+
+def numpy_dtype(words_per_record):
+    """
+        Structured NumPy dtype of a record, with the fields timestamp,
+        device and words.
+    """
+    import numpy as np
+    return np.dtype([("timestamp", "<f8"), ("device", "<u2"),
+                     ("words", "<u2", (words_per_record,))])
+
+
+class SampleLogWriter(object):
+    """
+        Appends records to the segment files in a directory.
+        :param str directory:
+            Created if it does not exist. Logging continues in a new segment
+            after the existing ones.
+        :param int words_per_record:
+            Number of raw words per record, e.g. 8 for SEN5x measured
+            values. Shorter samples are padded with zeros.
+        :param int segment_records:
+            Number of records after which a new segment is started.
+        :param int buffer_records:
+            Number of records collected in memory before they are written.
+    """
+
+    def __init__(self, directory, words_per_record=8, segment_records=1000000,
+                 buffer_records=64):
+        self.directory = directory
+        self.words_per_record = words_per_record
+        self.segment_records = segment_records
+        self._record = record_struct(words_per_record)
+        self._buffer = bytearray(self._record.size * buffer_records)
+        self._buffered = 0
+        self._padding = (0,) * words_per_record
+        os.makedirs(directory, exist_ok=True)
+        # continue behind the newest segment, older ones may have been
+        # removed
+        paths = segment_paths(directory)
+        self._segment = segment_index(paths[-1]) + 1 if paths else 0
+        self._file = None
+        self._records_in_segment = 0
+
+    def _open_segment(self):
+        path = os.path.join(self.directory,
+                            SEGMENT_PATTERN.format(self._segment))
+        self._segment += 1
+        self._file = open(path, "xb")
+        self._file.write(HEADER.pack(MAGIC, self.words_per_record))
+        self._records_in_segment = 0
+
+    def append(self, timestamp, device, words):
+        """
+            Appends one sample.
+            :param float timestamp:
+                e.g. time.time() or time.monotonic().
+            :param int device:
+                Id of the sensor, 0 to 65535.
+            :param words:
+                Raw words, e.g. the array returned by the drivers.
+        """
+        n = len(words)
+        if n < self.words_per_record:
+            words = tuple(words) + self._padding[n:]
+        elif n > self.words_per_record:
+            raise ValueError("sample has more than {} words".format(
+                self.words_per_record))
+        self._record.pack_into(self._buffer, self._buffered * self._record.size,
+                               timestamp, device, *words)
+        self._buffered += 1
+        if self._buffered * self._record.size == len(self._buffer):
+            self.flush()
+
+    def flush(self):
+        """
+            Writes the buffered records to the segment files.
+        """
+        size = self._record.size
+        start = 0
+        while start < self._buffered:
+            if self._file is None or \
+                    self._records_in_segment == self.segment_records:
+                if self._file is not None:
+                    self._file.close()
+                self._open_segment()
+            n = min(self._buffered - start,
+                    self.segment_records - self._records_in_segment)
+            self._file.write(memoryview(self._buffer)[start * size:(start + n) * size])
+            self._records_in_segment += n
+            start += n
+        self._buffered = 0
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self):
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def segment_index(path):
+    """
+        Returns the number of a segment file, e.g. 12 for samples-000012.bin.
+    """
+    return int(os.path.basename(path)[len("samples-"):-len(".bin")])
+
+
+def segment_paths(directory):
+    """
+        Returns the segment files of a log in chronological order.
+    """
+    names = [name for name in os.listdir(directory)
+             if name.startswith("samples-") and name.endswith(".bin") and
+             name[len("samples-"):-len(".bin")].isdigit()]
+    paths = [os.path.join(directory, name) for name in names]
+    return sorted(paths, key=segment_index)
+
+
+def _read_header(f, path):
+    magic, words_per_record = HEADER.unpack(f.read(HEADER_SIZE))
+    if magic != MAGIC:
+        raise ValueError("{} is not a sample log segment".format(path))
+    return words_per_record
+
+
+def load_segment(path):
+    """
+        Memory-maps one segment as structured NumPy array without copying
+        the data. An incomplete last record, e.g. after a power loss, is
+        ignored.
+    """
+    import numpy as np
+    with open(path, "rb") as f:
+        words_per_record = _read_header(f, path)
+    dtype = numpy_dtype(words_per_record)
+    count = (os.path.getsize(path) - HEADER_SIZE) // dtype.itemsize
+    if count == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", offset=HEADER_SIZE,
+                     shape=(count,))
+
+
+def load(directory):
+    """
+        Memory-maps all segments of a log.
+        :return:
+            List of structured arrays, one per segment, see load_segment().
+    """
+    return [load_segment(path) for path in segment_paths(directory)]
+
+
+def records(directory):
+    """
+        Iterates over all records of a log without NumPy.
+        :return:
+            Generator of tuples (timestamp, device, words).
+    """
+    for path in segment_paths(directory):
+        with open(path, "rb") as f:
+            record = record_struct(_read_header(f, path))
+            while True:
+                data = f.read(record.size)
+                if len(data) < record.size:
+                    break
+                values = record.unpack(data)
+                yield values[0], values[1], values[2:]
+
+
+def convert(directory, output, delimiter=","):
+    """
+        Writes a log as CSV (or TSV with delimiter "\\t") with the columns
+        timestamp, device, word0, word1, ...
+        :raises ValueError:
+            If the segments hold different numbers of words per record,
+            which do not fit under one header.
+    """
+    words = set()
+    for path in segment_paths(directory):
+        with open(path, "rb") as f:
+            words.add(_read_header(f, path))
+    if len(words) > 1:
+        raise ValueError("segments of {} hold {} words per record, convert "
+                         "them separately".format(
+                             directory, " and ".join(
+                                 str(n) for n in sorted(words))))
+    header_written = False
+    for timestamp, device, words in records(directory):
+        if not header_written:
+            columns = ["timestamp", "device"] + \
+                ["word{}".format(i) for i in range(len(words))]
+            output.write(delimiter.join(columns) + "\n")
+            header_written = True
+        output.write("{:.6f}{}{}{}{}\n".format(
+            timestamp, delimiter, device, delimiter,
+            delimiter.join(str(word) for word in words)))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Convert a binary sample log to CSV or TSV")
+    parser.add_argument("directory")
+    parser.add_argument("--tsv", action="store_true",
+                        help="tab separated instead of comma separated")
+    parser.add_argument("--output", help="output file, stdout if omitted")
+    args = parser.parse_args()
+    delimiter = "\t" if args.tsv else ","
+    try:
+        if args.output:
+            with open(args.output, "w") as output:
+                convert(args.directory, output, delimiter)
+        else:
+            convert(args.directory, sys.stdout, delimiter)
+    except ValueError as error:
+        parser.exit(1, "{}\n".format(error))
+
+
+if __name__ == "__main__":
+    main()
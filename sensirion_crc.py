@@ -0,0 +1,184 @@
+# Copyright (c) 2022, Sensirion AG
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# # Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# # Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# # Neither the name of Sensirion AG nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+# (c) Copyright 2022 Sensirion AG, Switzerland
+
+# CRC-8 helpers shared by the Sensirion I2C examples
+#
+# All Sensirion sensors in this repository protect every 16 bit word on the
+# bus with a CRC-8 (polynomial 0x31, x^8 + x^5 + x^4 + 1, init 0xFF, no final
+# XOR). Instead of shifting bit by bit, the checksum is calculated with a
+# precomputed 256 entry table, i.e. one lookup per byte.
+#
+# Copy this file next to the example scripts which import it.
+
+CRC8_POLYNOMIAL = 0x31
+CRC8_INIT = 0xFF
+
+
+def _crc8_table():
+    table = []
+    for value in range(256):
+        crc = value
+        for i in range(8):
+            if crc & 0x80:
+                crc = ((crc << 1) ^ CRC8_POLYNOMIAL) & 0xFF
+            else:
+                crc = (crc << 1) & 0xFF
+        table.append(crc)
+    return bytes(table)
+
+
+# CRC8_TABLE[x] is the CRC register after shifting the byte x through it
+CRC8_TABLE = _crc8_table()
+
+
+class CrcError(ValueError):
+    """
+        Raised if a word received from the sensor fails its CRC check.
+    """
+
+    def __init__(self, word_index, received, expected):
+        super().__init__(
+            "CRC mismatch in word {}: received 0x{:02X}, expected 0x{:02X}"
+            .format(word_index, received, expected))
+        self.word_index = word_index
+        self.received = received
+        self.expected = expected
+
+
+def crc8(data):
+    """
+        Calculates the CRC-8 of the given bytes.
+        :param data:
+            Iterable of byte values (e.g. bytes, list of int).
+        :return:
+            The CRC as int.
+    """
+    table = CRC8_TABLE
+    crc = CRC8_INIT
+    for value in data:
+        crc = table[crc ^ value]
+    return crc
+
+
+def crc8_word(msb, lsb):
+    """
+        Calculates the CRC-8 of a single 16 bit word given as MSB and LSB.
+    """
+    return CRC8_TABLE[CRC8_TABLE[CRC8_INIT ^ msb] ^ lsb]
+
+
+# name used by the example scripts
+CrcCalculator = crc8
+
+
+def frame_bytes(frame):
+    """
+        Returns the raw bytes of a frame received from the sensor.
+        :param frame:
+            An smbus2 i2c_msg, bytes, bytearray, memoryview, list of int or
+            one dimensional NumPy array holding one byte per element.
+    """
+    if isinstance(frame, (bytes, bytearray)):
+        return frame
+    if getattr(frame, "dtype", None) is not None and frame.dtype.itemsize != 1:
+        frame = frame.astype("uint8")
+    # i2c_msg implements __bytes__, NumPy arrays the buffer protocol
+    return bytes(frame)
+
+
+def _check_length(data):
+    if len(data) % 3:
+        raise ValueError(
+            "frame length {} is not a multiple of 3 (MSB, LSB, CRC)"
+            .format(len(data)))
+
+
+def verify_frame(frame):
+    """
+        Checks the CRC of every word of a frame in one call.
+        :param frame:
+            Sequence of MSB, LSB, CRC triplets, see frame_bytes() for the
+            accepted types.
+        :return:
+            True if all CRCs match, False otherwise.
+    """
+    data = frame_bytes(frame)
+    _check_length(data)
+    table = CRC8_TABLE
+    for i in range(0, len(data), 3):
+        if table[table[CRC8_INIT ^ data[i]] ^ data[i + 1]] != data[i + 2]:
+            return False
+    return True
+
+
+def unpack_words(frame):
+    """
+        Checks the CRCs of a frame and merges MSB and LSB to 16 bit words.
+        :param frame:
+            Sequence of MSB, LSB, CRC triplets, see frame_bytes() for the
+            accepted types.
+        :return:
+            List of unsigned 16 bit words.
+        :raises CrcError:
+            If one of the words fails the CRC check.
+    """
+    data = frame_bytes(frame)
+    _check_length(data)
+    table = CRC8_TABLE
+    words = []
+    for i in range(0, len(data), 3):
+        msb = data[i]
+        lsb = data[i + 1]
+        crc = table[table[CRC8_INIT ^ msb] ^ lsb]
+        if crc != data[i + 2]:
+            raise CrcError(i // 3, data[i + 2], crc)
+        words.append(msb << 8 | lsb)
+    return words
+
+
+def pack_words(words):
+    """
+        Splits 16 bit words into MSB, LSB and appends the CRC to each word,
+        ready to be sent after a command.
+        :param words:
+            Iterable of 16 bit words, negative values are sent as two's
+            complement.
+        :return:
+            List of byte values.
+    """
+    data = []
+    for word in words:
+        msb = (word >> 8) & 0xFF
+        lsb = word & 0xFF
+        data.append(msb)
+        data.append(lsb)
+        data.append(crc8_word(msb, lsb))
+    return data
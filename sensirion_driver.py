@@ -0,0 +1,398 @@
+# Copyright (c) 2022, Sensirion AG
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# # Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# # Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# # Neither the name of Sensirion AG nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+# (c) Copyright 2022 Sensirion AG, Switzerland
+
+# Allocation free drivers for the Sensirion I2C sensors in this repository
+#
+# The example scripts create new i2c_msg objects for every transfer and
+# access the received bytes one by one through msg.buf. The classes below
+# allocate the write and read message of each command only once per device.
+# Received frames are checked and merged into 16 bit words through a
+# memoryview on the read buffer, so the steady state loop does not create
+# any objects which outlive a sample.
+#
+# Usage:
+#
+#   bus = SMBus(1)
+#   sen5x = Sen5x(bus)
+#   sen5x.start_measurement()
+#   words = sen5x.read_measured_values()
+
+import sys
+import time
+from array import array
+from ctypes import POINTER, c_char, cast
+
+from smbus2 import i2c_msg
+
+from sensirion_crc import CRC8_INIT, CRC8_TABLE, CrcError
+
+# offsets of the most and least significant byte within a native 16 bit word
+_MSB, _LSB = (1, 0) if sys.byteorder == "little" else (0, 1)
+
+
+class Command(object):
+    """
+        Preallocated messages and result buffer of one sensor command.
+        :param int address:
+            I2C address of the sensor.
+        :param code:
+            16 bit command code, None for sensors which are read without
+            sending a command first (e.g. LD20 in continuous mode).
+        :param float delay:
+            Execution time of the command in seconds, waited between
+            sending the command and reading the response.
+        :param int read_words:
+            Number of 16 bit words the sensor responds with.
+    """
+
+    __slots__ = ("code", "delay", "write_msg", "read_msg", "read_buffer",
+                 "words", "word_bytes")
+
+    def __init__(self, address, code, delay, read_words=0):
+        self.code = code
+        self.delay = delay
+        self.write_msg = None
+        if code is not None:
+            self.write_msg = i2c_msg.write(address, [code >> 8, code & 0xFF])
+        self.read_msg = None
+        self.read_buffer = None
+        self.words = array("H", [0] * read_words)
+        self.word_bytes = memoryview(self.words).cast("B")
+        if read_words:
+            length = read_words * 3
+            self.read_msg = i2c_msg.read(address, length)
+            # the ctypes buffer the read message points to, seen as bytes
+            raw = cast(self.read_msg.buf, POINTER(c_char * length)).contents
+            self.read_buffer = memoryview(raw).cast("B")
+
+    def decode(self):
+        """
+            Checks the CRCs of the received frame and stores the words in
+            self.words.
+            :raises CrcError:
+                If one of the words fails the CRC check.
+        """
+        # Stores the received bytes into the words instead of computing
+        # msb << 8 | lsb, which creates an int object per word, and loops
+        # with while instead of creating a range iterator per call.
+        table = CRC8_TABLE
+        buffer = self.read_buffer
+        word_bytes = self.word_bytes
+        length = len(buffer)
+        i = 0
+        j = 0
+        while i < length:
+            msb = buffer[i]
+            lsb = buffer[i + 1]
+            crc = table[table[CRC8_INIT ^ msb] ^ lsb]
+            if crc != buffer[i + 2]:
+                raise CrcError(i // 3, buffer[i + 2], crc)
+            word_bytes[j + _MSB] = msb
+            word_bytes[j + _LSB] = lsb
+            i += 3
+            j += 2
+        return self.words
+
+
+class SensirionI2cDevice(object):
+    """
+        Base class of the drivers, holds the preallocated commands.
+        :param bus:
+            An smbus2.SMBus or any object implementing i2c_rdwr().
+        :param int address:
+            I2C address of the sensor.
+        :param sleep:
+            Function used to wait for the command execution, time.sleep by
+            default.
+    """
+
+    ADDRESS = None
+
+    def __init__(self, bus, address=None, sleep=time.sleep):
+        self.bus = bus
+        self.address = self.ADDRESS if address is None else address
+        self.sleep = sleep
+        self._commands = {}
+
+    def command(self, code, delay, read_words=0):
+        """
+            Returns the preallocated command for the given code, delay and
+            response length, created on first use. The same code used with
+            another delay or length, e.g. send() and read() of one code, gets
+            a command of its own.
+        """
+        key = (code, delay, read_words)
+        command = self._commands.get(key)
+        if command is None:
+            command = Command(self.address, code, delay, read_words)
+            self._commands[key] = command
+        return command
+
+    def execute(self, command):
+        """
+            Sends the command, waits for its execution and reads and checks
+            the response.
+            :return:
+                The array of received words, it is overwritten by the next
+                execution of the same command.
+        """
+        if command.write_msg is not None:
+            self.bus.i2c_rdwr(command.write_msg)
+            if command.delay:
+                self.sleep(command.delay)
+        if command.read_msg is None:
+            return command.words
+        self.bus.i2c_rdwr(command.read_msg)
+        return command.decode()
+
+    def measurement_command(self):
+        """
+            Returns the Command which reads the measured values, used by
+            read_measured_values() and by schedulers which split the command
+            into its write and read phase.
+        """
+        raise NotImplementedError()
+
+    def send(self, code, delay=0.0):
+        """
+            Sends a command without response.
+        """
+        return self.execute(self.command(code, delay))
+
+    def read(self, code, read_words, delay=0.0):
+        """
+            Sends a command and returns the received words.
+        """
+        return self.execute(self.command(code, delay, read_words))
+
+    def write(self, code, words, delay=0.0):
+        """
+            Sends a command followed by parameter words. Not meant for the
+            measurement loop, the message is created on every call.
+        """
+        data = [code >> 8, code & 0xFF]
+        for word in words:
+            msb = (word >> 8) & 0xFF
+            lsb = word & 0xFF
+            data += [msb, lsb, CRC8_TABLE[CRC8_TABLE[CRC8_INIT ^ msb] ^ lsb]]
+        self.bus.i2c_rdwr(i2c_msg.write(self.address, data))
+        if delay:
+            self.sleep(delay)
+
+
+_NAN = float("nan")
+
+
+def to_signed(word):
+    """
+        Converts an unsigned 16 bit word to a signed integer.
+    """
+    return word - 0x10000 if word & 0x8000 else word
+
+
+class Sen5x(SensirionI2cDevice):
+    """
+        Driver for the SEN50, SEN54 and SEN55 sensor modules.
+    """
+
+    ADDRESS = 0x69
+
+    def start_measurement(self):
+        self.send(0x0021, 0.05)
+
+    def start_measurement_rht_gas_only(self):
+        self.send(0x0037, 0.05)
+
+    def stop_measurement(self):
+        self.send(0x0104, 0.2)
+
+    def measurement_command(self):
+        return self.command(0x03C4, 0.02, 8)
+
+    def read_measured_values(self):
+        """
+            :return:
+                Raw words pm1p0, pm2p5, pm4p0, pm10p0, humidity,
+                temperature, voc, nox, see decode_measured_values().
+        """
+        return self.execute(self.measurement_command())
+
+    def read_data_ready(self):
+        """
+            :return:
+                True if new measured values are available.
+        """
+        return bool(self.read(0x0202, 1, 0.02)[0] & 0x01)
+
+    def read_serial_number(self):
+        """
+            :return:
+                Serial number as string.
+        """
+        words = self.read(0xD033, 16, 0.02)
+        data = bytearray()
+        for word in words:
+            data += bytes((word >> 8, word & 0xFF))
+        return data.split(b"\0")[0].decode("ascii")
+
+    def read_device_status(self):
+        """
+            :return:
+                Device status register as 32 bit integer.
+        """
+        words = self.read(0xD206, 2, 0.02)
+        return words[0] << 16 | words[1]
+
+    def device_reset(self):
+        """
+            Resets the sensor, all parameters return to their defaults.
+        """
+        self.send(0xD304, 0.1)
+
+    def read_raw_values(self):
+        """
+            :return:
+                Raw words humidity, temperature, voc ticks, nox ticks.
+        """
+        return self.read(0x03D2, 4, 0.02)
+
+    @staticmethod
+    def decode_measured_values(words):
+        """
+            Scales the words of read_measured_values() according to the
+            datasheet.
+            :return:
+                Tuple pm1p0, pm2p5, pm4p0, pm10p0 in ug/m3, humidity in %RH,
+                temperature in degC, voc and nox index. Values the sensor
+                marks as not available (0xFFFF, 0x7FFF) are NaN.
+        """
+        pm1p0, pm2p5, pm4p0, pm10p0, humidity, temperature, voc, nox = words
+        nan = _NAN
+        return (nan if pm1p0 == 0xFFFF else pm1p0 / 10,
+                nan if pm2p5 == 0xFFFF else pm2p5 / 10,
+                nan if pm4p0 == 0xFFFF else pm4p0 / 10,
+                nan if pm10p0 == 0xFFFF else pm10p0 / 10,
+                nan if humidity == 0x7FFF else to_signed(humidity) / 100,
+                nan if temperature == 0x7FFF else to_signed(temperature) / 200,
+                nan if voc == 0x7FFF else to_signed(voc) / 10,
+                nan if nox == 0x7FFF else to_signed(nox) / 10)
+
+
+class Scd4x(SensirionI2cDevice):
+    """
+        Driver for the SCD40 and SCD41 CO2 sensors.
+    """
+
+    ADDRESS = 0x62
+
+    def start_periodic_measurement(self):
+        self.send(0x21B1)
+
+    # common name used by all drivers
+    start_measurement = start_periodic_measurement
+
+    def stop_periodic_measurement(self):
+        self.send(0x3F86, 0.5)
+
+    stop_measurement = stop_periodic_measurement
+
+    def read_data_ready(self):
+        """
+            :return:
+                True if new measured values are available.
+        """
+        # the least significant 11 bits are 0 if no data is ready
+        return bool(self.read(0xE4B8, 1, 0.001)[0] & 0x07FF)
+
+    def measurement_command(self):
+        return self.command(0xEC05, 0.001, 3)
+
+    def read_measured_values(self):
+        """
+            :return:
+                Raw words co2, temperature, humidity, see
+                decode_measured_values().
+        """
+        return self.execute(self.measurement_command())
+
+    @staticmethod
+    def decode_measured_values(words):
+        """
+            :return:
+                Tuple co2 in ppm, temperature in degC, humidity in %RH.
+        """
+        return (words[0], -45 + 175 * words[1] / 65536.,
+                100 * words[2] / 65536.)
+
+
+class Ld20(SensirionI2cDevice):
+    """
+        Driver for the LD20 liquid flow sensor.
+    """
+
+    ADDRESS = 0x08
+
+    # scale factors from datasheet section 4.5.1
+    SCALE_FACTOR_FLOW = 1200.0
+    SCALE_FACTOR_TEMP = 200.0
+
+    def start_continuous_measurement(self):
+        """
+            Starts the continuous measurement for H2O.
+        """
+        self.send(0x3608)
+
+    start_measurement = start_continuous_measurement
+
+    def stop_continuous_measurement(self):
+        self.send(0x3FF9)
+
+    stop_measurement = stop_continuous_measurement
+
+    def measurement_command(self):
+        # in continuous mode the results are read without a command
+        return self.command(None, 0.0, 2)
+
+    def read_measured_values(self):
+        """
+            :return:
+                Raw words flow, temperature, see decode_measured_values().
+        """
+        return self.execute(self.measurement_command())
+
+    @classmethod
+    def decode_measured_values(cls, words):
+        """
+            :return:
+                Tuple flow in ml/min, temperature in degC.
+        """
+        return (to_signed(words[0]) / cls.SCALE_FACTOR_FLOW,
+                to_signed(words[1]) / cls.SCALE_FACTOR_TEMP)
@@ -0,0 +1,292 @@
+# Copyright (c) 2022, Sensirion AG
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# # Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# # Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# # Neither the name of Sensirion AG nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+# (c) Copyright 2022 Sensirion AG, Switzerland
+
+# Adaptive duty cycling between the SEN5x full and RHT/gas-only mode
+#
+# In RHT/gas-only mode (0x0037) the fan and the laser of the SEN5x are off,
+# which saves about 90 % of the supply current, but no PM values are
+# measured. DutyCycleController starts in full mode (0x0021) and switches
+# to gas-only mode as soon as the PM readings have settled and stay within
+# a tolerance. It switches back to full mode when
+#
+# - the VOC or NOx index moved by more than a threshold since the switch,
+# - the sensor ran max_gas_only_time seconds in gas-only mode,
+# - a schedule function asks for PM data, or request_pm() is called.
+#
+# Switching between the two measurement modes directly requires firmware
+# 2.0 or later. The controller estimates the energy and the bus load per
+# hour and compares them with measuring PM all the time.
+#
+# Usage:
+#
+#   controller = DutyCycleController(Sen5x(SMBus(1)))
+#   controller.run(duration=3600, callback=print_sample)
+#   print(controller.statistics())
+
+import math
+import time
+
+FULL = "full"
+GAS_ONLY = "gas_only"
+
+# typical supply currents of the SEN55 at 5 V according to the datasheet
+SUPPLY_VOLTAGE = 5.0
+SUPPLY_CURRENT = {FULL: 0.063, GAS_ONLY: 0.0068}
+
+# bytes on the bus including the address bytes: a command is the address
+# and 2 bytes, reading the 8 measured values the address and 24 bytes
+COMMAND_BYTES = 3
+READ_BYTES = COMMAND_BYTES + 25
+BYTE_TIME_100KHZ = 90e-6
+
+
+class DutyCycleController(object):
+    """
+        Switches a SEN5x between full and gas-only mode.
+        :param sen5x:
+            Sen5x driver from sensirion_driver.py, in idle mode.
+        :param float period:
+            Seconds between two reads.
+        :param float gas_only_period:
+            Seconds between two reads in gas-only mode, the sensor updates
+            the VOC and NOx index on its own, so reading less often only
+            delays the detection of a change. Same as period by default.
+        :param float settle_time:
+            Seconds after the start of the fan during which the PM values
+            are not used to decide about stability.
+        :param int stable_samples:
+            Number of consecutive PM2.5 readings which have to agree.
+        :param float pm_tolerance:
+            Allowed spread of these readings in ug/m3, at least
+            pm_relative_tolerance times their mean.
+        :param float voc_delta:
+            VOC index change which ends the gas-only mode.
+        :param float nox_delta:
+            NOx index change which ends the gas-only mode.
+        :param float max_gas_only_time:
+            Longest time in gas-only mode in seconds, None for no limit.
+        :param float max_full_time:
+            Longest time in full mode in seconds, the sensor then switches
+            to gas-only mode even if the PM values did not settle. None for
+            no limit.
+        :param schedule:
+            Called as schedule(now) in gas-only mode, returning True starts
+            a PM measurement, e.g. at fixed times of the day.
+        :ivar dict mode_time:
+            Mode -> seconds spent in the mode.
+        :ivar int switches:
+            Number of mode changes.
+        :ivar last_pm:
+            Last settled PM values (pm1p0, pm2p5, pm4p0, pm10p0), None
+            before the first one.
+    """
+
+    def __init__(self, sen5x, period=1.0, gas_only_period=None,
+                 settle_time=30.0,
+                 stable_samples=30, pm_tolerance=1.0,
+                 pm_relative_tolerance=0.05, voc_delta=30.0, nox_delta=20.0,
+                 max_gas_only_time=900.0, max_full_time=None, schedule=None,
+                 clock=time.monotonic, sleep=time.sleep):
+        self.sen5x = sen5x
+        self.period = period
+        self.gas_only_period = period if gas_only_period is None \
+            else gas_only_period
+        self.settle_time = settle_time
+        self.stable_samples = stable_samples
+        self.pm_tolerance = pm_tolerance
+        self.pm_relative_tolerance = pm_relative_tolerance
+        self.voc_delta = voc_delta
+        self.nox_delta = nox_delta
+        self.max_gas_only_time = max_gas_only_time
+        self.max_full_time = max_full_time
+        self.schedule = schedule
+        self.clock = clock
+        self.sleep = sleep
+        self.mode = None
+        self.mode_time = {FULL: 0.0, GAS_ONLY: 0.0}
+        self.switches = 0
+        self.reads = 0
+        self.commands = 0
+        self.reasons = {}
+        self.last_pm = None
+        self.last_pm_time = None
+        self._since = None
+        self._pm2p5 = []
+        self._reference = None
+        self._pm_requested = False
+
+    def _switch(self, mode, reason, now):
+        if self.mode is not None:
+            self.mode_time[self.mode] += now - self._since
+            self.switches += 1
+            self.reasons[reason] = self.reasons.get(reason, 0) + 1
+        if mode == FULL:
+            self.sen5x.start_measurement()
+        else:
+            self.sen5x.start_measurement_rht_gas_only()
+        self.commands += 1
+        self.mode = mode
+        self._since = now
+        self._pm2p5 = []
+        self._pm_requested = False
+
+    def request_pm(self):
+        """
+            Switches to full mode with the next sample.
+        """
+        self._pm_requested = True
+
+    def _pm_stable(self):
+        values = self._pm2p5[-self.stable_samples:]
+        if len(values) < self.stable_samples:
+            return False
+        mean = sum(values) / len(values)
+        tolerance = max(self.pm_tolerance, self.pm_relative_tolerance * mean)
+        return max(values) - min(values) <= tolerance
+
+    def _changed(self, value, reference, delta):
+        return not math.isnan(value) and not math.isnan(reference) and \
+            abs(value - reference) >= delta
+
+    def update(self, values, now):
+        """
+            Decides about the mode after a sample.
+            :param values:
+                Decoded values, see Sen5x.decode_measured_values().
+            :return:
+                The reason of a mode change, None if the mode stays.
+        """
+        elapsed = now - self._since
+        voc, nox = values[6], values[7]
+        if self.mode == FULL:
+            if elapsed >= self.settle_time and not math.isnan(values[1]):
+                self._pm2p5.append(values[1])
+                del self._pm2p5[:-self.stable_samples]
+                if self._pm_stable():
+                    self.last_pm = values[:4]
+                    self.last_pm_time = now
+                    reason = "pm_stable"
+                elif self.max_full_time is not None and \
+                        elapsed >= self.max_full_time:
+                    reason = "max_full_time"
+                else:
+                    return None
+                self._switch(GAS_ONLY, reason, now)
+                self._reference = (voc, nox)
+                return reason
+            return None
+        # the indices are not available during the first minute
+        reference_voc, reference_nox = self._reference
+        if math.isnan(reference_voc):
+            reference_voc = voc
+        if math.isnan(reference_nox):
+            reference_nox = nox
+        self._reference = (reference_voc, reference_nox)
+        if self._changed(voc, reference_voc, self.voc_delta):
+            reason = "voc_delta"
+        elif self._changed(nox, reference_nox, self.nox_delta):
+            reason = "nox_delta"
+        elif self._pm_requested:
+            reason = "requested"
+        elif self.max_gas_only_time is not None and \
+                elapsed >= self.max_gas_only_time:
+            reason = "max_gas_only_time"
+        elif self.schedule is not None and self.schedule(now):
+            reason = "schedule"
+        else:
+            return None
+        self._switch(FULL, reason, now)
+        return reason
+
+    def run(self, duration=None, samples=None, callback=None):
+        """
+            Reads the sensor on absolute deadlines and controls the mode.
+            :param callback:
+                Called as callback(controller, values, timestamp) for every
+                sample, the PM values are NaN in gas-only mode.
+        """
+        start = self.clock()
+        if self.mode is None:
+            self._switch(FULL, None, start)
+        deadline = start + self.period
+        count = 0
+        while True:
+            now = self.clock()
+            if deadline > now:
+                self.sleep(deadline - now)
+                now = self.clock()
+            if duration is not None and now - start >= duration:
+                break
+            values = self.sen5x.decode_measured_values(
+                self.sen5x.read_measured_values())
+            self.reads += 1
+            if callback is not None:
+                callback(self, values, now)
+            self.update(values, now)
+            count += 1
+            if samples is not None and count >= samples:
+                break
+            if self.mode == FULL:
+                deadline += self.period
+            else:
+                deadline += self.gas_only_period
+
+    def statistics(self):
+        """
+            :return:
+                Time share of the modes, energy in Wh per hour and bus load
+                in bytes and seconds at 100 kHz per hour, each compared with
+                measuring PM all the time.
+        """
+        mode_time = dict(self.mode_time)
+        if self.mode is not None:
+            mode_time[self.mode] += self.clock() - self._since
+        total = sum(mode_time.values())
+        if not total:
+            return {}
+        per_hour = 3600.0 / total
+        energy = sum(SUPPLY_VOLTAGE * SUPPLY_CURRENT[mode] * seconds
+                     for mode, seconds in mode_time.items()) / 3600.0
+        always_on_energy = \
+            SUPPLY_VOLTAGE * SUPPLY_CURRENT[FULL] * total / 3600.0
+        bus_bytes = self.reads * READ_BYTES + self.commands * COMMAND_BYTES
+        always_on_bytes = total / self.period * READ_BYTES + COMMAND_BYTES
+        return {
+            "full_share": mode_time[FULL] / total,
+            "switches_per_hour": self.switches * per_hour,
+            "reasons": dict(self.reasons),
+            "energy_wh_per_hour": energy * per_hour,
+            "always_on_energy_wh_per_hour": always_on_energy * per_hour,
+            "energy_saving": 1.0 - energy / always_on_energy,
+            "bus_bytes_per_hour": bus_bytes * per_hour,
+            "always_on_bus_bytes_per_hour": always_on_bytes * per_hour,
+            "bus_time_per_hour": bus_bytes * per_hour * BYTE_TIME_100KHZ,
+        }
@@ -0,0 +1,329 @@
+# Copyright (c) 2022, Sensirion AG
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# # Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# # Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# # Neither the name of Sensirion AG nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+# (c) Copyright 2022 Sensirion AG, Switzerland
+
+# OpenMetrics exporter for the latest readings and the bus statistics
+#
+# MetricsExporter serves the latest measured values of the sensors of a
+# BusScheduler (or MuxScheduler) together with the sample, missed cycle,
+# CRC and I/O error counters and a histogram of the i2c_rdwr() latency on
+# http://<host>:9100/metrics. The response body is rendered after every
+# sample in the acquisition thread and, so the error counters and the
+# latencies stay current while a sensor or the bus fails and no samples
+# arrive, once per refresh_interval in a background thread. The HTTP
+# threads only send the last rendered bytes, so scraping costs the
+# acquisition nothing, however often it happens.
+#
+# Usage:
+#
+#   exporter = MetricsExporter(port=9100)
+#   bus = exporter.timed_bus(SMBus(1), "1")
+#   scheduler = BusScheduler(bus)
+#   scheduler.add(Sen5x(bus), period=1.0)
+#   exporter.watch(scheduler)
+#   exporter.start()
+#   scheduler.run()
+
+import bisect
+import math
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from sensirion_driver import Ld20, Scd4x, Sen5x
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# upper bounds of the latency histogram in seconds, one 2 byte write takes
+# about 0.3 ms at 100 kHz, a 24 byte read about 2.3 ms
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1)
+
+# family name -> (type, unit, help), names end with their unit
+FAMILIES = {
+    "sensirion_pm_micrograms_per_cubic_meter": (
+        "gauge", "micrograms_per_cubic_meter", "Mass concentration"),
+    "sensirion_humidity_percent": ("gauge", "percent", "Relative humidity"),
+    "sensirion_temperature_celsius": ("gauge", "celsius", "Temperature"),
+    "sensirion_voc_index": ("gauge", "", "VOC index"),
+    "sensirion_nox_index": ("gauge", "", "NOx index"),
+    "sensirion_co2_ppm": ("gauge", "ppm", "CO2 concentration"),
+    "sensirion_flow_milliliters_per_minute": (
+        "gauge", "milliliters_per_minute", "Liquid flow"),
+    "sensirion_samples": ("counter", "", "Samples read"),
+    "sensirion_missed_cycles": (
+        "counter", "", "Cycles skipped because the bus was busy"),
+    "sensirion_crc_errors": (
+        "counter", "", "Responses which failed the CRC check"),
+    "sensirion_io_errors": (
+        "counter", "", "Transfers which raised an OSError"),
+    "sensirion_i2c_rdwr_latency_seconds": (
+        "histogram", "seconds", "Duration of i2c_rdwr() calls"),
+}
+
+# decoded value index -> (family, additional labels) per driver
+VALUES = {
+    Sen5x: ((0, "sensirion_pm_micrograms_per_cubic_meter", 'size="1.0"'),
+            (1, "sensirion_pm_micrograms_per_cubic_meter", 'size="2.5"'),
+            (2, "sensirion_pm_micrograms_per_cubic_meter", 'size="4.0"'),
+            (3, "sensirion_pm_micrograms_per_cubic_meter", 'size="10"'),
+            (4, "sensirion_humidity_percent", ""),
+            (5, "sensirion_temperature_celsius", ""),
+            (6, "sensirion_voc_index", ""),
+            (7, "sensirion_nox_index", "")),
+    Scd4x: ((0, "sensirion_co2_ppm", ""),
+            (1, "sensirion_temperature_celsius", ""),
+            (2, "sensirion_humidity_percent", "")),
+    Ld20: ((0, "sensirion_flow_milliliters_per_minute", ""),
+           (1, "sensirion_temperature_celsius", "")),
+}
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace(
+        "\n", "\\n")
+
+
+def _format(value):
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class LatencyHistogram(object):
+    """
+        Cumulative histogram as exposed by OpenMetrics.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def lines(self, name, labels):
+        # observe() may run in another thread, the count is taken from the
+        # same copy of the buckets so that it matches the +Inf bucket
+        counts = list(self.counts)
+        result = []
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            total += count
+            result.append('{}_bucket{{{},le="{}"}} {}\n'.format(
+                name, labels, _format(bound), total))
+        result.append("{}_count{{{}}} {}\n".format(name, labels, total))
+        result.append("{}_sum{{{}}} {}\n".format(name, labels,
+                                                 _format(self.sum)))
+        return result
+
+
+class TimedBus(object):
+    """
+        Wraps a bus and records the duration of every i2c_rdwr() call.
+    """
+
+    def __init__(self, bus, histogram, clock=time.perf_counter):
+        self.bus = bus
+        self.histogram = histogram
+        self.clock = clock
+
+    def i2c_rdwr(self, *i2c_msgs):
+        start = self.clock()
+        try:
+            self.bus.i2c_rdwr(*i2c_msgs)
+        finally:
+            self.histogram.observe(self.clock() - start)
+
+    def close(self):
+        self.bus.close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.server.exporter.body
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MetricsExporter(object):
+    """
+        Renders and serves the metrics.
+        :param int port:
+            HTTP port, 9100 by default.
+        :param str host:
+            Address to listen on, all interfaces by default.
+        :param float refresh_interval:
+            Seconds between two renders of the background thread started by
+            start(), which keeps the counters current without samples.
+        :ivar bytes body:
+            The last rendered response body.
+        :ivar int renders:
+            Number of rendered bodies.
+    """
+
+    def __init__(self, port=9100, host="", refresh_interval=1.0):
+        self.port = port
+        self.host = host
+        self.refresh_interval = refresh_interval
+        self.sensors = []
+        self.histograms = []
+        self.renders = 0
+        self.body = b"# EOF\n"
+        self._server = None
+        self._render_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._refresher = None
+
+    def timed_bus(self, bus, name):
+        """
+            :return:
+                TimedBus to use in place of bus, its latency histogram is
+                exported with the label bus=name.
+        """
+        histogram = LatencyHistogram()
+        self.histograms.append(('bus="{}"'.format(_escape(name)), histogram))
+        return TimedBus(bus, histogram)
+
+    def add(self, entry):
+        """
+            Exports a ScheduledDevice, its callback is kept and called after
+            the exporter's.
+        """
+        for driver, values in VALUES.items():
+            if isinstance(entry.device, driver):
+                break
+        else:
+            raise ValueError("no metrics for " + type(entry.device).__name__)
+        labels = 'sensor="{}"'.format(_escape(entry.name))
+        sensor = [entry, labels, values, None]
+        self.sensors.append(sensor)
+        callback = entry.callback
+
+        def observe(entry, words, timestamp):
+            sensor[3] = entry.device.decode_measured_values(words)
+            self.render()
+            if callback is not None:
+                callback(entry, words, timestamp)
+
+        entry.callback = observe
+
+    def watch(self, scheduler):
+        """
+            Exports all sensors registered with the scheduler so far.
+        """
+        for entry in scheduler.devices:
+            self.add(entry)
+
+    def render(self):
+        """
+            Renders the response body from the latest values.
+        """
+        # the acquisition and the refresh thread must not overtake each
+        # other with an older body
+        with self._render_lock:
+            self._render()
+
+    def _render(self):
+        families = {name: [] for name in FAMILIES}
+        for entry, labels, values, decoded in self.sensors:
+            if decoded is not None:
+                for index, family, extra in values:
+                    families[family].append("{}{{{}{}}} {}\n".format(
+                        family, labels, "," + extra if extra else "",
+                        _format(decoded[index])))
+            for family, count in (("sensirion_samples", entry.samples),
+                                  ("sensirion_missed_cycles", entry.missed),
+                                  ("sensirion_crc_errors", entry.crc_errors),
+                                  ("sensirion_io_errors", entry.io_errors)):
+                families[family].append("{}_total{{{}}} {}\n".format(
+                    family, labels, count))
+        name = "sensirion_i2c_rdwr_latency_seconds"
+        for labels, histogram in self.histograms:
+            families[name] += histogram.lines(name, labels)
+        lines = []
+        for family, samples in families.items():
+            if not samples:
+                continue
+            kind, unit, description = FAMILIES[family]
+            lines.append("# TYPE {} {}\n".format(family, kind))
+            if unit:
+                lines.append("# UNIT {} {}\n".format(family, unit))
+            lines.append("# HELP {} {}.\n".format(family, description))
+            lines += samples
+        lines.append("# EOF\n")
+        # replacing the reference is atomic for the HTTP threads
+        self.body = "".join(lines).encode()
+        self.renders += 1
+
+    def start(self):
+        """
+            Starts the HTTP server and the refresh thread in the background.
+        """
+        self._server = ThreadingHTTPServer((self.host, self.port), _Handler)
+        self._server.daemon_threads = True
+        self._server.exporter = self
+        threading.Thread(target=self._server.serve_forever,
+                         name="metrics", daemon=True).start()
+        self._stopping.clear()
+        self._refresher = threading.Thread(target=self._refresh,
+                                           name="metrics-refresh",
+                                           daemon=True)
+        self._refresher.start()
+
+    def _refresh(self):
+        while not self._stopping.wait(self.refresh_interval):
+            self.render()
+
+    def stop(self):
+        if self._refresher is not None:
+            self._stopping.set()
+            self._refresher.join()
+            self._refresher = None
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
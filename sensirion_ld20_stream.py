@@ -0,0 +1,243 @@
+# Copyright (c) 2022, Sensirion AG
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# # Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# # Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# # Neither the name of Sensirion AG nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+# (c) Copyright 2022 Sensirion AG, Switzerland
+
+# High rate streaming of the LD20 flow signal
+#
+# In continuous measurement the LD20 updates its flow value every 0.5 ms.
+# Ld20Stream reads the sensor on absolute deadlines at a configurable rate
+# and stores the raw words together with a monotonic timestamp in a
+# preallocated ring buffer. It reports the achieved rate, the number of
+# dropped samples (deadlines which could not be served) and the jitter of
+# the intervals between two samples.
+#
+# Usage:
+#
+#   ld20 = Ld20(SMBus(1))
+#   ld20.start_continuous_measurement()
+#   stream = Ld20Stream(ld20, rate=500, capacity=60000)
+#   stream.run(duration=10)
+#   timestamps, flow, temperature = stream.latest(1000)
+
+import math
+import time
+from array import array
+
+from sensirion_crc import CrcError
+
+# fastest update rate of the sensor in continuous mode
+LD20_MAX_RATE = 2000.0
+
+
+class RingBuffer(object):
+    """
+        Preallocated ring buffer of timestamps and raw LD20 words.
+        :param int capacity:
+            Number of samples kept, older samples are overwritten.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.timestamps = array("d", bytes(8 * capacity))
+        self.flow = array("H", bytes(2 * capacity))
+        self.temperature = array("H", bytes(2 * capacity))
+        # total number of samples ever appended
+        self.count = 0
+
+    def append(self, timestamp, flow, temperature):
+        i = self.count % self.capacity
+        self.timestamps[i] = timestamp
+        self.flow[i] = flow
+        self.temperature[i] = temperature
+        self.count += 1
+
+    @property
+    def overwritten(self):
+        return max(0, self.count - self.capacity)
+
+    def latest(self, n=None):
+        """
+            Returns copies of the latest n samples in chronological order.
+            :return:
+                Tuple of arrays timestamps, raw flow, raw temperature.
+        """
+        available = min(self.count, self.capacity)
+        n = available if n is None else min(n, available)
+        end = self.count % self.capacity
+        start = (end - n) % self.capacity
+        result = []
+        for data in (self.timestamps, self.flow, self.temperature):
+            if n == 0:
+                result.append(data[:0])
+            elif start < end:
+                result.append(data[start:end])
+            else:
+                result.append(data[start:] + data[:end])
+        return tuple(result)
+
+
+class Ld20Stream(object):
+    """
+        Reads a LD20 in continuous measurement at a fixed rate.
+        :param ld20:
+            Ld20 driver from sensirion_driver.py, the continuous measurement
+            has to be started already.
+        :param float rate:
+            Samples per second, at most LD20_MAX_RATE.
+        :param int capacity:
+            Size of the ring buffer in samples.
+        :param float spin:
+            The last part of every wait in seconds is busy waiting instead of
+            time.sleep() which is too coarse for sub-millisecond periods.
+    """
+
+    def __init__(self, ld20, rate, capacity=100000, spin=0.0002,
+                 clock=time.monotonic, sleep=time.sleep):
+        if not 0 < rate <= LD20_MAX_RATE:
+            raise ValueError("rate must be in (0, {}]".format(LD20_MAX_RATE))
+        self.ld20 = ld20
+        self.period = 1.0 / rate
+        self.buffer = RingBuffer(capacity)
+        self.spin = spin
+        self.clock = clock
+        self.sleep = sleep
+        self.dropped = 0
+        self.crc_errors = 0
+        self.io_errors = 0
+        self.first_timestamp = None
+        self.last_timestamp = None
+        # running mean and variance of the sample intervals (Welford)
+        self._intervals = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._max_deviation = 0.0
+
+    def run(self, duration=None, samples=None):
+        """
+            Reads samples until duration seconds have elapsed or the given
+            number of samples has been stored.
+        """
+        clock = self.clock
+        period = self.period
+        command = self.ld20.measurement_command()
+        execute = self.ld20.execute
+        append = self.buffer.append
+        start = clock()
+        end = None if duration is None else start + duration
+        target = None if samples is None else self.buffer.count + samples
+        deadline = start
+        while True:
+            now = clock()
+            if end is not None and now >= end:
+                break
+            if target is not None and self.buffer.count >= target:
+                break
+            if deadline - now > self.spin:
+                self.sleep(deadline - now - self.spin)
+                now = clock()
+            while now < deadline:
+                previous, now = now, clock()
+                if now == previous:
+                    # the clock does not advance by itself (VirtualClock)
+                    self.sleep(deadline - now)
+                    break
+            try:
+                words = execute(command)
+            except CrcError:
+                self.crc_errors += 1
+                words = None
+            except OSError:
+                self.io_errors += 1
+                words = None
+            timestamp = clock()
+            if words is not None:
+                append(timestamp, words[0], words[1])
+                self._interval(timestamp)
+            deadline += period
+            if timestamp > deadline:
+                # deadlines which passed while reading are dropped
+                missed = int((timestamp - deadline) // period) + 1
+                self.dropped += missed
+                deadline += missed * period
+
+    def _interval(self, timestamp):
+        if self.last_timestamp is None:
+            self.first_timestamp = timestamp
+        else:
+            interval = timestamp - self.last_timestamp
+            self._intervals += 1
+            delta = interval - self._mean
+            self._mean += delta / self._intervals
+            self._m2 += delta * (interval - self._mean)
+            deviation = abs(interval - self.period)
+            if deviation > self._max_deviation:
+                self._max_deviation = deviation
+        self.last_timestamp = timestamp
+
+    def latest(self, n=None):
+        """
+            Returns the latest n samples as timestamps, flow in ml/min and
+            temperature in degC.
+        """
+        timestamps, flow, temperature = self.buffer.latest(n)
+        scale_flow = self.ld20.SCALE_FACTOR_FLOW
+        scale_temperature = self.ld20.SCALE_FACTOR_TEMP
+        return (timestamps,
+                [(w - 0x10000 if w & 0x8000 else w) / scale_flow for w in flow],
+                [(w - 0x10000 if w & 0x8000 else w) / scale_temperature
+                 for w in temperature])
+
+    def statistics(self):
+        """
+            :return:
+                Dictionary with the requested and achieved rate, the number
+                of samples, dropped samples, overwritten samples, CRC and I/O
+                errors and the jitter of the sample intervals in seconds
+                (standard deviation and maximum deviation from the period).
+        """
+        samples = self.buffer.count
+        # the first and the last sample are samples - 1 intervals apart
+        elapsed = 0.0
+        if self.first_timestamp is not None:
+            elapsed = self.last_timestamp - self.first_timestamp
+        jitter = 0.0
+        if self._intervals > 1:
+            jitter = math.sqrt(self._m2 / (self._intervals - 1))
+        return {
+            "rate": 1.0 / self.period,
+            "achieved_rate": (samples - 1) / elapsed if elapsed else 0.0,
+            "samples": samples,
+            "dropped": self.dropped,
+            "overwritten": self.buffer.overwritten,
+            "crc_errors": self.crc_errors,
+            "io_errors": self.io_errors,
+            "jitter_std": jitter,
+            "jitter_max": self._max_deviation,
+        }
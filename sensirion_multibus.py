@@ -0,0 +1,250 @@
+# Copyright (c) 2022, Sensirion AG
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# # Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# # Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# # Neither the name of Sensirion AG nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+# (c) Copyright 2022 Sensirion AG, Switzerland
+
+# Parallel acquisition on several I2C buses
+#
+# Compute modules and the Raspberry Pi 5 expose more than one hardware I2C
+# bus. ParallelAcquisition runs one worker thread with its own BusScheduler
+# per bus, the transfers of one bus never wait for another bus because the
+# I2C ioctl and the sleeps release the GIL. All workers put their samples
+# into one bounded queue. A worker never blocks on a full queue, the sample
+# is dropped and counted instead, so a slow consumer can not stall the
+# acquisition. Throughput, drops and the queue depth are counted per bus.
+#
+# Usage:
+#
+#   acquisition = ParallelAcquisition()
+#   acquisition.add(1, Sen5x, period=1.0)
+#   acquisition.add(3, Sen5x, period=1.0)
+#   acquisition.start()
+#   while True:
+#       sample = acquisition.get()
+#   acquisition.stop()
+
+import queue
+import threading
+import time
+from collections import namedtuple
+
+from smbus2 import SMBus
+
+from sensirion_scheduler import BusScheduler
+
+Sample = namedtuple("Sample", ("bus", "name", "timestamp", "words"))
+
+
+class BusWorker(object):
+    """
+        Thread reading the sensors of one bus.
+        :ivar int samples:
+            Number of samples put into the queue.
+        :ivar int dropped:
+            Number of samples dropped because the queue was full.
+        :ivar int max_queue_depth:
+            Largest queue depth seen by this worker after a put.
+    """
+
+    def __init__(self, number, bus, output, clock=time.monotonic,
+                 sleep=time.sleep):
+        self.number = number
+        self.bus = bus
+        self.output = output
+        self.clock = clock
+        self.scheduler = BusScheduler(bus, clock, sleep)
+        self.samples = 0
+        self.dropped = 0
+        self.max_queue_depth = 0
+        self.started_at = None
+        self.stopped_at = None
+        self.error = None
+        self._thread = None
+
+    def _put(self, entry, words, timestamp):
+        try:
+            # the words are overwritten by the next sample of the sensor
+            self.output.put_nowait(Sample(self.number, entry.name, timestamp,
+                                          tuple(words)))
+        except queue.Full:
+            self.dropped += 1
+            return
+        self.samples += 1
+        depth = self.output.qsize()
+        if depth > self.max_queue_depth:
+            self.max_queue_depth = depth
+
+    def add(self, device, period, offset=0.0, name=None):
+        return self.scheduler.add(device, period, self._put, offset=offset,
+                                  name=name)
+
+    def _run(self, duration):
+        self.started_at = self.clock()
+        try:
+            self.scheduler.run(duration)
+        except Exception as error:
+            # keep the other buses running, the error is in statistics()
+            self.error = error
+        finally:
+            self.stopped_at = self.clock()
+
+    def start(self, duration=None):
+        # before the thread exists, a stop() from now on is not lost even if
+        # it arrives before the thread enters run()
+        self.scheduler.clear_stop()
+        self._thread = threading.Thread(
+            target=self._run, args=(duration,),
+            name="i2c-{}".format(self.number), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.scheduler.stop()
+
+    def join(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def is_alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def statistics(self):
+        end = self.clock() if self.stopped_at is None else self.stopped_at
+        elapsed = 0.0 if self.started_at is None else end - self.started_at
+        devices = self.scheduler.devices
+        return {
+            "samples": self.samples,
+            "rate": self.samples / elapsed if elapsed else 0.0,
+            "dropped": self.dropped,
+            "missed": sum(entry.missed for entry in devices),
+            "crc_errors": sum(entry.crc_errors for entry in devices),
+            "io_errors": sum(entry.io_errors for entry in devices),
+            "max_lateness": max([entry.max_lateness for entry in devices],
+                                default=0.0),
+            "max_queue_depth": self.max_queue_depth,
+            "error": None if self.error is None else repr(self.error),
+        }
+
+
+class ParallelAcquisition(object):
+    """
+        One BusWorker per bus number and a shared output queue.
+        :param open_bus:
+            Called with the bus number to open a bus, SMBus by default.
+        :param int queue_size:
+            Capacity of the output queue in samples.
+    """
+
+    def __init__(self, open_bus=SMBus, queue_size=10000,
+                 clock=time.monotonic, sleep=time.sleep):
+        self.open_bus = open_bus
+        self.queue = queue.Queue(queue_size)
+        self.clock = clock
+        self.sleep = sleep
+        self.workers = {}
+
+    def worker(self, number):
+        """
+            :return:
+                The BusWorker of a bus number, the bus is opened on first
+                use.
+        """
+        worker = self.workers.get(number)
+        if worker is None:
+            worker = BusWorker(number, self.open_bus(number), self.queue,
+                               self.clock, self.sleep)
+            self.workers[number] = worker
+        return worker
+
+    def add(self, number, driver, period, address=None, offset=0.0,
+            name=None):
+        """
+            Registers a sensor.
+            :param int number:
+                Bus number, N of /dev/i2c-N.
+            :param driver:
+                Driver class from sensirion_driver.py.
+            :return:
+                ScheduledDevice, its device attribute is the driver whose
+                measurement has to be started before start().
+        """
+        worker = self.worker(number)
+        device = driver(worker.bus, address, sleep=self.sleep)
+        return worker.add(device, period, offset,
+                          name or "{}@{}".format(driver.__name__, number))
+
+    def start(self, duration=None):
+        for worker in self.workers.values():
+            worker.start(duration)
+
+    def stop(self, timeout=5.0):
+        """
+            Stops all workers and waits for them.
+            :param float timeout:
+                Seconds to wait for all workers together, None to wait
+                forever.
+            :return:
+                True if all workers ended.
+        """
+        for worker in self.workers.values():
+            worker.stop()
+        # joins wait in real time, also with a simulated clock
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for worker in self.workers.values():
+            worker.join(None if deadline is None else
+                        max(0.0, deadline - time.monotonic()))
+        return not self.running()
+
+    def running(self):
+        return any(worker.is_alive() for worker in self.workers.values())
+
+    def get(self, timeout=None):
+        """
+            :return:
+                The next Sample, None if there was none within timeout
+                seconds.
+        """
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def statistics(self):
+        """
+            :return:
+                Dictionary with the statistics of each bus, see
+                BusWorker.statistics(), the aggregate rate and the queue.
+        """
+        buses = {number: worker.statistics()
+                 for number, worker in self.workers.items()}
+        return {
+            "buses": buses,
+            "rate": sum(bus["rate"] for bus in buses.values()),
+            "queue_depth": self.queue.qsize(),
+            "queue_size": self.queue.maxsize,
+        }
@@ -0,0 +1,436 @@
+# Copyright (c) 2022, Sensirion AG
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# # Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# # Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# # Neither the name of Sensirion AG nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+# (c) Copyright 2022 Sensirion AG, Switzerland
+
+# TCA9548A multiplexer support and a scheduler which minimizes channel
+# switches
+#
+# Many SEN5x share the fixed address 0x69, so they are connected to the
+# channels of TCA9548A multiplexers (addresses 0x70 to 0x77). Each sensor is
+# addressed by a SensorLocation (bus number, multiplexer address, channel,
+# device address); sensors directly on the bus use None as multiplexer
+# address and channel. MuxBus wraps one bus, remembers the selected channel
+# of every multiplexer and only writes a control register if the selection
+# changes. Only one channel of all multiplexers on a bus is enabled at a
+# time, so equal addresses behind different multiplexers do not collide.
+#
+# MuxScheduler reads all sensors which are due together in one sweep, in
+# (bus, multiplexer, channel) order. If time allows, every channel is
+# selected once and all its sensors are read before the next channel.
+# Otherwise the commands of all channels are sent first and the responses
+# read in the reverse order, so the execution times overlap and the last
+# channel of the write pass is still selected for the first read. The
+# switching and the data transfers are timed separately.
+#
+# Usage:
+#
+#   scheduler = MuxScheduler()
+#   for channel in range(8):
+#       scheduler.add(Sen5x, SensorLocation(1, 0x70, channel, 0x69), 1.0,
+#                     callback=print_sen5x)
+#   scheduler.start_measurements()
+#   scheduler.run(duration=60)
+#   print(scheduler.statistics())
+
+import time
+from collections import namedtuple
+
+from smbus2 import SMBus, i2c_msg
+
+from sensirion_crc import CrcError
+from sensirion_scheduler import ScheduledDevice
+
+SensorLocation = namedtuple("SensorLocation",
+                            ("bus", "mux", "channel", "address"))
+
+
+class Tca9548a(object):
+    """
+        Control register of one TCA9548A, the select messages are allocated
+        once.
+        :ivar mask:
+            Last written control register, None while unknown.
+    """
+
+    ADDRESS = 0x70
+
+    def __init__(self, address=None):
+        self.address = self.ADDRESS if address is None else address
+        self.mask = None
+        self._messages = [i2c_msg.write(self.address, [mask])
+                          for mask in [1 << channel for channel in range(8)]
+                          + [0]]
+
+    def message(self, channel):
+        """
+            :return:
+                The message enabling only the given channel, all channels
+                are disabled for None.
+        """
+        return self._messages[8 if channel is None else channel]
+
+
+class MuxBus(object):
+    """
+        One physical bus with the multiplexers connected to it.
+        :param bus:
+            An smbus2.SMBus or any object implementing i2c_rdwr().
+        :param clock:
+            Used to time the transfers.
+        :ivar int switches:
+            Number of control register writes.
+        :ivar float switch_time:
+            Time spent in control register writes in seconds.
+        :ivar int data_transfers:
+            Number of transfers to the sensors.
+        :ivar float data_time:
+            Time spent in transfers to the sensors in seconds.
+    """
+
+    def __init__(self, bus, clock=time.perf_counter):
+        self.bus = bus
+        self.clock = clock
+        self.muxes = {}
+        self.selected = None
+        self.switches = 0
+        self.switch_bytes = 0
+        self.switch_time = 0.0
+        self.data_transfers = 0
+        self.data_bytes = 0
+        self.data_time = 0.0
+
+    def mux(self, address):
+        mux = self.muxes.get(address)
+        if mux is None:
+            mux = Tca9548a(address)
+            self.muxes[address] = mux
+        return mux
+
+    def _write_control(self, mux, channel):
+        mask = 0 if channel is None else 1 << channel
+        if mux.mask == mask:
+            return
+        start = self.clock()
+        try:
+            self.bus.i2c_rdwr(mux.message(channel))
+        except OSError:
+            mux.mask = None
+            raise
+        finally:
+            self.switch_time += self.clock() - start
+            self.switches += 1
+            self.switch_bytes += 2
+        mux.mask = mask
+
+    def select(self, mux_address, channel):
+        """
+            Enables the channel of one multiplexer and disables all channels
+            of the other multiplexers. Does nothing for sensors directly on
+            the bus.
+        """
+        if mux_address is None or self.selected == (mux_address, channel):
+            return
+        self.selected = None
+        target = self.mux(mux_address)
+        for mux in self.muxes.values():
+            if mux is not target:
+                self._write_control(mux, None)
+        self._write_control(target, channel)
+        self.selected = (mux_address, channel)
+
+    def i2c_rdwr(self, *i2c_msgs):
+        start = self.clock()
+        try:
+            self.bus.i2c_rdwr(*i2c_msgs)
+        finally:
+            self.data_time += self.clock() - start
+            self.data_transfers += 1
+            for msg in i2c_msgs:
+                self.data_bytes += msg.len + 1
+
+    def channel(self, mux_address, channel):
+        return MuxChannel(self, mux_address, channel)
+
+    def statistics(self):
+        total = self.switch_time + self.data_time
+        return {
+            "switches": self.switches,
+            "switch_bytes": self.switch_bytes,
+            "switch_time": self.switch_time,
+            "data_transfers": self.data_transfers,
+            "data_bytes": self.data_bytes,
+            "data_time": self.data_time,
+            "switch_share": self.switch_time / total if total else 0.0,
+        }
+
+
+class MuxChannel(object):
+    """
+        Bus seen by the sensors of one channel, selects the channel before
+        every transfer if needed. Drivers from sensirion_driver.py take it
+        in place of an SMBus.
+    """
+
+    def __init__(self, mux_bus, mux_address, channel):
+        self.mux_bus = mux_bus
+        self.mux_address = mux_address
+        self.channel = channel
+
+    def select(self):
+        self.mux_bus.select(self.mux_address, self.channel)
+
+    def i2c_rdwr(self, *i2c_msgs):
+        self.mux_bus.select(self.mux_address, self.channel)
+        self.mux_bus.i2c_rdwr(*i2c_msgs)
+
+
+class MuxScheduler(object):
+    """
+        Polls sensors behind multiplexers on one or more buses.
+        :param open_bus:
+            Called with the bus number to open a bus, SMBus by default.
+        :param clock:
+            Time source for the schedule and the transfer timing.
+        :param max_sweep_time:
+            Longest duration of a sweep which selects every channel only
+            once, see sweep(). Defaults to half of the shortest period of
+            the sensors in the sweep.
+        :ivar int grouped_sweeps:
+            Number of sweeps which selected every channel once.
+        :ivar int pipelined_sweeps:
+            Number of sweeps which sent all commands first.
+    """
+
+    def __init__(self, open_bus=SMBus, clock=time.monotonic,
+                 sleep=time.sleep, max_sweep_time=None):
+        self.open_bus = open_bus
+        self.max_sweep_time = max_sweep_time
+        self.grouped_sweeps = 0
+        self.pipelined_sweeps = 0
+        self.clock = clock
+        self.sleep = sleep
+        self.buses = {}
+        self.devices = []
+
+    def bus(self, number):
+        """
+            :return:
+                The MuxBus of a bus number, opened on first use.
+        """
+        mux_bus = self.buses.get(number)
+        if mux_bus is None:
+            mux_bus = MuxBus(self.open_bus(number), self.clock)
+            self.buses[number] = mux_bus
+        return mux_bus
+
+    def add(self, driver, location, period, callback=None, offset=0.0,
+            name=None):
+        """
+            Registers a sensor.
+            :param driver:
+                Driver class from sensirion_driver.py, e.g. Sen5x.
+            :param location:
+                SensorLocation or tuple (bus, mux, channel, address).
+            :param float period:
+                Time between two reads in seconds. Sensors with equal
+                periods and offsets are read in the same sweep.
+            :param callback:
+                Called as callback(scheduled_device, words, timestamp) for
+                every sample, see BusScheduler.add().
+            :return:
+                ScheduledDevice, its device attribute is the driver.
+        """
+        location = SensorLocation(*location)
+        channel = self.bus(location.bus).channel(location.mux,
+                                                 location.channel)
+        device = driver(channel, location.address, sleep=self.sleep)
+        if name is None:
+            name = "{}@{}/{}/{}/0x{:02X}".format(
+                driver.__name__, location.bus,
+                "-" if location.mux is None else "0x{:02X}".format(location.mux),
+                "-" if location.channel is None else location.channel,
+                location.address)
+        entry = ScheduledDevice(device, period, device.measurement_command(),
+                                callback, name)
+        entry.offset = offset
+        entry.location = location
+        self.devices.append(entry)
+        return entry
+
+    def _sorted(self, entries):
+        # sensors directly on the bus first, they need no switch
+        return sorted(entries, key=lambda entry: (
+            entry.location.bus, entry.location.mux is not None,
+            entry.location.mux or 0, entry.location.channel or 0))
+
+    def start_measurements(self):
+        """
+            Starts the measurement of all sensors, channel by channel.
+        """
+        for entry in self._sorted(self.devices):
+            entry.device.start_measurement()
+
+    def stop_measurements(self):
+        for entry in self._sorted(self.devices):
+            entry.device.stop_measurement()
+
+    def _select(self, entry):
+        try:
+            entry.device.bus.select()
+        except OSError:
+            entry.io_errors += 1
+            return False
+        return True
+
+    def _write(self, entry):
+        """
+            Sends the measurement command of a sensor on the selected
+            channel.
+            :return:
+                Time at which the response is ready, None on errors.
+        """
+        command = entry.command
+        if command.write_msg is None:
+            return 0.0
+        try:
+            entry.device.bus.mux_bus.i2c_rdwr(command.write_msg)
+        except OSError:
+            entry.io_errors += 1
+            return None
+        return self.clock() + command.delay
+
+    def _read(self, entry, ready):
+        now = self.clock()
+        if ready > now:
+            self.sleep(ready - now)
+        command = entry.command
+        try:
+            entry.device.bus.mux_bus.i2c_rdwr(command.read_msg)
+            words = command.decode()
+        except CrcError:
+            entry.crc_errors += 1
+            return False
+        except OSError:
+            entry.io_errors += 1
+            return False
+        entry.samples += 1
+        if entry.callback is not None:
+            entry.callback(entry, words, self.clock())
+        return True
+
+    def sweep(self, entries, max_duration=None):
+        """
+            Reads one sample of each sensor. If the execution times of all
+            channels one after the other fit into max_duration, each channel
+            is selected once: all commands of the channel are sent, and the
+            responses read after the execution time. Otherwise the commands
+            of all channels are sent first and the responses read in reverse
+            channel order, which needs about twice the switches but waits
+            for the execution time only once.
+            :param max_duration:
+                Seconds the sweep may take, unlimited if None.
+            :return:
+                Number of samples read.
+        """
+        groups = []
+        for entry in self._sorted(entries):
+            key = entry.location[:3]
+            if groups and groups[-1][0] == key:
+                groups[-1][1].append(entry)
+            else:
+                groups.append((key, [entry]))
+        duration = sum(max(entry.command.delay for entry in group)
+                       for _, group in groups)
+        count = 0
+        if max_duration is None or duration <= max_duration:
+            self.grouped_sweeps += 1
+            for _, group in groups:
+                if not self._select(group[0]):
+                    continue
+                pending = [(self._write(entry), entry) for entry in group]
+                for ready, entry in pending:
+                    if ready is not None:
+                        count += self._read(entry, ready)
+            return count
+        self.pipelined_sweeps += 1
+        pending = []
+        for _, group in groups:
+            if self._select(group[0]):
+                pending += [(self._write(entry), entry) for entry in group]
+        for ready, entry in reversed(pending):
+            if ready is not None and self._select(entry):
+                count += self._read(entry, ready)
+        return count
+
+    def run(self, duration=None, sweeps=None):
+        """
+            Runs the schedule until duration seconds have elapsed or the
+            given number of sweeps is done. Cycles which can not be served
+            in time are counted as missed, as in BusScheduler.
+        """
+        start = self.clock()
+        for entry in self.devices:
+            entry.due = start + entry.offset
+        end = None if duration is None else start + duration
+        count = 0
+        while self.devices:
+            due = min(entry.due for entry in self.devices)
+            if end is not None and due > end:
+                break
+            now = self.clock()
+            if due > now:
+                self.sleep(due - now)
+                now = self.clock()
+            batch = [entry for entry in self.devices if entry.due <= now]
+            for entry in batch:
+                entry.max_lateness = max(entry.max_lateness, now - entry.due)
+            max_duration = self.max_sweep_time
+            if max_duration is None:
+                max_duration = min(entry.period for entry in batch) / 2
+            self.sweep(batch, max_duration)
+            now = self.clock()
+            for entry in batch:
+                entry.due += entry.period
+                if entry.due < now:
+                    skipped = int((now - entry.due) // entry.period) + 1
+                    entry.missed += skipped
+                    entry.due += skipped * entry.period
+            count += 1
+            if sweeps is not None and count >= sweeps:
+                break
+
+    def statistics(self):
+        """
+            :return:
+                Dictionary bus number -> switching and data transfer
+                statistics, see MuxBus.statistics().
+        """
+        return {number: mux_bus.statistics()
+                for number, mux_bus in self.buses.items()}
@@ -0,0 +1,387 @@
+# Copyright (c) 2022, Sensirion AG
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# # Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# # Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# # Neither the name of Sensirion AG nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+# (c) Copyright 2022 Sensirion AG, Switzerland
+
+# Data-ready polling for the drivers in sensirion_driver.py
+#
+# Instead of sleeping for a fixed time between two reads, the sensor's
+# data-ready flag is polled (SEN5x 0x0202, SCD4x 0xE4B8) and the measured
+# values are read as soon as the sensor has published them. The poller
+# learns the update period of the sensor, sleeps until shortly before the
+# next expected update and then polls with an exponentially growing
+# interval.
+#
+# Usage:
+#
+#   poller = DataReadyPoller(Sen5x(SMBus(1)))
+#   sample = poller.read()
+#   print(sample.words, sample.latency)
+
+import time
+
+
+class PolledSample(object):
+    """
+        Result of DataReadyPoller.read().
+        :ivar words:
+            Measured values as returned by read_measured_values() of the
+            driver, overwritten by the next read.
+        :ivar float publish_time:
+            Estimated time.monotonic() at which the sensor published the
+            sample, the middle between the last poll which returned
+            "not ready" and the first one which returned "ready".
+        :ivar float delivered_time:
+            time.monotonic() after the measured values were read.
+        :ivar float latency:
+            delivered_time - publish_time.
+        :ivar float uncertainty:
+            Maximum error of publish_time and latency, half the distance
+            between the two polls. Infinite if the first poll already
+            returned "ready".
+    """
+
+    __slots__ = ("words", "publish_time", "delivered_time", "latency",
+                 "uncertainty")
+
+    def __init__(self, words, publish_time, delivered_time, uncertainty):
+        self.words = words
+        self.publish_time = publish_time
+        self.delivered_time = delivered_time
+        self.latency = delivered_time - publish_time
+        self.uncertainty = uncertainty
+
+
+class DataReadyPoller(object):
+    """
+        Polls the data-ready flag of a driver and reads each new sample.
+        :param device:
+            Driver implementing read_data_ready() and
+            read_measured_values(), e.g. Sen5x or Scd4x.
+        :param float min_interval:
+            First poll interval in seconds after the expected update time.
+        :param float max_interval:
+            Upper limit of the poll interval.
+        :param float backoff:
+            Factor the poll interval grows with after every "not ready".
+        :param float guard:
+            Time in seconds the polling starts before the expected update.
+        :param float timeout:
+            read() raises TimeoutError if no sample arrives within this time,
+            None to wait forever.
+    """
+
+    def __init__(self, device, min_interval=0.005, max_interval=0.2,
+                 backoff=2.0, guard=0.05, timeout=None,
+                 clock=time.monotonic, sleep=time.sleep):
+        self.device = device
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.guard = guard
+        self.timeout = timeout
+        self.clock = clock
+        self.sleep = sleep
+        # learned update period of the sensor and the last publish time
+        # which could be determined from a "not ready" poll
+        self.period = None
+        self.last_publish_time = None
+        self.polls = 0
+
+    def read(self):
+        """
+            Waits for the next sample and reads it.
+            :return:
+                PolledSample
+        """
+        clock = self.clock
+        start = clock()
+        if self.period is not None:
+            wake_up = self.last_publish_time + self.period - self.guard
+            if wake_up > start:
+                self.sleep(wake_up - start)
+        interval = self.min_interval
+        not_ready_time = None
+        while True:
+            # the flag is sampled when the command arrives, not after its
+            # execution time
+            now = clock()
+            ready = self.device.read_data_ready()
+            self.polls += 1
+            if ready:
+                break
+            not_ready_time = now
+            if self.timeout is not None and now - start > self.timeout:
+                raise TimeoutError("no new sample within {} s".format(
+                    self.timeout))
+            self.sleep(interval)
+            interval = min(interval * self.backoff, self.max_interval)
+        words = self.device.read_measured_values()
+        delivered_time = clock()
+
+        if not_ready_time is None:
+            # the sample was already waiting, the publish time is unknown
+            publish_time = now
+            uncertainty = float("inf")
+        else:
+            publish_time = (not_ready_time + now) / 2
+            uncertainty = (now - not_ready_time) / 2
+            self._learn_period(publish_time)
+            self.last_publish_time = publish_time
+        return PolledSample(words, publish_time, delivered_time, uncertainty)
+
+    def _learn_period(self, publish_time):
+        if self.last_publish_time is None:
+            return
+        period = publish_time - self.last_publish_time
+        if period <= 0:
+            return
+        if self.period is None:
+            self.period = period
+        elif period < 1.5 * self.period:
+            # exponential moving average, skipped samples are ignored
+            self.period += 0.1 * (period - self.period)
+
+
+class DeadlineReader(object):
+    """
+        Reads one sample per sensor update on absolute deadlines which are
+        locked to the publish phase of the sensor.
+
+        sync() finds an update of the sensor by polling the data-ready
+        flag. From then on the reader sleeps until margin seconds after the
+        predicted next update, checks the data-ready flag and reads. Every
+        probe_every cycles it starts polling guard seconds before the
+        predicted update, to measure the update time again. The period is
+        learned from the first and the latest measured update, so the
+        deadlines follow the clock of the sensor instead of drifting
+        against it.
+        :param device:
+            Driver implementing read_data_ready() and
+            read_measured_values(), e.g. Sen5x or Scd4x.
+        :param float period:
+            Nominal update period of the sensor in seconds, 1 s for SEN5x
+            and 5 s for SCD4x.
+        :param float margin:
+            Time in seconds between the predicted update and the read.
+        :param float guard:
+            Time in seconds the probes start before the predicted update.
+        :param int probe_every:
+            Number of cycles between two probes.
+        :param float poll_interval:
+            Interval of the data-ready polls while waiting for an update.
+        :param bool check_ready:
+            Check the data-ready flag before every read, otherwise only
+            during probes. Without the check duplicates are only detected
+            in probe cycles, but each sample needs one command less.
+        :ivar float period:
+            Learned update period.
+        :ivar int samples:
+            Number of read samples.
+        :ivar int missed_deadlines:
+            Number of wake ups later than margin after their deadline.
+        :ivar int skipped:
+            Number of sensor updates which were not read because read() was
+            called too late.
+        :ivar int duplicates:
+            Number of reads which found no new sample at their deadline and
+            had to wait for it, a fixed delay loop would have read the
+            previous sample again.
+        :ivar int probes:
+            Number of measured update times.
+        :ivar float max_lateness:
+            Largest delay of a wake up after its deadline.
+    """
+
+    def __init__(self, device, period, margin=0.005, guard=0.02,
+                 probe_every=10, poll_interval=0.002, check_ready=True,
+                 clock=time.monotonic, sleep=time.sleep):
+        self.device = device
+        self.nominal_period = period
+        self.period = period
+        self.margin = margin
+        self.guard = guard
+        self.probe_every = probe_every
+        self.poll_interval = poll_interval
+        self.check_ready = check_ready
+        self.clock = clock
+        self.sleep = sleep
+        self.samples = 0
+        self.missed_deadlines = 0
+        self.skipped = 0
+        self.duplicates = 0
+        self.probes = 0
+        self.polls = 0
+        self.max_lateness = 0.0
+        # index and time of the first and the latest measured update
+        self._anchor = None
+        self._base = None
+        self._index = 0
+        self._guard = guard
+
+    def _sleep_until(self, deadline):
+        now = self.clock()
+        if deadline > now:
+            self.sleep(deadline - now)
+            now = self.clock()
+        lateness = now - deadline
+        if lateness > self.max_lateness:
+            self.max_lateness = lateness
+        if lateness > self.margin:
+            self.missed_deadlines += 1
+
+    def _poll(self, timeout):
+        """
+            Polls the data-ready flag until it is set.
+            :return:
+                Time of the last "not ready" poll (None if the first poll
+                was ready) and time of the "ready" poll.
+        """
+        not_ready_time = None
+        start = self.clock()
+        while True:
+            # the flag is sampled when the command arrives, not after its
+            # execution time
+            now = self.clock()
+            ready = self.device.read_data_ready()
+            self.polls += 1
+            if ready:
+                return not_ready_time, now
+            not_ready_time = now
+            if now - start > timeout:
+                raise TimeoutError("no new sample within {} s".format(
+                    timeout))
+            self.sleep(self.poll_interval)
+
+    def _observe(self, index, not_ready_time, ready_time):
+        """
+            Learns phase and period from an update seen between two polls.
+        """
+        if not_ready_time is None or \
+                ready_time - not_ready_time > self.period / 4:
+            return
+        publish_time = (not_ready_time + ready_time) / 2
+        self.probes += 1
+        self._guard = self.guard
+        if self._anchor is not None and index > self._anchor[0]:
+            period = (publish_time - self._anchor[1]) / (index - self._anchor[0])
+            if abs(period - self.nominal_period) < 0.1 * self.nominal_period:
+                self.period = period
+            else:
+                # the sensor was restarted or the reader fell behind
+                self._anchor = None
+        if self._anchor is None:
+            self._anchor = (index, publish_time)
+        elif self._base is not None:
+            # one poll is only accurate to half a poll interval plus the
+            # execution time of the data-ready command, average the phase
+            predicted = self._expected(index)
+            error = publish_time - predicted
+            if abs(error) < 0.1 * self.period:
+                publish_time = predicted + 0.25 * error
+        self._base = (index, publish_time)
+
+    def _expected(self, index):
+        base_index, base_time = self._base
+        return base_time + (index - base_index) * self.period
+
+    def sync(self):
+        """
+            Waits for the next update of the sensor to learn its phase,
+            called by the first read().
+        """
+        # the first flag may belong to an old sample
+        not_ready_time, ready_time = self._poll(3 * self.nominal_period)
+        if not_ready_time is None:
+            self.device.read_measured_values()
+            not_ready_time, ready_time = self._poll(3 * self.nominal_period)
+        self._anchor = None
+        self._index = 0
+        self._observe(0, not_ready_time, ready_time)
+
+    def read(self):
+        """
+            Waits for the next update of the sensor and reads it.
+            :return:
+                PolledSample, its publish_time is the predicted update time
+                or the measured one in probe cycles.
+        """
+        if self._base is None:
+            self.sync()
+            words = self.device.read_measured_values()
+            self.samples += 1
+            now = self.clock()
+            return PolledSample(words, self._base[1], now,
+                                self.poll_interval / 2)
+        index = self._index + 1
+        expected = self._expected(index)
+        late = self.clock() - (expected + self.margin)
+        if late > self.period / 2:
+            # read() was called too late, skip to the next update
+            skipped = int(late / self.period + 0.5)
+            self.skipped += skipped
+            index += skipped
+            expected += skipped * self.period
+        self._index = index
+
+        uncertainty = self.poll_interval / 2
+        probe = (index - self._base[0]) >= self.probe_every or \
+            self._guard > self.guard
+        if probe:
+            self._sleep_until(expected - self._guard)
+            not_ready_time, ready_time = self._poll(2 * self.period)
+            if not_ready_time is None:
+                # the update came earlier than expected, probe earlier
+                self._guard = min(2 * self._guard, self.period / 2)
+            self._observe(index, not_ready_time, ready_time)
+        else:
+            self._sleep_until(expected + self.margin)
+            if self.check_ready:
+                not_ready_time, ready_time = self._poll(2 * self.period)
+                if not_ready_time is not None:
+                    # the update came later than expected
+                    self.duplicates += 1
+                    self._observe(index, not_ready_time, ready_time)
+        words = self.device.read_measured_values()
+        self.samples += 1
+        if probe and self._base[0] == index:
+            expected = self._base[1]
+        return PolledSample(words, expected, self.clock(), uncertainty)
+
+    def statistics(self):
+        return {
+            "samples": self.samples,
+            "period": self.period,
+            "missed_deadlines": self.missed_deadlines,
+            "skipped": self.skipped,
+            "duplicates": self.duplicates,
+            "probes": self.probes,
+            "polls": self.polls,
+            "max_lateness": self.max_lateness,
+        }
@@ -0,0 +1,243 @@
+# Copyright (c) 2022, Sensirion AG
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# # Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# # Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# # Neither the name of Sensirion AG nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+# (c) Copyright 2022 Sensirion AG, Switzerland
+
+# Declarative configuration profiles for the SEN5x tuning registers
+#
+# A profile lists the desired values of some or all of the registers the
+# configuration examples change one by one (temperature compensation
+# 0x60B2, warm start 0x60C6, VOC tuning 0x60D0, NOx tuning 0x60E1 and RH/T
+# acceleration mode 0x60F7). apply_profile() reads each register once,
+# writes only the registers which differ and reads back only the written
+# ones, so applying a profile to a sensor which already matches costs one
+# read per register and no writes.
+#
+# Usage:
+#
+#   profile = {
+#       "voc_tuning": {"index_offset": 250, "gating_max_duration": 60},
+#       "rht_acceleration_mode": {"mode": 2},
+#   }
+#   result = apply_profile(Sen5x(SMBus(1)), profile)
+#   print(result.written)
+
+import json
+
+from sensirion_driver import to_signed
+
+# execution time of reading or writing a register in seconds
+REGISTER_DELAY = 0.02
+
+
+class Register(object):
+    """
+        Description of one configuration register.
+        :param str name:
+            Name used in profiles.
+        :param int code:
+            Command code for reading and writing.
+        :param fields:
+            Names of the words in the order they are transferred.
+        :param signed:
+            Names of the fields which are signed.
+        :param defaults:
+            Values after power up or reset according to the datasheet.
+    """
+
+    def __init__(self, name, code, fields, signed=(), defaults=None):
+        self.name = name
+        self.code = code
+        self.fields = tuple(fields)
+        self.signed = frozenset(signed)
+        self.defaults = None
+        if defaults is not None:
+            self.defaults = dict(zip(self.fields, defaults))
+
+    def from_words(self, words):
+        return dict((field, to_signed(word) if field in self.signed else word)
+                    for field, word in zip(self.fields, words))
+
+    def to_words(self, values):
+        return [values[field] & 0xFFFF for field in self.fields]
+
+
+# all values are the raw integers of the datasheet, e.g. the temperature
+# offset in degC * 200 and the slope * 10000
+SEN5X_REGISTERS = dict((register.name, register) for register in (
+    Register("temperature_compensation", 0x60B2,
+             ("offset", "slope", "time_constant"), signed=("offset", "slope"),
+             defaults=(0, 0, 0)),
+    Register("warm_start", 0x60C6, ("parameter",), defaults=(0,)),
+    Register("voc_tuning", 0x60D0,
+             ("index_offset", "learning_time_offset_hours",
+              "learning_time_gain_hours", "gating_max_duration",
+              "std_initial", "gain_factor"),
+             defaults=(100, 12, 12, 180, 50, 230)),
+    Register("nox_tuning", 0x60E1,
+             ("index_offset", "learning_time_offset_hours",
+              "learning_time_gain_hours", "gating_max_duration",
+              "std_initial", "gain_factor"),
+             defaults=(1, 12, 12, 720, 50, 230)),
+    Register("rht_acceleration_mode", 0x60F7, ("mode",), defaults=(0,)),
+))
+
+
+class ProfileResult(object):
+    """
+        Result of apply_profile().
+        :ivar dict before:
+            Register values read before writing, by register name.
+        :ivar dict written:
+            Register values which were written because they differed.
+        :ivar int reads:
+            Number of register reads on the bus.
+        :ivar int writes:
+            Number of register writes.
+    """
+
+    def __init__(self):
+        self.before = {}
+        self.written = {}
+        self.reads = 0
+        self.writes = 0
+
+    @property
+    def changed(self):
+        return bool(self.written)
+
+
+class ProfileMismatch(Exception):
+    """
+        Raised if a written register does not read back as written.
+    """
+
+
+def load_profile(path):
+    """
+        Loads a profile from a JSON file with the same structure as the
+        dictionaries accepted by apply_profile().
+    """
+    with open(path) as f:
+        profile = json.load(f)
+    validate_profile(profile)
+    return profile
+
+
+def validate_profile(profile):
+    """
+        Checks that a profile only contains known registers and fields.
+        :raises ValueError:
+            For unknown register or field names.
+    """
+    for name, values in profile.items():
+        register = SEN5X_REGISTERS.get(name)
+        if register is None:
+            raise ValueError("unknown register '{}'".format(name))
+        for field in values:
+            if field not in register.fields:
+                raise ValueError("unknown field '{}' of register '{}'".format(
+                    field, name))
+
+
+def read_register(sen5x, register):
+    """
+        Reads one register of a Sen5x driver.
+        :return:
+            Dictionary of field values.
+    """
+    words = sen5x.read(register.code, len(register.fields), REGISTER_DELAY)
+    return register.from_words(words)
+
+
+def write_register(sen5x, register, values):
+    sen5x.write(register.code, register.to_words(values), REGISTER_DELAY)
+
+
+def apply_profile(sen5x, profile, verify=True, cache=None):
+    """
+        Brings the registers of a sensor to the state of a profile. Most of
+        the registers can only be written in idle mode, i.e. before the
+        measurement is started.
+        :param sen5x:
+            Sen5x driver from sensirion_driver.py.
+        :param dict profile:
+            Register name -> {field name: raw value}, fields which are not
+            listed keep their current value.
+        :param bool verify:
+            Read back the written registers.
+        :param cache:
+            CachedSen5x from sensirion_state_cache.py, registers with known
+            values are then not read from the sensor.
+        :return:
+            ProfileResult
+        :raises ProfileMismatch:
+            If verify is set and a register does not read back as written.
+    """
+    validate_profile(profile)
+    result = ProfileResult()
+
+    def read(register, refresh=False):
+        if cache is None:
+            result.reads += 1
+            return read_register(sen5x, register)
+        misses = cache.misses
+        values = cache.read_register(register, refresh)
+        result.reads += cache.misses - misses
+        return values
+
+    def write(register, values):
+        if cache is None:
+            write_register(sen5x, register, values)
+        else:
+            cache.write_register(register, values)
+
+    pending = []
+    for name, values in profile.items():
+        register = SEN5X_REGISTERS[name]
+        current = read(register)
+        result.before[name] = current
+        desired = dict(current)
+        desired.update(values)
+        if desired != current:
+            pending.append((register, desired))
+
+    for register, desired in pending:
+        write(register, desired)
+        result.writes += 1
+        result.written[register.name] = desired
+
+    if verify:
+        for register, desired in pending:
+            actual = read(register, refresh=True)
+            if actual != desired:
+                raise ProfileMismatch(
+                    "{} reads back as {} instead of {}".format(
+                        register.name, actual, desired))
+    return result
@@ -0,0 +1,350 @@
+# Copyright (c) 2022, Sensirion AG
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# # Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# # Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# # Neither the name of Sensirion AG nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+# (c) Copyright 2022 Sensirion AG, Switzerland
+
+# Compact records of raw sensor samples
+#
+# A Schema describes the words one sensor family delivers: SEN5x measured
+# values in full and RHT/gas-only mode, SEN5x raw values (0x03D2), SCD4x
+# and LD20. For every schema there is
+#
+# - a record class: an immutable bytes object holding the timestamp
+#   (float64) and the raw 16 bit words, about 90 bytes for a SEN5x sample
+#   instead of about 330 bytes for a list of floats. The fields are scaled
+#   when they are accessed.
+# - a structured NumPy dtype with exactly the same memory layout, so records
+#   can be joined into an array without conversion, and RecordBuffer, a ring
+#   buffer of that dtype for days of samples at 24 bytes per SEN5x sample.
+#
+# Usage:
+#
+#   words = sen5x.read_measured_values()
+#   record = SEN5X_FULL.record(time.time(), words)
+#   print(record.pm2p5, record.temperature)
+#
+#   buffer = RecordBuffer(SEN5X_FULL, capacity=7 * 86400)
+#   buffer.append(time.time(), words)
+#   pm2p5 = buffer.column("pm2p5")
+
+import struct
+
+_NAN = float("nan")
+_TIMESTAMP = struct.Struct("<d")
+
+
+class Field(object):
+    """
+        One word of a sample and its scaling, value = offset + multiplier *
+        word / divisor.
+        :param str name:
+            Name of the field and of the record attribute.
+        :param bool signed:
+            True if the word is a two's complement number.
+        :param missing:
+            Word the sensor sends if the value is not available, None if
+            every word is valid.
+    """
+
+    __slots__ = ("name", "signed", "multiplier", "divisor", "offset",
+                 "missing")
+
+    def __init__(self, name, signed=False, divisor=1, multiplier=1, offset=0,
+                 missing=None):
+        self.name = name
+        self.signed = signed
+        self.multiplier = multiplier
+        self.divisor = divisor
+        self.offset = offset
+        self.missing = missing
+
+    def scale(self, word):
+        """
+            Scales a raw unsigned word, NaN if it marks a missing value.
+        """
+        if word == self.missing:
+            return _NAN
+        if self.signed and word & 0x8000:
+            word -= 0x10000
+        return self.offset + self.multiplier * word / self.divisor
+
+
+class Schema(object):
+    """
+        Layout of the samples of one sensor family.
+        :param str name:
+            Name of the schema, also used for the record class.
+        :param fields:
+            Fields in the order the sensor sends the words.
+        :param int first_word:
+            Index of the first stored word in the words returned by the
+            driver, e.g. 4 to keep only humidity, temperature, VOC and NOx
+            of SEN5x measured values in gas-only mode.
+        :ivar record_class:
+            Record class of the schema, see record().
+    """
+
+    def __init__(self, name, fields, first_word=0):
+        self.name = name
+        self.fields = tuple(fields)
+        self.first_word = first_word
+        self.words = len(self.fields)
+        self.struct = struct.Struct("<d{}H".format(self.words))
+        self.names = tuple(field.name for field in self.fields)
+        self.record_class = _record_class(self)
+        self._dtype = None
+
+    @property
+    def dtype(self):
+        """
+            Structured NumPy dtype with the field timestamp (float64) and
+            one 16 bit integer field per word, same layout as the records.
+        """
+        if self._dtype is None:
+            import numpy as np
+            self._dtype = np.dtype(
+                [("timestamp", "<f8")] +
+                [(field.name, "<i2" if field.signed else "<u2")
+                 for field in self.fields])
+        return self._dtype
+
+    def record(self, timestamp, words):
+        """
+            Creates a record from the words returned by the driver.
+        """
+        return self.record_class(timestamp, words)
+
+    def from_bytes(self, data):
+        """
+            Wraps the bytes of a record, e.g. a row of an array of dtype.
+        """
+        return bytes.__new__(self.record_class, data)
+
+    def to_array(self, records):
+        """
+            Joins records into a structured NumPy array of dtype.
+        """
+        import numpy as np
+        return np.frombuffer(b"".join(records), dtype=self.dtype).copy()
+
+    def decode(self, array):
+        """
+            Scales the fields of a structured array.
+            :return:
+                Dictionary with the float64 array "timestamp" and one float64
+                array per field, NaN where the value is missing.
+        """
+        import numpy as np
+        result = {"timestamp": np.asarray(array["timestamp"],
+                                          dtype=np.float64)}
+        for field in self.fields:
+            words = array[field.name]
+            values = field.offset + field.multiplier * \
+                words.astype(np.float64) / field.divisor
+            if field.missing is not None:
+                # compare the unsigned bit pattern, signed columns are int16
+                unsigned = words.view(np.uint16)
+                values[unsigned == field.missing] = np.nan
+            result[field.name] = values
+        return result
+
+
+def _field_property(schema, index):
+    field = schema.fields[index]
+    offset = _TIMESTAMP.size + 2 * index
+    word = struct.Struct("<H")
+
+    def get(record):
+        return field.scale(word.unpack_from(record, offset)[0])
+    return property(get, doc="{} scaled according to the datasheet".format(
+        field.name))
+
+
+def _record_class(schema):
+    pack = schema.struct.pack
+    unpack = schema.struct.unpack
+    first = schema.first_word
+    last = first + schema.words
+
+    def __new__(cls, timestamp, words):
+        return bytes.__new__(cls, pack(timestamp, *words[first:last]))
+
+    def timestamp(self):
+        return _TIMESTAMP.unpack_from(self)[0]
+
+    def words(self):
+        return unpack(self)[1:]
+
+    def values(self):
+        """
+            Returns all fields scaled, in the order of the schema.
+        """
+        return tuple(field.scale(word)
+                     for field, word in zip(schema.fields, unpack(self)[1:]))
+
+    def __repr__(self):
+        return "{}(timestamp={!r}, {})".format(
+            schema.name, self.timestamp, ", ".join(
+                "{}={!r}".format(name, value)
+                for name, value in zip(schema.names, self.values())))
+
+    namespace = {
+        # a bytes subclass without instance dictionary is not tracked by the
+        # garbage collector and as small as the packed bytes
+        "__slots__": (),
+        "__doc__": "Record of the schema {}, the bytes of one row of "
+                   "its dtype.".format(schema.name),
+        "schema": schema,
+        "__new__": __new__,
+        "timestamp": property(timestamp),
+        "words": property(words),
+        "values": values,
+        "__repr__": __repr__,
+        "__str__": __repr__,
+    }
+    for i in range(schema.words):
+        namespace[schema.fields[i].name] = _field_property(schema, i)
+    return type(schema.name, (bytes,), namespace)
+
+
+_SEN5X_PM = [Field(name, divisor=10, missing=0xFFFF)
+             for name in ("pm1p0", "pm2p5", "pm4p0", "pm10p0")]
+_SEN5X_GAS = [
+    Field("humidity", signed=True, divisor=100, missing=0x7FFF),
+    Field("temperature", signed=True, divisor=200, missing=0x7FFF),
+    Field("voc", signed=True, divisor=10, missing=0x7FFF),
+    Field("nox", signed=True, divisor=10, missing=0x7FFF),
+]
+
+# read measured values (0x03C4) in measurement mode (0x0021)
+SEN5X_FULL = Schema("Sen5xFull", _SEN5X_PM + _SEN5X_GAS)
+
+# read measured values (0x03C4) in RHT/gas-only mode (0x0037), the PM words
+# are always 0xFFFF and not stored
+SEN5X_GAS_ONLY = Schema("Sen5xGasOnly", _SEN5X_GAS, first_word=4)
+
+# read raw values (0x03D2)
+SEN5X_RAW = Schema("Sen5xRaw", [
+    Field("humidity", signed=True, divisor=100, missing=0x7FFF),
+    Field("temperature", signed=True, divisor=200, missing=0x7FFF),
+    Field("voc_ticks", missing=0xFFFF),
+    Field("nox_ticks", missing=0xFFFF),
+])
+
+SCD4X = Schema("Scd4x", [
+    Field("co2"),
+    Field("temperature", divisor=65536, multiplier=175, offset=-45),
+    Field("humidity", divisor=65536, multiplier=100),
+])
+
+LD20 = Schema("Ld20", [
+    Field("flow", signed=True, divisor=1200.0),
+    Field("temperature", signed=True, divisor=200.0),
+])
+
+# schema name -> schema, e.g. to find the schema of stored data
+SCHEMAS = dict((schema.name, schema) for schema in (
+    SEN5X_FULL, SEN5X_GAS_ONLY, SEN5X_RAW, SCD4X, LD20))
+
+
+class RecordBuffer(object):
+    """
+        Ring buffer of samples in a structured NumPy array, the oldest
+        samples are overwritten once it is full.
+        :param schema:
+            One of the schemas above.
+        :param int capacity:
+            Number of samples kept, the memory is allocated at once.
+        :ivar array:
+            The structured array of schema.dtype, in storage order.
+        :ivar int count:
+            Number of samples appended so far.
+    """
+
+    def __init__(self, schema, capacity):
+        import numpy as np
+        self.schema = schema
+        self.capacity = capacity
+        self.array = np.zeros(capacity, dtype=schema.dtype)
+        # the words of each row behind the 4 words of the timestamp
+        self._words = self.array.view(np.uint16).reshape(capacity, -1)[:, 4:]
+        self._first = schema.first_word
+        self._last = schema.first_word + schema.words
+        self._next = 0
+        self.count = 0
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def append(self, timestamp, words):
+        """
+            Stores the words returned by the driver.
+        """
+        i = self._next
+        self.array["timestamp"][i] = timestamp
+        self._words[i] = words[self._first:self._last]
+        self._next = 0 if i + 1 == self.capacity else i + 1
+        self.count += 1
+
+    def samples(self):
+        """
+            Returns the stored samples in chronological order, a view if the
+            buffer did not wrap around yet, a copy otherwise.
+        """
+        import numpy as np
+        if self.count <= self.capacity:
+            return self.array[:self.count]
+        return np.concatenate((self.array[self._next:],
+                               self.array[:self._next]))
+
+    def __getitem__(self, index):
+        """
+            Returns sample index (0 is the oldest, -1 the newest) as record.
+        """
+        n = len(self)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("record index out of range")
+        start = self._next - n if self.count > self.capacity else 0
+        row = self.array[(start + index) % self.capacity]
+        return self.schema.from_bytes(row.tobytes())
+
+    def column(self, name):
+        """
+            Returns one field of all stored samples scaled, in chronological
+            order.
+        """
+        return self.schema.decode(self.samples())[name]
+
+    def nbytes(self):
+        """
+            Returns the memory used by the samples in bytes.
+        """
+        return self.array.nbytes
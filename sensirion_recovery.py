@@ -0,0 +1,389 @@
+# Copyright (c) 2022, Sensirion AG
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# # Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# # Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# # Neither the name of Sensirion AG nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+# (c) Copyright 2022 Sensirion AG, Switzerland
+
+# Classified retries and bus recovery
+#
+# The example scripts either crash on the first OSError or catch every
+# exception and lose the whole measurement period. RecoveryEngine tells the
+# failures apart and retries each class with its own bounded backoff:
+#
+# - nack: the sensor did not acknowledge (EREMOTEIO, ENXIO), e.g. because
+#   it still executes the previous command, retried after a short delay,
+# - crc: the response failed the CRC check (CrcError), the command is
+#   repeated at once,
+# - timeout: the transfer timed out (ETIMEDOUT, EAGAIN), retried with a
+#   longer delay; timeouts which persist are handled as lockup,
+# - lockup: the bus is stuck (EIO, EBUSY), typically a slave holding SDA
+#   low. RecoveringBus clocks SCL nine times by GPIO to release the slave,
+#   if the pins are given and RPi.GPIO is installed, and re-opens the bus
+#   before the command is repeated.
+#
+# Every retry is recorded with device, command code, class and delay, so a
+# glitch shows up in the report instead of as a missing sample.
+#
+# Usage:
+#
+#   bus = RecoveringBus(1, scl=3, sda=2)
+#   engine = RecoveryEngine(bus)
+#   sen5x = Sen5x(bus)
+#   engine.attach(sen5x)
+#   words = sen5x.read_measured_values()
+#
+# or BusScheduler(bus, recovery=engine) to retry within the same cycle.
+
+import errno
+import shutil
+import subprocess
+import time
+from collections import deque, namedtuple
+
+from smbus2 import SMBus
+
+from sensirion_crc import CrcError
+
+try:
+    import RPi.GPIO as GPIO
+except (ImportError, RuntimeError):
+    # not installed or not a Raspberry Pi, no SCL clock out
+    GPIO = None
+
+NACK = "nack"
+CRC = "crc"
+TIMEOUT = "timeout"
+LOCKUP = "lockup"
+ERROR_CLASSES = (NACK, CRC, TIMEOUT, LOCKUP)
+
+_ERRNO_CLASSES = {
+    errno.EREMOTEIO: NACK,
+    errno.ENXIO: NACK,
+    errno.ETIMEDOUT: TIMEOUT,
+    errno.EAGAIN: TIMEOUT,
+    errno.EIO: LOCKUP,
+    errno.EBUSY: LOCKUP,
+}
+
+Retry = namedtuple("Retry", ("timestamp", "device", "code", "error_class",
+                             "attempt", "delay", "error"))
+
+
+def classify(error):
+    """
+        :return:
+            One of ERROR_CLASSES, None for errors which are not retried.
+    """
+    if isinstance(error, CrcError):
+        return CRC
+    if isinstance(error, OSError):
+        return _ERRNO_CLASSES.get(error.errno)
+    return None
+
+
+class RetryPolicy(object):
+    """
+        :param int retries:
+            Number of retries after the first attempt.
+        :param float delay:
+            Delay before the first retry in seconds.
+        :param float max_delay:
+            Upper bound of the delay.
+        :param float backoff:
+            Factor applied to the delay after every retry.
+    """
+
+    def __init__(self, retries, delay, max_delay=None, backoff=2.0):
+        self.retries = retries
+        self.delay = delay
+        self.max_delay = delay if max_delay is None else max_delay
+        self.backoff = backoff
+
+    def delay_for(self, attempt):
+        return min(self.delay * self.backoff ** attempt, self.max_delay)
+
+
+def default_policies():
+    return {
+        # the SEN5x needs up to 20 ms for a command
+        NACK: RetryPolicy(3, 0.002, 0.02),
+        CRC: RetryPolicy(2, 0.0),
+        TIMEOUT: RetryPolicy(2, 0.005, 0.05),
+        # retried once after the bus recovery
+        LOCKUP: RetryPolicy(1, 0.001),
+    }
+
+
+def gpio_clock_out(scl, sda, pulses=9, half_period=5e-6):
+    """
+        Releases a slave holding SDA low: SCL is clocked until SDA is high,
+        at most pulses times, followed by a STOP condition. The pins are
+        driven open drain and returned to their I2C function (ALT0) with
+        pinctrl or raspi-gpio afterwards.
+        :param int scl:
+            BCM number of the SCL pin, 3 for /dev/i2c-1.
+        :param int sda:
+            BCM number of the SDA pin, 2 for /dev/i2c-1.
+        :return:
+            True if SDA was released.
+    """
+    GPIO.setwarnings(False)
+    GPIO.setmode(GPIO.BCM)
+
+    def release(pin):
+        GPIO.setup(pin, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+
+    def pull_low(pin):
+        GPIO.setup(pin, GPIO.OUT, initial=GPIO.LOW)
+
+    try:
+        release(sda)
+        release(scl)
+        for _ in range(pulses):
+            if GPIO.input(sda):
+                break
+            pull_low(scl)
+            time.sleep(half_period)
+            release(scl)
+            time.sleep(half_period)
+        # STOP: SDA rises while SCL is high
+        pull_low(scl)
+        pull_low(sda)
+        time.sleep(half_period)
+        release(scl)
+        time.sleep(half_period)
+        release(sda)
+        time.sleep(half_period)
+        released = bool(GPIO.input(sda))
+    finally:
+        GPIO.cleanup([scl, sda])
+        tool = shutil.which("pinctrl") or shutil.which("raspi-gpio")
+        if tool is not None:
+            for pin in (scl, sda):
+                subprocess.run([tool, "set", str(pin), "a0"], check=False)
+    return released
+
+
+class RecoveringBus(object):
+    """
+        Bus which can be re-opened without updating the drivers using it.
+        :param int number:
+            Bus number, N of /dev/i2c-N.
+        :param open_bus:
+            Called with the bus number to open the bus, SMBus by default.
+        :param scl:
+            BCM pin number of SCL for the clock out, None to skip it.
+        :param sda:
+            BCM pin number of SDA.
+        :ivar int reopens:
+            Number of re-opens.
+        :ivar int clock_outs:
+            Number of SCL clock outs.
+    """
+
+    def __init__(self, number, open_bus=SMBus, scl=None, sda=None):
+        self.number = number
+        self.open_bus = open_bus
+        self.scl = scl
+        self.sda = sda
+        self.bus = open_bus(number)
+        self.reopens = 0
+        self.clock_outs = 0
+
+    def i2c_rdwr(self, *i2c_msgs):
+        self.bus.i2c_rdwr(*i2c_msgs)
+
+    def clock_out(self):
+        """
+            :return:
+                True if the clock out was done.
+        """
+        if GPIO is None or self.scl is None or self.sda is None:
+            return False
+        gpio_clock_out(self.scl, self.sda)
+        self.clock_outs += 1
+        return True
+
+    def reopen(self):
+        try:
+            self.bus.close()
+        except OSError:
+            pass
+        self.bus = self.open_bus(self.number)
+        self.reopens += 1
+
+    def recover(self):
+        self.clock_out()
+        self.reopen()
+
+    def close(self):
+        self.bus.close()
+
+
+class RecoveryEngine(object):
+    """
+        Decides about retries and recovers the bus.
+        :param bus:
+            RecoveringBus recovered on lockups, None if the bus can not be
+            re-opened.
+        :param dict policies:
+            Error class -> RetryPolicy, see default_policies().
+        :param int escalate_after:
+            Number of consecutive timeouts handled as lockup.
+        :param int history:
+            Number of retries kept in retries_log.
+        :param on_retry:
+            Called with every Retry, e.g. to log it.
+        :ivar dict errors:
+            Error class -> number of errors.
+        :ivar dict retries:
+            Error class -> number of retries.
+        :ivar dict failures:
+            Error class -> number of operations given up.
+        :ivar int recovered:
+            Number of operations which succeeded after a retry.
+        :ivar int recoveries:
+            Number of bus recoveries.
+        :ivar retries_log:
+            The latest Retry records.
+    """
+
+    def __init__(self, bus=None, policies=None, escalate_after=3,
+                 history=1000, on_retry=None, clock=time.monotonic,
+                 sleep=time.sleep):
+        self.bus = bus
+        self.policies = default_policies() if policies is None else policies
+        self.escalate_after = escalate_after
+        self.on_retry = on_retry
+        self.clock = clock
+        self.sleep = sleep
+        self.errors = dict.fromkeys(ERROR_CLASSES, 0)
+        self.retries = dict.fromkeys(ERROR_CLASSES, 0)
+        self.failures = dict.fromkeys(ERROR_CLASSES, 0)
+        self.recovered = 0
+        self.recoveries = 0
+        self.retries_log = deque(maxlen=history)
+        self._timeouts = 0
+
+    def retry_delay(self, device, code, error, attempt):
+        """
+            Classifies a failed attempt and recovers the bus on lockups.
+            :param str device:
+                Device name for the report.
+            :param code:
+                Command code for the report.
+            :param int attempt:
+                Number of retries done so far for this operation.
+            :return:
+                Delay in seconds before the next attempt, None if the
+                operation should fail.
+        """
+        error_class = classify(error)
+        if error_class is None:
+            return None
+        self.errors[error_class] += 1
+        limit = self.policies[error_class].retries
+        if error_class == TIMEOUT:
+            self._timeouts += 1
+            if attempt >= limit or self._timeouts >= self.escalate_after:
+                # give the bus recovery a chance before giving up
+                error_class = LOCKUP
+                limit += self.policies[LOCKUP].retries
+        else:
+            self._timeouts = 0
+        policy = self.policies[error_class]
+        if attempt >= limit:
+            self.failures[error_class] += 1
+            return None
+        if error_class == LOCKUP:
+            if self.bus is None:
+                self.failures[error_class] += 1
+                return None
+            self.bus.recover()
+            self.recoveries += 1
+            self._timeouts = 0
+        delay = policy.delay_for(attempt)
+        self.retries[error_class] += 1
+        retry = Retry(self.clock(), device, code, error_class, attempt + 1,
+                      delay, error)
+        self.retries_log.append(retry)
+        if self.on_retry is not None:
+            self.on_retry(retry)
+        return delay
+
+    def succeeded(self, attempt):
+        """
+            Reports the success of an operation after attempt retries.
+        """
+        self._timeouts = 0
+        if attempt:
+            self.recovered += 1
+
+    def call(self, function, *args, device=None, code=None):
+        """
+            Calls function(*args) until it succeeds or the policy of its
+            error class gives up, then the last error is raised.
+        """
+        attempt = 0
+        while True:
+            try:
+                result = function(*args)
+            except (OSError, CrcError) as error:
+                delay = self.retry_delay(device, code, error, attempt)
+                if delay is None:
+                    raise
+                attempt += 1
+                if delay:
+                    self.sleep(delay)
+                continue
+            self.succeeded(attempt)
+            return result
+
+    def attach(self, device, name=None):
+        """
+            Retries the commands of a driver from sensirion_driver.py, also
+            on top of a Tracer.
+        """
+        if name is None:
+            name = "{}@0x{:02X}".format(type(device).__name__, device.address)
+        execute = device.execute
+        call = self.call
+
+        def retrying_execute(command):
+            return call(execute, command, device=name, code=command.code)
+
+        device.execute = retrying_execute
+
+    def statistics(self):
+        return {
+            "errors": dict(self.errors),
+            "retries": dict(self.retries),
+            "failures": dict(self.failures),
+            "recovered": self.recovered,
+            "recoveries": self.recoveries,
+        }
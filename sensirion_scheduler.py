@@ -0,0 +1,261 @@
+# Copyright (c) 2022, Sensirion AG
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# # Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# # Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# # Neither the name of Sensirion AG nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+# (c) Copyright 2022 Sensirion AG, Switzerland
+
+# Single process scheduler for several sensors on one I2C bus
+#
+# Every measurement command is split into its write phase (sending the
+# command), the execution time of the sensor and its read phase. The
+# scheduler owns the bus and services other sensors while one sensor
+# executes its command, so SEN5x, SCD4x and LD20 can share /dev/i2c-1
+# without blocking each other. Each sensor is polled on its own absolute
+# cadence; a cycle which can not be served in time is counted as missed
+# instead of shifting all following cycles.
+#
+# Usage:
+#
+#   scheduler = BusScheduler(bus)
+#   scheduler.add(Sen5x(bus), period=1.0, callback=print_sen5x)
+#   scheduler.add(Scd4x(bus), period=5.0, callback=print_scd4x)
+#   scheduler.run(duration=60)
+
+import heapq
+import time
+
+from sensirion_crc import CrcError
+
+_READ = 0
+_WRITE = 1
+
+
+class ScheduledDevice(object):
+    """
+        A sensor registered with BusScheduler.add() and its statistics.
+        :ivar int samples:
+            Number of successfully read samples.
+        :ivar int missed:
+            Number of cycles which were skipped because the bus was busy.
+        :ivar int crc_errors:
+            Number of responses which failed the CRC check.
+        :ivar int io_errors:
+            Number of transfers which raised an OSError.
+        :ivar float max_lateness:
+            Largest delay in seconds between the planned and the actual
+            start of a cycle.
+        :ivar int retries:
+            Number of cycles repeated after an error, see the recovery
+            parameter of BusScheduler.
+    """
+
+    def __init__(self, device, period, command, callback, name):
+        self.device = device
+        self.period = period
+        self.command = command
+        self.callback = callback
+        self.name = name
+        self.offset = 0.0
+        self.due = 0.0
+        self.samples = 0
+        self.missed = 0
+        self.crc_errors = 0
+        self.io_errors = 0
+        self.max_lateness = 0.0
+        self.retries = 0
+        self.attempt = 0
+
+
+class BusScheduler(object):
+    """
+        Interleaves the measurement commands of several sensors on one bus.
+        :param bus:
+            The smbus2.SMBus shared by all sensors.
+        :param recovery:
+            RecoveryEngine from sensirion_recovery.py, failed cycles are
+            then repeated after the delay of its retry policy instead of
+            waiting for the next period.
+    """
+
+    def __init__(self, bus, clock=time.monotonic, sleep=time.sleep,
+                 recovery=None):
+        self.bus = bus
+        self.recovery = recovery
+        self.clock = clock
+        self.sleep = sleep
+        self.devices = []
+        self._events = []
+        self._sequence = 0
+        self._stopped = False
+
+    def add(self, device, period, callback=None, execution_time=None,
+            offset=0.0, name=None):
+        """
+            Registers a sensor.
+            :param device:
+                Driver from sensirion_driver.py, the measurement has to be
+                started already.
+            :param float period:
+                Time between two reads in seconds.
+            :param callback:
+                Called as callback(scheduled_device, words, timestamp) for
+                every sample, words is overwritten by the next sample.
+            :param float execution_time:
+                Time between the write and the read phase, defaults to the
+                execution time of the driver's measurement command.
+            :param float offset:
+                Delay of the first read after run() is called.
+        """
+        command = device.measurement_command()
+        if execution_time is not None:
+            command.delay = execution_time
+        entry = ScheduledDevice(device, period, command, callback,
+                                name or type(device).__name__)
+        entry.offset = offset
+        self.devices.append(entry)
+        return entry
+
+    def _push(self, when, kind, entry):
+        # reads are served before writes which are due at the same time,
+        # the sequence number keeps the order of equal events stable
+        self._sequence += 1
+        heapq.heappush(self._events, (when, kind, self._sequence, entry))
+
+    def run(self, duration=None, samples=None):
+        """
+            Runs the schedule until duration seconds have elapsed or the
+            given number of samples has been read, whichever comes first.
+            Without limits it runs until stop() is called. A stop() which
+            arrives before run() starts ends it right away, see
+            clear_stop().
+        """
+        start = self.clock()
+        self._events = []
+        for entry in self.devices:
+            entry.due = start + entry.offset
+            self._push(entry.due, _WRITE, entry)
+        end = None if duration is None else start + duration
+        try:
+            self._loop(end, samples)
+        finally:
+            self._stopped = False
+
+    def _loop(self, end, samples):
+        count = 0
+        while self._events and not self._stopped:
+            when, kind, _, entry = heapq.heappop(self._events)
+            if kind == _WRITE and end is not None and when > end:
+                # no new cycles, pending reads are still completed
+                continue
+            now = self.clock()
+            if when > now:
+                self.sleep(when - now)
+                now = self.clock()
+            if kind == _WRITE:
+                entry.max_lateness = max(entry.max_lateness, now - entry.due)
+                if entry.command.write_msg is not None:
+                    self._write(entry, now)
+                    continue
+            if self._read(entry, now):
+                count += 1
+                if samples is not None and count >= samples:
+                    break
+
+    def stop(self):
+        """
+            Ends run() after the current transfer, may be called from another
+            thread or a callback.
+        """
+        self._stopped = True
+
+    def clear_stop(self):
+        """
+            Forgets a stop() which arrived while run() was not active, e.g.
+            before a thread calls run() again.
+        """
+        self._stopped = False
+
+    def _next_cycle(self, entry, now):
+        entry.due += entry.period
+        if entry.due < now:
+            # skip the cycles which can not be served anymore
+            skipped = int((now - entry.due) // entry.period) + 1
+            entry.missed += skipped
+            entry.due += skipped * entry.period
+        self._push(entry.due, _WRITE, entry)
+
+    def _retry(self, entry, error):
+        """
+            :return:
+                True if the cycle is repeated.
+        """
+        if self.recovery is None:
+            return False
+        delay = self.recovery.retry_delay(entry.name, entry.command.code,
+                                          error, entry.attempt)
+        if delay is None:
+            entry.attempt = 0
+            return False
+        entry.attempt += 1
+        entry.retries += 1
+        self._push(self.clock() + delay, _WRITE, entry)
+        return True
+
+    def _write(self, entry, now):
+        command = entry.command
+        try:
+            self.bus.i2c_rdwr(command.write_msg)
+        except OSError as error:
+            entry.io_errors += 1
+            if not self._retry(entry, error):
+                self._next_cycle(entry, now)
+            return
+        self._push(now + command.delay, _READ, entry)
+
+    def _read(self, entry, now):
+        command = entry.command
+        try:
+            self.bus.i2c_rdwr(command.read_msg)
+            words = command.decode()
+        except (CrcError, OSError) as error:
+            if isinstance(error, CrcError):
+                entry.crc_errors += 1
+            else:
+                entry.io_errors += 1
+            if not self._retry(entry, error):
+                self._next_cycle(entry, now)
+            return False
+        timestamp = self.clock()
+        if self.recovery is not None:
+            self.recovery.succeeded(entry.attempt)
+            entry.attempt = 0
+        self._next_cycle(entry, now)
+        entry.samples += 1
+        if entry.callback is not None:
+            entry.callback(entry, words, timestamp)
+        return True
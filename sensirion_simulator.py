@@ -0,0 +1,676 @@
+# Copyright (c) 2022, Sensirion AG
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# # Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# # Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# # Neither the name of Sensirion AG nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+# (c) Copyright 2022 Sensirion AG, Switzerland
+
+# Simulated I2C bus with SEN5x, SCD4x and LD20 models
+#
+# SimulatedBus is an in-process stand-in for smbus2.SMBus: it implements
+# i2c_rdwr() and answers the commands used by the example scripts with valid
+# CRCs, keeps written parameters and enforces the execution times of the
+# commands. With a VirtualClock no real time passes at all, which allows to
+# benchmark and test the acquisition code on any Linux box.
+#
+# Usage:
+#
+#   clock = VirtualClock()
+#   bus = SimulatedBus([SimulatedSen5x()], clock=clock.monotonic,
+#                      sleep=clock.sleep, byte_time=90e-6)
+#   sen5x = Sen5x(bus, sleep=clock.sleep)
+
+import errno
+import math
+import time
+from ctypes import POINTER, c_char, cast, memmove
+
+from sensirion_crc import CRC8_INIT, CRC8_TABLE, pack_words
+
+
+def nack(message):
+    """
+        Returns the OSError smbus2 raises if the sensor does not acknowledge.
+    """
+    return OSError(errno.EREMOTEIO, "Remote I/O error: " + message)
+
+
+class VirtualClock(object):
+    """
+        Simulated time.monotonic() and time.sleep(), sleeping only advances
+        the clock.
+    """
+
+    def __init__(self, start=0.0):
+        self.now = start
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            self.now += seconds
+
+
+class SimulatedSensor(object):
+    """
+        Base class of the sensor models.
+        :param int address:
+            I2C address, the default address of the sensor if None.
+        :param signal:
+            Function signal(t) returning the physical values at time t,
+            the default produces slowly changing values.
+        :ivar bool strict_timing:
+            If True, the sensor does not acknowledge reads and writes during
+            the execution time of the previous command. Off by default
+            because the example scripts wait less than the datasheet
+            execution times.
+    """
+
+    ADDRESS = None
+    strict_timing = False
+
+    # command code -> (execution time in s, number of parameter words,
+    # handler method name)
+    COMMANDS = {}
+
+    def __init__(self, address=None, signal=None):
+        self.address = self.ADDRESS if address is None else address
+        if signal is not None:
+            self.signal = signal
+        self.response = b""
+        self.ready_at = 0.0
+        self.busy_until = 0.0
+        self.commands_executed = 0
+
+    def write(self, data, now):
+        if self.strict_timing and now < self.busy_until:
+            raise nack("0x{:02X} is busy".format(self.address))
+        if len(data) < 2:
+            raise nack("incomplete command")
+        code = data[0] << 8 | data[1]
+        if code not in self.COMMANDS:
+            raise nack("unknown command 0x{:04X}".format(code))
+        delay, n_words, handler = self.COMMANDS[code]
+        words = None
+        if len(data) > 2:
+            words = self._check_words(data[2:], n_words)
+        response = getattr(self, handler)(code, words, now)
+        self.response = b"" if response is None else bytes(pack_words(response))
+        self.ready_at = now + delay
+        self.busy_until = now + delay
+        self.commands_executed += 1
+
+    def read(self, length, now):
+        if self.strict_timing and now < self.ready_at:
+            raise nack("command of 0x{:02X} still executing".format(
+                self.address))
+        data = self.response[:length]
+        self.response = b""
+        # SDA stays high if more bytes are read than the sensor sends
+        return data + b"\xff" * (length - len(data))
+
+    @staticmethod
+    def _check_words(data, n_words):
+        if len(data) != 3 * n_words:
+            raise nack("expected {} parameter words".format(n_words))
+        words = []
+        for i in range(0, len(data), 3):
+            msb, lsb = data[i], data[i + 1]
+            if CRC8_TABLE[CRC8_TABLE[CRC8_INIT ^ msb] ^ lsb] != data[i + 2]:
+                raise nack("CRC error in parameter word {}".format(i // 3))
+            words.append(msb << 8 | lsb)
+        return words
+
+
+def _word(value):
+    # rounded, negative values as two's complement
+    return int(round(value)) & 0xFFFF
+
+
+class SimulatedSen5x(SimulatedSensor):
+    """
+        Model of a SEN55. The measured values are published every second
+        after the start of a measurement, the VOC and NOx index are not
+        available (0x7FFF) during the first voc_startup and nox_startup
+        seconds. Writing the VOC algorithm state (0x6181) in idle mode before
+        the start shortens the VOC start up to restored_voc_startup.
+        Both start up times are assumed defaults, not measured values of a
+        real sensor.
+    """
+
+    ADDRESS = 0x69
+
+    IDLE = 0
+    MEASUREMENT = 1
+    RHT_GAS_ONLY = 2
+
+    COMMANDS = {
+        0x0021: (0.05, 0, "_start_measurement"),
+        0x0037: (0.05, 0, "_start_measurement"),
+        0x0104: (0.2, 0, "_stop_measurement"),
+        0x0202: (0.02, 0, "_read_data_ready"),
+        0x03C4: (0.02, 0, "_read_measured_values"),
+        0x03D2: (0.02, 0, "_read_raw_values"),
+        0x60B2: (0.02, 3, "_parameter"),
+        0x60C6: (0.02, 1, "_parameter"),
+        0x60D0: (0.02, 6, "_parameter"),
+        0x60E1: (0.02, 6, "_parameter"),
+        0x60F7: (0.02, 1, "_parameter"),
+        0x6181: (0.02, 4, "_voc_state"),
+        0xD033: (0.02, 0, "_read_serial_number"),
+        0xD206: (0.02, 0, "_read_device_status"),
+        0xD304: (0.1, 0, "_device_reset"),
+    }
+
+    # parameters which may only be written in idle mode
+    IDLE_ONLY = (0x60C6, 0x60D0, 0x60E1, 0x60F7, 0x6181)
+
+    def __init__(self, address=None, signal=None, update_interval=1.0,
+                 voc_startup=60.0, nox_startup=300.0,
+                 restored_voc_startup=2.0, serial_number="SIMULATED0001"):
+        super().__init__(address, signal)
+        self.serial_number = serial_number
+        self.update_interval = update_interval
+        self.voc_startup = voc_startup
+        self.nox_startup = nox_startup
+        self.restored_voc_startup = restored_voc_startup
+        self.device_status = 0
+        self.power_cycle()
+
+    def power_cycle(self):
+        """
+            Simulates a power loss: the sensor returns to idle mode and all
+            parameters to their default values.
+        """
+        self.mode = self.IDLE
+        self.started_at = 0.0
+        self.last_read_sample = 0
+        self.voc_state_restored = False
+        # default values according to the datasheet
+        self.parameters = {
+            0x60B2: [0, 0, 0],
+            0x60C6: [0],
+            0x60D0: [100, 12, 12, 180, 50, 230],
+            0x60E1: [1, 12, 12, 720, 50, 230],
+            0x60F7: [0],
+            0x6181: [0, 0, 0, 0],
+        }
+
+    @staticmethod
+    def signal(t):
+        """
+            Default signal: pm1p0, pm2p5, pm4p0, pm10p0, humidity,
+            temperature, voc, nox, raw humidity, raw temperature, voc and
+            nox ticks.
+        """
+        wave = math.sin(t / 600.0)
+        return (5 + 2 * wave, 8 + 3 * wave, 10 + 3 * wave, 11 + 3 * wave,
+                45 + 5 * wave, 23 + 2 * wave, 100 + 20 * wave, 1 + wave,
+                46 + 5 * wave, 24 + 2 * wave, 30000 + 500 * wave,
+                16000 + 200 * wave)
+
+    def _sample_index(self, now):
+        return int((now - self.started_at) // self.update_interval)
+
+    def _require_measurement(self, code):
+        if self.mode == self.IDLE:
+            raise nack("0x{:04X} requires measurement mode".format(code))
+
+    def _start_measurement(self, code, words, now):
+        mode = self.MEASUREMENT if code == 0x0021 else self.RHT_GAS_ONLY
+        if mode == self.mode:
+            raise nack("measurement already running")
+        if self.mode == self.IDLE:
+            self.started_at = now
+            self.last_read_sample = 0
+        # switching between the two measurement modes keeps the timing
+        self.mode = mode
+
+    def _stop_measurement(self, code, words, now):
+        self.mode = self.IDLE
+        self.voc_state_restored = False
+
+    def _read_data_ready(self, code, words, now):
+        self._require_measurement(code)
+        return [int(self._sample_index(now) > self.last_read_sample)]
+
+    def _values(self, now):
+        sample = self._sample_index(now)
+        self.last_read_sample = sample
+        sample_time = self.started_at + sample * self.update_interval
+        return self.signal(sample_time), sample_time - self.started_at
+
+    def _read_measured_values(self, code, words, now):
+        self._require_measurement(code)
+        values, elapsed = self._values(now)
+        if elapsed < self.update_interval:
+            # no measurement published yet
+            return [0xFFFF] * 4 + [0x7FFF] * 4
+        result = [_word(10 * v) for v in values[:4]]
+        if self.mode == self.RHT_GAS_ONLY:
+            result = [0xFFFF] * 4
+        result += [_word(100 * values[4]), _word(200 * values[5])]
+        voc_startup = self.voc_startup
+        if self.voc_state_restored:
+            voc_startup = self.restored_voc_startup
+        result.append(0x7FFF if elapsed < voc_startup else _word(10 * values[6]))
+        result.append(0x7FFF if elapsed < self.nox_startup else _word(10 * values[7]))
+        return result
+
+    def _read_raw_values(self, code, words, now):
+        self._require_measurement(code)
+        values, elapsed = self._values(now)
+        if elapsed < self.update_interval:
+            return [0x7FFF] * 2 + [0xFFFF] * 2
+        return [_word(100 * values[8]), _word(200 * values[9]),
+                _word(values[10]), _word(values[11])]
+
+    def _parameter(self, code, words, now):
+        if words is None:
+            return self.parameters[code]
+        if code in self.IDLE_ONLY and self.mode != self.IDLE:
+            raise nack("0x{:04X} can only be written in idle mode".format(code))
+        self.parameters[code] = words
+        return None
+
+    def _voc_state(self, code, words, now):
+        response = self._parameter(code, words, now)
+        if words is not None:
+            self.voc_state_restored = True
+        elif self.mode != self.IDLE:
+            # the algorithm state evolves while measuring
+            elapsed = int(now - self.started_at)
+            self.parameters[code] = [(elapsed >> 16) & 0xFFFF,
+                                     elapsed & 0xFFFF, 0x1234, 0x5678]
+            response = self.parameters[code]
+        return response
+
+    def _read_device_status(self, code, words, now):
+        return [self.device_status >> 16, self.device_status & 0xFFFF]
+
+    def _read_serial_number(self, code, words, now):
+        # 32 bytes of null terminated ASCII
+        data = self.serial_number.encode("ascii")[:31].ljust(32, b"\0")
+        return [data[i] << 8 | data[i + 1] for i in range(0, 32, 2)]
+
+    def _device_reset(self, code, words, now):
+        self.power_cycle()
+
+
+class SimulatedScd4x(SimulatedSensor):
+    """
+        Model of a SCD40/SCD41 in periodic measurement mode, a new sample
+        is published every 5 s.
+    """
+
+    ADDRESS = 0x62
+
+    COMMANDS = {
+        0x21B1: (0.0, 0, "_start_periodic_measurement"),
+        0x3F86: (0.5, 0, "_stop_periodic_measurement"),
+        0xE4B8: (0.001, 0, "_get_data_ready_status"),
+        0xEC05: (0.001, 0, "_read_measurement"),
+    }
+
+    def __init__(self, address=None, signal=None, update_interval=5.0):
+        super().__init__(address, signal)
+        self.update_interval = update_interval
+        self.measuring = False
+        self.started_at = 0.0
+        self.last_read_sample = 0
+
+    @staticmethod
+    def signal(t):
+        """
+            Default signal: co2 in ppm, temperature, humidity.
+        """
+        wave = math.sin(t / 600.0)
+        return 600 + 150 * wave, 23 + 2 * wave, 45 + 5 * wave
+
+    def write(self, data, now):
+        # in periodic mode only a few commands are accepted
+        if self.measuring and len(data) >= 2 and \
+                (data[0] << 8 | data[1]) == 0x21B1:
+            raise nack("periodic measurement already running")
+        super().write(data, now)
+
+    def _sample_index(self, now):
+        return int((now - self.started_at) // self.update_interval)
+
+    def _start_periodic_measurement(self, code, words, now):
+        self.measuring = True
+        self.started_at = now
+        self.last_read_sample = 0
+
+    def _stop_periodic_measurement(self, code, words, now):
+        self.measuring = False
+
+    def _get_data_ready_status(self, code, words, now):
+        ready = self.measuring and self._sample_index(now) > self.last_read_sample
+        return [0x8006 if ready else 0x8000]
+
+    def _read_measurement(self, code, words, now):
+        if not self.measuring or self._sample_index(now) < 1:
+            raise nack("no measurement available")
+        sample = self._sample_index(now)
+        self.last_read_sample = sample
+        co2, temperature, humidity = self.signal(
+            self.started_at + sample * self.update_interval)
+        return [_word(co2), _word((temperature + 45) * 65536 / 175),
+                _word(humidity * 65536 / 100)]
+
+
+class SimulatedLd20(SimulatedSensor):
+    """
+        Model of a LD20 in continuous H2O measurement, the flow is updated
+        every update_interval seconds, 0.5 ms like the sensor (up to
+        LD20_MAX_RATE of sensirion_ld20_stream.py).
+    """
+
+    ADDRESS = 0x08
+
+    COMMANDS = {
+        0x3608: (0.012, 0, "_start_continuous_measurement"),
+        0x3FF9: (0.0, 0, "_stop_continuous_measurement"),
+    }
+
+    def __init__(self, address=None, signal=None, update_interval=0.0005):
+        super().__init__(address, signal)
+        self.update_interval = update_interval
+        self.measuring = False
+        self.started_at = 0.0
+
+    @staticmethod
+    def signal(t):
+        """
+            Default signal: flow in ml/min, temperature.
+        """
+        return 5 * math.sin(2 * math.pi * t), 25.0
+
+    def write(self, data, now):
+        if self.measuring and len(data) >= 2 and \
+                (data[0] << 8 | data[1]) != 0x3FF9:
+            raise nack("only the stop command is accepted while measuring")
+        super().write(data, now)
+
+    def _start_continuous_measurement(self, code, words, now):
+        self.measuring = True
+        self.started_at = now
+
+    def _stop_continuous_measurement(self, code, words, now):
+        self.measuring = False
+
+    def read(self, length, now):
+        if not self.measuring:
+            return super().read(length, now)
+        if self.strict_timing and now < self.ready_at:
+            raise nack("first measurement not finished")
+        sample = int((now - self.started_at) // self.update_interval)
+        flow, temperature = self.signal(
+            self.started_at + sample * self.update_interval)
+        data = bytes(pack_words([_word(flow * 1200), _word(temperature * 200),
+                                 0]))[:length]
+        return data + b"\xff" * (length - len(data))
+
+
+class SimulatedTca9548a(object):
+    """
+        Model of a TCA9548A I2C multiplexer. Writing the control register
+        connects the channels whose bits are set to the bus, reading returns
+        the control register.
+        :ivar int switches:
+            Number of control register writes.
+    """
+
+    ADDRESS = 0x70
+
+    def __init__(self, address=None):
+        self.address = self.ADDRESS if address is None else address
+        self.control = 0
+        self.channels = [{} for _ in range(8)]
+        self.switches = 0
+
+    def attach(self, channel, sensor):
+        self.channels[channel][sensor.address] = sensor
+        return sensor
+
+    def connected(self, address):
+        """
+            :return:
+                The sensors with the given address on all enabled channels.
+        """
+        return [self.channels[channel][address] for channel in range(8)
+                if self.control & (1 << channel) and
+                address in self.channels[channel]]
+
+    def write(self, data, now):
+        if len(data) != 1:
+            raise nack("TCA9548A expects one control byte")
+        self.control = data[0]
+        self.switches += 1
+
+    def read(self, length, now):
+        return bytes([self.control]) * length
+
+
+class SimulatedBus(object):
+    """
+        Stand-in for smbus2.SMBus implementing i2c_rdwr().
+        :param sensors:
+            Sensor models and SimulatedTca9548a multiplexers connected to
+            the bus. Sensors behind a multiplexer respond while their
+            channel is enabled, two responding devices raise an error.
+        :param clock:
+            Time source, time.monotonic or VirtualClock.monotonic.
+        :param sleep:
+            Used to let the transfer time pass, time.sleep or
+            VirtualClock.sleep.
+        :param float byte_time:
+            Duration of one byte on the bus, including ACK, e.g. 90e-6 for
+            100 kHz. The address byte of each message is counted as well.
+        :param float transfer_overhead:
+            Additional duration of every i2c_rdwr() call, e.g. the ioctl.
+        :ivar int transfers:
+            Number of i2c_rdwr() calls.
+        :ivar int bytes:
+            Number of transferred bytes including address bytes.
+        :ivar float bus_time:
+            Accumulated transfer time in seconds.
+        :ivar bool locked:
+            True while an injected bus lockup lasts.
+    """
+
+    def __init__(self, sensors=(), clock=time.monotonic, sleep=time.sleep,
+                 byte_time=0.0, transfer_overhead=0.0):
+        self.sensors = {}
+        self.muxes = []
+        for sensor in sensors:
+            self.add(sensor)
+        self.clock = clock
+        self.sleep = sleep
+        self.byte_time = byte_time
+        self.transfer_overhead = transfer_overhead
+        self.transfers = 0
+        self.bytes = 0
+        self.bus_time = 0.0
+        self.faults = []
+        self.locked = False
+
+    def inject(self, fault, count=1):
+        """
+            Lets the next count transfers fail:
+
+            - "nack": the device does not acknowledge (EREMOTEIO),
+            - "timeout": the transfer times out (ETIMEDOUT),
+            - "crc": the first byte of the next read is corrupted,
+            - "lockup": SDA is held low, every transfer fails with EIO
+              until the bus is closed, i.e. re-opened.
+        """
+        self.faults += [fault] * count
+
+    def _fault(self, i2c_msgs):
+        if self.locked:
+            raise OSError(errno.EIO, "Input/output error: bus locked up")
+        if not self.faults:
+            return None
+        fault = self.faults.pop(0)
+        if fault == "nack":
+            raise nack("injected")
+        if fault == "timeout":
+            raise OSError(errno.ETIMEDOUT, "Connection timed out")
+        if fault == "lockup":
+            self.locked = True
+            raise OSError(errno.EIO, "Input/output error: bus locked up")
+        if not any(msg.flags for msg in i2c_msgs):
+            # a CRC error needs a read, keep it for the next one
+            self.faults.insert(0, fault)
+            return None
+        return fault
+
+    def add(self, sensor):
+        self.sensors[sensor.address] = sensor
+        if isinstance(sensor, SimulatedTca9548a):
+            self.muxes.append(sensor)
+        return sensor
+
+    def _device(self, address):
+        if not self.muxes and address in self.sensors:
+            return self.sensors[address]
+        devices = []
+        if address in self.sensors:
+            devices.append(self.sensors[address])
+        for mux in self.muxes:
+            devices += mux.connected(address)
+        if not devices:
+            raise nack("no device at 0x{:02X}".format(address))
+        if len(devices) > 1:
+            raise OSError(errno.EIO, "address conflict at 0x{:02X}".format(
+                address))
+        return devices[0]
+
+    def i2c_rdwr(self, *i2c_msgs):
+        fault = self._fault(i2c_msgs) if self.faults or self.locked else None
+        n_bytes = 0
+        for msg in i2c_msgs:
+            n_bytes += msg.len + 1
+        duration = self.transfer_overhead + n_bytes * self.byte_time
+        if duration:
+            self.sleep(duration)
+        self.transfers += 1
+        self.bytes += n_bytes
+        self.bus_time += duration
+        now = self.clock()
+        for msg in i2c_msgs:
+            sensor = self._device(msg.addr)
+            if msg.flags:
+                data = sensor.read(msg.len, now)
+                if fault == "crc":
+                    data = bytes([data[0] ^ 0x01]) + data[1:]
+                memmove(msg.buf, data, msg.len)
+            else:
+                sensor.write(bytes(msg), now)
+
+    def close(self):
+        # re-opening the bus ends a lockup
+        self.locked = False
+
+
+class FrameBus(object):
+    """
+        Stand-in for smbus2.SMBus which answers every read with the same
+        frame and ignores writes. Unlike SimulatedBus it allocates no memory
+        for a message it has seen in the previous read, so allocations
+        measured around a driver are the driver's own.
+        :param bytes frame:
+            Response, e.g. pack_words() of the measured values. Reads
+            shorter than the frame get its beginning.
+    """
+
+    def __init__(self, frame):
+        self.frame = frame
+        self._msg = None
+        self._buffer = None
+
+    def i2c_rdwr(self, *i2c_msgs):
+        # indexes instead of iterating, a tuple iterator would allocate
+        i = 0
+        while i < len(i2c_msgs):
+            msg = i2c_msgs[i]
+            if msg.flags:
+                if msg is not self._msg:
+                    raw = cast(msg.buf, POINTER(c_char * msg.len)).contents
+                    self._msg = msg
+                    self._buffer = memoryview(raw).cast("B")
+                self._buffer[:] = self.frame[:len(self._buffer)]
+            i += 1
+
+    def close(self):
+        pass
+
+
+def run_script(path, sensors=None, byte_time=90e-6):
+    """
+        Runs one of the example scripts against a simulated bus in virtual
+        time: smbus2.SMBus, time.sleep and time.monotonic are replaced while
+        the script runs. Scripts using asyncio are not supported, the event
+        loop keeps waiting in real time.
+        :param str path:
+            File name of the script.
+        :param sensors:
+            Sensor models, one model of each sensor type if None.
+        :return:
+            The SimulatedBus, e.g. to inspect its transfer counters.
+    """
+    import runpy
+    import smbus2
+
+    clock = VirtualClock()
+    if sensors is None:
+        sensors = [SimulatedSen5x(), SimulatedScd4x(), SimulatedLd20()]
+    bus = SimulatedBus(sensors, clock=clock.monotonic, sleep=clock.sleep,
+                       byte_time=byte_time)
+    original_smbus, original_sleep = smbus2.SMBus, time.sleep
+    original_monotonic = time.monotonic
+    smbus2.SMBus = lambda *args, **kwargs: bus
+    time.sleep, time.monotonic = clock.sleep, clock.monotonic
+    try:
+        runpy.run_path(path, run_name="__main__")
+    finally:
+        smbus2.SMBus, time.sleep = original_smbus, original_sleep
+        time.monotonic = original_monotonic
+    return bus
+
+
+if __name__ == "__main__":
+    # e.g. 'python3 sensirion_simulator.py SEN5x_I2C_minimal_example.py'
+    import sys
+
+    for script in sys.argv[1:]:
+        bus = run_script(script)
+        print("{}: {} transfers, {} bytes, {:.3f} s bus time".format(
+            script, bus.transfers, bus.bytes, bus.bus_time), file=sys.stderr)
@@ -0,0 +1,301 @@
+# Copyright (c) 2022, Sensirion AG
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# # Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# # Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# # Neither the name of Sensirion AG nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+# (c) Copyright 2022 Sensirion AG, Switzerland
+
+# Batched SQLite storage of raw samples and aggregated windows
+#
+# Writing every sample on its own, e.g. print() redirected to a file on an
+# SD card, causes one small write per line. SqliteWriter collects samples in
+# memory and inserts them in one transaction per batch, when batch_size
+# samples are buffered or flush_interval seconds passed since the last
+# commit. The database runs in WAL mode: a commit appends the changed pages
+# to the write-ahead log, and readers, e.g. a dashboard, are not blocked.
+# A crash or power loss loses at most the samples buffered in memory and
+# the last commits, the database itself stays consistent.
+#
+# Samples are stored as raw words in one table per schema of
+# sensirion_records.py, with the primary key (timestamp, device) in a table
+# without rowid, so the rows are kept in time order and range queries need
+# no separate index. Windows of sensirion_aggregation.py go to the table
+# windows.
+#
+# Usage:
+#
+#   with SqliteWriter("samples.db") as writer:
+#       writer.add(SEN5X_FULL, 0, time.time(), sen5x.read_measured_values())
+#       aggregator.on_window = writer.add_window
+#
+#   for device, record in SqliteWriter.query("samples.db", SEN5X_FULL,
+#                                            start, end):
+#       print(record.pm2p5)
+
+import atexit
+import sqlite3
+import time
+from urllib.parse import quote
+
+WINDOWS_TABLE = "windows"
+
+# values of PRAGMA synchronous, which does not accept a bound parameter
+SYNCHRONOUS_MODES = ("OFF", "NORMAL", "FULL", "EXTRA")
+
+
+def table_name(schema):
+    """
+        Returns the table of a schema, e.g. sen5xfull for SEN5X_FULL.
+    """
+    return schema.name.lower()
+
+
+def _create_table(connection, schema):
+    columns = "".join(", {} INTEGER".format(name) for name in schema.names)
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS {} (timestamp REAL NOT NULL, "
+        "device INTEGER NOT NULL{}, PRIMARY KEY (timestamp, device)) "
+        "WITHOUT ROWID".format(table_name(schema), columns))
+
+
+def _create_windows_table(connection):
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS {} (metric TEXT NOT NULL, "
+        "length REAL NOT NULL, start REAL NOT NULL, count INTEGER, "
+        "min REAL, max REAL, mean REAL, percentile REAL, "
+        "PRIMARY KEY (start, metric, length)) WITHOUT ROWID".format(
+            WINDOWS_TABLE))
+
+
+class SqliteWriter(object):
+    """
+        Write-behind buffer in front of a SQLite database.
+        :param str path:
+            Database file, created if it does not exist.
+        :param int batch_size:
+            Number of buffered rows which triggers a commit. Every commit
+            writes whole pages to the log, small batches multiply the
+            bytes written, see benchmark_storage.py.
+        :param float flush_interval:
+            Seconds after the last commit which trigger a commit with the
+            next row, None to commit only full batches. The check runs in
+            add(), call flush() from a timer if the rows stop arriving.
+        :param str synchronous:
+            SQLite synchronous setting. "NORMAL" syncs the log only when it
+            is copied into the database (checkpoint); a power loss can undo
+            the last commits but never corrupts the database. "FULL" syncs
+            every commit. One of SYNCHRONOUS_MODES.
+        :param bool flush_at_exit:
+            Flush and close the database when the interpreter exits,
+            including after an unhandled exception or sys.exit().
+        :ivar int rows:
+            Number of committed rows.
+        :ivar int commits:
+            Number of committed batches.
+        :ivar float commit_time:
+            Seconds spent committing.
+        :raises ValueError:
+            If synchronous is not one of SYNCHRONOUS_MODES.
+    """
+
+    def __init__(self, path, batch_size=300, flush_interval=300.0,
+                 synchronous="NORMAL", flush_at_exit=True,
+                 clock=time.monotonic):
+        if synchronous not in SYNCHRONOUS_MODES:
+            raise ValueError("synchronous must be one of {}, not {!r}".format(
+                ", ".join(SYNCHRONOUS_MODES), synchronous))
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.clock = clock
+        self.connection = sqlite3.connect(path, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous={}".format(synchronous))
+        self._inserts = {}
+        self._buffers = {}
+        self._buffered = 0
+        self._last_commit = clock()
+        self.rows = 0
+        self.commits = 0
+        self.commit_time = 0.0
+        self._atexit = flush_at_exit
+        if flush_at_exit:
+            atexit.register(self.close)
+
+    def _check_open(self):
+        if self.connection is None:
+            raise ValueError("SqliteWriter is closed")
+
+    def _buffer(self, schema):
+        self._check_open()
+        buffer = self._buffers.get(schema.name)
+        if buffer is None:
+            _create_table(self.connection, schema)
+            self._inserts[schema.name] = \
+                "INSERT OR REPLACE INTO {} VALUES (?, ?{})".format(
+                    table_name(schema), ", ?" * schema.words)
+            buffer = self._buffers[schema.name] = []
+        return buffer
+
+    def _added(self):
+        self._buffered += 1
+        if self._buffered >= self.batch_size or (
+                self.flush_interval is not None and
+                self.clock() - self._last_commit >= self.flush_interval):
+            self.flush()
+
+    def add(self, schema, device, timestamp, words):
+        """
+            Buffers one sample.
+            :param schema:
+                Schema of sensirion_records.py, selects the table.
+            :param int device:
+                Id of the sensor.
+            :param words:
+                Raw words as returned by the driver, the schema selects the
+                stored ones.
+        """
+        first = schema.first_word
+        self._buffer(schema).append(
+            (timestamp, device) + tuple(words[first:first + schema.words]))
+        self._added()
+
+    def add_record(self, device, record):
+        """
+            Buffers a record of sensirion_records.py.
+        """
+        values = record.schema.struct.unpack(record)
+        self._buffer(record.schema).append((values[0], device) + values[1:])
+        self._added()
+
+    def add_window(self, summary):
+        """
+            Buffers a closed window of sensirion_aggregation.py, fits the
+            on_window parameter of RollingAggregator.
+        """
+        self._check_open()
+        buffer = self._buffers.get(WINDOWS_TABLE)
+        if buffer is None:
+            _create_windows_table(self.connection)
+            self._inserts[WINDOWS_TABLE] = \
+                "INSERT OR REPLACE INTO {} VALUES (?, ?, ?, ?, ?, ?, ?, ?)" \
+                .format(WINDOWS_TABLE)
+            buffer = self._buffers[WINDOWS_TABLE] = []
+        buffer.append((summary.metric, summary.length, summary.start,
+                       summary.count, summary.min, summary.max, summary.mean,
+                       summary.percentile))
+        self._added()
+
+    def flush(self):
+        """
+            Commits all buffered rows in one transaction.
+        """
+        start = self.clock()
+        if self._buffered:
+            connection = self.connection
+            connection.execute("BEGIN")
+            try:
+                for name, buffer in self._buffers.items():
+                    if buffer:
+                        connection.executemany(self._inserts[name], buffer)
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            for buffer in self._buffers.values():
+                del buffer[:]
+            self.rows += self._buffered
+            self.commits += 1
+            self._buffered = 0
+            self.commit_time += self.clock() - start
+        self._last_commit = start
+
+    def close(self):
+        """
+            Commits the buffered rows, copies the log into the database and
+            closes it. Called again it does nothing.
+        """
+        if self.connection is None:
+            return
+        self.flush()
+        self.connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self.connection.close()
+        self.connection = None
+        if self._atexit:
+            atexit.unregister(self.close)
+
+    def statistics(self):
+        return {
+            "rows": self.rows,
+            "commits": self.commits,
+            "buffered": self._buffered,
+            "commit_time": self.commit_time,
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @staticmethod
+    def query(path, schema, start=None, end=None, device=None):
+        """
+            Reads the samples of a schema in time order.
+            :param start:
+                First timestamp, inclusive, None for the oldest sample.
+            :param end:
+                Last timestamp, exclusive, None for the newest sample.
+            :param device:
+                Id of one sensor, None for all.
+            :return:
+                Generator of tuples (device, record).
+        """
+        conditions = []
+        parameters = []
+        if start is not None:
+            conditions.append("timestamp >= ?")
+            parameters.append(start)
+        if end is not None:
+            conditions.append("timestamp < ?")
+            parameters.append(end)
+        if device is not None:
+            conditions.append("device = ?")
+            parameters.append(device)
+        sql = "SELECT * FROM {}".format(table_name(schema))
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY timestamp"
+        pack = schema.struct.pack
+        # quoted, a "?" or "#" in the path would end it within the URI
+        connection = sqlite3.connect("file:{}?mode=ro".format(quote(path)),
+                                     uri=True)
+        try:
+            for row in connection.execute(sql, parameters):
+                yield row[1], schema.from_bytes(pack(row[0], *row[2:]))
+        finally:
+            connection.close()
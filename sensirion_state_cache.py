@@ -0,0 +1,204 @@
+# Copyright (c) 2022, Sensirion AG
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# # Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# # Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# # Neither the name of Sensirion AG nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+# (c) Copyright 2022 Sensirion AG, Switzerland
+
+# Cache of the known register values of SEN5x sensors
+#
+# The configuration examples read back every register right after writing
+# it, and the host never remembers the tuning, STAR mode or temperature
+# compensation of a sensor. StateCache keeps the last known values per
+# sensor, keyed by the serial number, and CachedSen5x serves register reads
+# from it. The cache of a sensor is invalidated when
+#
+# - the sensor is reset with 0xD304 through device_reset(),
+# - a power loss is detected: check_power_loss() reads back one register
+#   which the host changed from its default value, a power loss returns it
+#   to the default,
+# - the device status register (0xD206) changes, see check_status(),
+# - a transfer fails with an I/O error, the sensor may have rebooted.
+#
+# Usage:
+#
+#   cached = CachedSen5x(Sen5x(SMBus(1)))
+#   apply_profile(cached.sen5x, profile, cache=cached)
+#   apply_profile(cached.sen5x, profile, cache=cached)  # no bus transfers
+
+from sensirion_profile import SEN5X_REGISTERS, read_register, write_register
+
+
+class StateCache(object):
+    """
+        Register values of many sensors, keyed by serial number.
+        :ivar dict invalidations:
+            Number of invalidations by reason.
+    """
+
+    def __init__(self):
+        self._states = {}
+        self.invalidations = {}
+
+    def get(self, serial, register):
+        """
+            :return:
+                Copy of the cached field values, None if unknown.
+        """
+        values = self._states.get(serial, {}).get(register.code)
+        return None if values is None else dict(values)
+
+    def put(self, serial, register, values):
+        self._states.setdefault(serial, {})[register.code] = dict(values)
+
+    def known(self, serial):
+        """
+            :return:
+                List of (register, values) known for a sensor.
+        """
+        registers = dict((register.code, register)
+                         for register in SEN5X_REGISTERS.values())
+        return [(registers[code], dict(values))
+                for code, values in self._states.get(serial, {}).items()]
+
+    def invalidate(self, serial, reason):
+        self._states.pop(serial, None)
+        self.invalidations[reason] = self.invalidations.get(reason, 0) + 1
+
+
+class CachedSen5x(object):
+    """
+        Register access of one sensor through a StateCache.
+        :param sen5x:
+            Sen5x driver from sensirion_driver.py.
+        :param StateCache cache:
+            Shared cache, a private one is created if None.
+        :ivar int hits:
+            Register reads served from the cache.
+        :ivar int misses:
+            Register reads which went to the sensor.
+    """
+
+    def __init__(self, sen5x, cache=None):
+        self.sen5x = sen5x
+        self.cache = StateCache() if cache is None else cache
+        self._serial = None
+        self.status = None
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def serial(self):
+        """
+            Serial number of the sensor, read again after an invalidation
+            because the sensor may have been replaced.
+        """
+        if self._serial is None:
+            self._serial = self._call(self.sen5x.read_serial_number)
+        return self._serial
+
+    def _call(self, function, *args):
+        try:
+            return function(*args)
+        except OSError:
+            self.invalidate("io_error")
+            raise
+
+    def invalidate(self, reason):
+        if self._serial is not None:
+            self.cache.invalidate(self._serial, reason)
+        self._serial = None
+
+    def read_register(self, register, refresh=False):
+        """
+            Returns the field values of a register, from the cache if known.
+            :param register:
+                A Register of sensirion_profile.SEN5X_REGISTERS.
+            :param bool refresh:
+                Always read from the sensor and update the cache.
+        """
+        serial = self.serial
+        if not refresh:
+            values = self.cache.get(serial, register)
+            if values is not None:
+                self.hits += 1
+                return values
+        self.misses += 1
+        values = self._call(read_register, self.sen5x, register)
+        self.cache.put(serial, register, values)
+        return values
+
+    def write_register(self, register, values):
+        """
+            Writes a register and remembers the written values.
+        """
+        serial = self.serial
+        self._call(write_register, self.sen5x, register, values)
+        self.cache.put(serial, register, values)
+
+    def device_reset(self):
+        """
+            Resets the sensor and forgets its register values.
+        """
+        self._call(self.sen5x.device_reset)
+        self.invalidate("reset")
+
+    def check_status(self):
+        """
+            Reads the device status register, the cache is invalidated if it
+            changed since the last check.
+            :return:
+                The device status.
+        """
+        status = self._call(self.sen5x.read_device_status)
+        if self.status is not None and status != self.status:
+            self.invalidate("status")
+        self.status = status
+        return status
+
+    def check_power_loss(self):
+        """
+            Reads back the smallest cached register which differs from its
+            default value. If it changed, the sensor lost power or was
+            reset by someone else and the cache is invalidated. If all
+            cached values are defaults, a power loss does not make the
+            cache wrong and nothing is read.
+            :return:
+                True if a power loss was detected.
+        """
+        candidates = [(len(register.fields), register.code, register, values)
+                      for register, values in self.cache.known(self.serial)
+                      if register.defaults is not None and
+                      values != register.defaults]
+        if not candidates:
+            return False
+        size, code, register, values = min(candidates)
+        actual = self._call(read_register, self.sen5x, register)
+        if actual != values:
+            self.invalidate("power_loss")
+            return True
+        return False
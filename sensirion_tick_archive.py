@@ -0,0 +1,345 @@
+# Copyright (c) 2022, Sensirion AG
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# # Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# # Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# # Neither the name of Sensirion AG nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+# (c) Copyright 2022 Sensirion AG, Switzerland
+
+# Compressed archive of raw sensor words in time indexed chunks
+#
+# Meant for months of SEN5x raw values (0x03D2: raw humidity, raw
+# temperature, VOC and NOx ticks) at full rate. The samples are collected
+# in chunks of a fixed number of samples. In a chunk the timestamps (in
+# milliseconds) are stored as delta-of-delta and every word column as delta
+# to the previous sample, all zigzag encoded as variable length integers:
+# a sample period with a few milliseconds of jitter and slowly moving ticks
+# need one byte per value. The chunk payload is optionally compressed with
+# zlib on top.
+#
+# Each chunk starts with a header holding its time range, the file of
+# chunks is its own time index: read() seeks from header to header and
+# decodes only the chunks overlapping the requested range, so the
+# timestamps have to increase. Chunks are only appended; a chunk cut short
+# by a power loss is ignored and overwritten when writing continues.
+#
+# Usage:
+#
+#   with TickArchiveWriter("ticks.bin", SEN5X_RAW) as archive:
+#       archive.append(time.time(), sen5x.read_raw_values())
+#
+#   samples = TickArchive("ticks.bin").read(start, end)
+#   print(samples["voc_ticks"])
+
+import os
+import struct
+import zlib
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+
+from sensirion_records import SCHEMAS
+
+MAGIC = b"SNSRTCK1"
+# magic, schema name, flags
+FILE_HEADER = struct.Struct("<8s16sB7x")
+# magic, payload size, samples, first and last timestamp in ms, CRC-32
+CHUNK_HEADER = struct.Struct("<4sIIqqI")
+CHUNK_MAGIC = b"CHNK"
+FLAG_ZLIB = 0x01
+
+Chunk = namedtuple("Chunk", ("offset", "size", "count", "first", "last",
+                             "crc"))
+
+
+def _zigzag(value):
+    return (value << 1) ^ (value >> 63)
+
+
+def _append_varints(out, values):
+    for value in values:
+        while value >= 0x80:
+            out.append(value & 0x7F | 0x80)
+            value >>= 7
+        out.append(value)
+
+
+def encode_chunk(timestamps, columns):
+    """
+        Encodes one chunk.
+        :param timestamps:
+            Integer timestamps of the samples, in milliseconds.
+        :param columns:
+            One list of unsigned 16 bit words per field.
+        :return:
+            The bytes of the varint stream.
+    """
+    out = bytearray()
+    values = []
+    previous = timestamps[0]
+    previous_delta = 0
+    for timestamp in timestamps[1:]:
+        delta = timestamp - previous
+        values.append(_zigzag(delta - previous_delta))
+        previous = timestamp
+        previous_delta = delta
+    for column in columns:
+        previous = 0
+        for word in column:
+            values.append(_zigzag(word - previous))
+            previous = word
+    _append_varints(out, values)
+    return bytes(out)
+
+
+def decode_varints(data):
+    """
+        Decodes a stream of zigzag encoded varints with NumPy.
+        :return:
+            int64 array of the signed values.
+    """
+    import numpy as np
+    raw = np.frombuffer(data, dtype=np.uint8)
+    ends = np.flatnonzero(raw < 0x80)
+    starts = np.empty_like(ends)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+    # position of every byte within its varint
+    position = np.arange(raw.size) - np.repeat(starts, ends - starts + 1)
+    parts = (raw & 0x7F).astype(np.int64) << (7 * position)
+    # the 7 bit groups do not overlap, adding them combines them
+    values = np.add.reduceat(parts, starts)
+    return (values >> 1) ^ -(values & 1)
+
+
+def decode_chunk(data, count, first, schema):
+    """
+        Decodes the payload of a chunk into a structured array of
+        schema.dtype.
+    """
+    import numpy as np
+    values = decode_varints(data)
+    result = np.zeros(count, dtype=schema.dtype)
+    # delta-of-delta -> delta -> timestamp
+    timestamps = np.empty(count, dtype=np.int64)
+    timestamps[0] = first
+    np.cumsum(np.cumsum(values[:count - 1]), out=timestamps[1:])
+    timestamps[1:] += first
+    result["timestamp"] = timestamps / 1000.0
+    words = result.view(np.uint16).reshape(count, -1)[:, 4:]
+    columns = values[count - 1:].reshape(schema.words, count)
+    words[:] = np.cumsum(columns, axis=1).T
+    return result
+
+
+class TickArchiveWriter(object):
+    """
+        Appends samples to an archive file in compressed chunks.
+        :param str path:
+            Archive file, created if it does not exist, otherwise appended
+            to. The schema has to match the existing file.
+        :param schema:
+            Schema of sensirion_records.py, e.g. SEN5X_RAW.
+        :param int chunk_samples:
+            Samples per chunk. Samples of an unfinished chunk are kept in
+            memory until the chunk is full, flush() or close() is called.
+        :param bool compress:
+            Compress the chunk payload with zlib in addition.
+        :param bool sync:
+            fsync the file after every chunk.
+        :ivar int samples:
+            Number of samples written to the file.
+        :ivar int raw_bytes:
+            Size of these samples as timestamp (float64) and words.
+        :ivar int stored_bytes:
+            Bytes written for them, including the chunk headers.
+    """
+
+    def __init__(self, path, schema, chunk_samples=3600, compress=True,
+                 sync=True):
+        self.schema = schema
+        self.chunk_samples = chunk_samples
+        self.sync = sync
+        self._first = schema.first_word
+        self._last = schema.first_word + schema.words
+        self._timestamps = []
+        self._columns = [[] for _ in range(schema.words)]
+        self.samples = 0
+        self.raw_bytes = 0
+        self.stored_bytes = 0
+        flags = FLAG_ZLIB if compress else 0
+        if os.path.exists(path) and os.path.getsize(path):
+            # continue behind the last complete chunk
+            archive = TickArchive(path)
+            if archive.schema is not schema:
+                raise ValueError("{} holds {} samples, not {}".format(
+                    path, archive.schema.name, schema.name))
+            flags = archive.flags
+            self._file = open(path, "r+b")
+            self._file.truncate(archive.end)
+            self._file.seek(archive.end)
+        else:
+            self._file = open(path, "wb")
+            self._file.write(FILE_HEADER.pack(
+                MAGIC, schema.name.encode("ascii"), flags))
+        self.compress = bool(flags & FLAG_ZLIB)
+
+    def append(self, timestamp, words):
+        """
+            Buffers one sample.
+            :param float timestamp:
+                Seconds, e.g. time.time(), stored with 1 ms resolution.
+            :param words:
+                Raw words as returned by the driver.
+        """
+        self._timestamps.append(int(round(timestamp * 1000)))
+        words = words[self._first:self._last]
+        for i in range(len(self._columns)):
+            self._columns[i].append(words[i])
+        if len(self._timestamps) >= self.chunk_samples:
+            self.flush()
+
+    def flush(self):
+        """
+            Writes the buffered samples as a chunk, which may be shorter than
+            chunk_samples.
+        """
+        timestamps = self._timestamps
+        if not timestamps:
+            return
+        payload = encode_chunk(timestamps, self._columns)
+        if self.compress:
+            payload = zlib.compress(payload, 9)
+        self._file.write(CHUNK_HEADER.pack(
+            CHUNK_MAGIC, len(payload), len(timestamps), timestamps[0],
+            timestamps[-1], zlib.crc32(payload)))
+        self._file.write(payload)
+        self._file.flush()
+        if self.sync:
+            os.fsync(self._file.fileno())
+        self.samples += len(timestamps)
+        self.raw_bytes += len(timestamps) * self.schema.struct.size
+        self.stored_bytes += CHUNK_HEADER.size + len(payload)
+        self._timestamps = []
+        self._columns = [[] for _ in self._columns]
+
+    def close(self):
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class TickArchive(object):
+    """
+        Reads an archive written by TickArchiveWriter. Opening it reads the
+        chunk headers only.
+        :ivar schema:
+            Schema of the samples.
+        :ivar chunks:
+            List of Chunk in file order, which is time order.
+        :ivar int end:
+            Offset behind the last complete chunk.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            magic, name, self.flags = FILE_HEADER.unpack(
+                f.read(FILE_HEADER.size))
+            if magic != MAGIC:
+                raise ValueError("{} is not a tick archive".format(path))
+            self.schema = SCHEMAS[name.rstrip(b"\0").decode("ascii")]
+            self.chunks = []
+            offset = FILE_HEADER.size
+            size = os.path.getsize(path)
+            while offset + CHUNK_HEADER.size <= size:
+                f.seek(offset)
+                magic, length, count, first, last, crc = \
+                    CHUNK_HEADER.unpack(f.read(CHUNK_HEADER.size))
+                payload_offset = offset + CHUNK_HEADER.size
+                if magic != CHUNK_MAGIC or payload_offset + length > size:
+                    break
+                self.chunks.append(Chunk(payload_offset, length, count, first,
+                                         last, crc))
+                offset = payload_offset + length
+            self.end = offset
+        self._firsts = [chunk.first for chunk in self.chunks]
+        self._lasts = [chunk.last for chunk in self.chunks]
+
+    def __len__(self):
+        return sum(chunk.count for chunk in self.chunks)
+
+    def select(self, start=None, end=None):
+        """
+            Returns the chunks overlapping [start, end), in seconds.
+        """
+        first = 0
+        stop = len(self.chunks)
+        if start is not None:
+            first = bisect_left(self._lasts, int(round(start * 1000)))
+        if end is not None:
+            stop = bisect_right(self._firsts,
+                                int(round(end * 1000)) - 1)
+        return self.chunks[first:stop]
+
+    def read(self, start=None, end=None):
+        """
+            Decodes the samples in [start, end), in seconds.
+            :return:
+                Structured NumPy array of schema.dtype in time order.
+            :raises ValueError:
+                If a chunk fails its CRC check.
+        """
+        import numpy as np
+        parts = []
+        with open(self.path, "rb") as f:
+            for chunk in self.select(start, end):
+                f.seek(chunk.offset)
+                payload = f.read(chunk.size)
+                if zlib.crc32(payload) != chunk.crc:
+                    raise ValueError("chunk at {} is corrupted".format(
+                        chunk.offset))
+                if self.flags & FLAG_ZLIB:
+                    payload = zlib.decompress(payload)
+                parts.append(decode_chunk(payload, chunk.count, chunk.first,
+                                          self.schema))
+        if not parts:
+            return np.zeros(0, dtype=self.schema.dtype)
+        samples = np.concatenate(parts)
+        timestamps = samples["timestamp"]
+        if start is not None or end is not None:
+            low = 0 if start is None else \
+                np.searchsorted(timestamps, start, "left")
+            high = len(samples) if end is None else \
+                np.searchsorted(timestamps, end, "left")
+            samples = samples[low:high]
+        return samples
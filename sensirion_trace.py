@@ -0,0 +1,289 @@
+# Copyright (c) 2022, Sensirion AG
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# # Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# # Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# # Neither the name of Sensirion AG nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+# (c) Copyright 2022 Sensirion AG, Switzerland
+
+# Tracing of the write, wait and read phase of the driver commands
+#
+# Tracer.attach() wraps execute() of one driver instance and gives the
+# driver a bus and a sleep function which timestamp the three phases of
+# every command while it executes: sending the command, waiting for its
+# execution and reading the response. The driver's own execute() still does
+# the work, the tracer only observes it. The durations go into a histogram
+# per device, command code and phase, and optionally into a trace file in
+# the Chrome JSON format which chrome://tracing and https://ui.perfetto.dev
+# open. Drivers without a tracer run the plain execute() of the class, so
+# disabled tracing costs nothing. Commands sent by the schedulers directly
+# and parameter writes through write() are not traced.
+#
+# Usage:
+#
+#   tracer = Tracer("sen5x.trace.json")
+#   tracer.attach(sen5x)
+#   ...
+#   tracer.close()
+#   print(tracer.report())
+
+import json
+import math
+import os
+import time
+
+PHASES = ("write", "wait", "read")
+
+
+class PhaseHistogram(object):
+    """
+        Durations of one phase in logarithmic buckets, eight per octave:
+        bucket i > 0 holds durations up to 2**(i / 8) us, percentiles are
+        accurate to 9 %.
+    """
+
+    PER_OCTAVE = 8
+    BUCKETS = 24 * PER_OCTAVE + 1
+
+    def __init__(self):
+        self.counts = [0] * self.BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def observe(self, seconds):
+        us = seconds * 1e6
+        index = int(self.PER_OCTAVE * math.log2(us)) + 1 if us >= 1 else 0
+        self.counts[min(index, self.BUCKETS - 1)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, fraction):
+        """
+            :return:
+                Upper bound of the bucket holding the given fraction of the
+                durations, in seconds.
+        """
+        target = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= target:
+                return min(2 ** (index / self.PER_OCTAVE) * 1e-6, self.max)
+        return self.max
+
+    def statistics(self):
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "min": self.min if self.count else 0.0,
+            "max": self.max,
+            "p50": self.percentile(0.5),
+            "p99": self.percentile(0.99),
+        }
+
+
+class Tracer(object):
+    """
+        Collects the phase durations of the attached drivers.
+        :param str path:
+            Trace file in the Chrome JSON array format, no file if None.
+        :param clock:
+            Time source of the timestamps.
+        :ivar dict histograms:
+            (device name, command code, phase) -> PhaseHistogram
+        :ivar int errors:
+            Number of traced commands which raised an exception, e.g. an
+            OSError of a transfer or a CrcError of the response.
+    """
+
+    def __init__(self, path=None, clock=time.perf_counter):
+        self.clock = clock
+        self.histograms = {}
+        self.errors = 0
+        self._origin = clock()
+        self._file = None
+        self._separator = ""
+        if path is not None:
+            self._file = open(path, "w")
+            self._file.write("[")
+
+    def attach(self, device, name=None):
+        """
+            Traces the commands of a driver from sensirion_driver.py.
+            :param str name:
+                Device name in the histograms and the trace, class name and
+                address by default.
+        """
+        if name is None:
+            name = "{}@0x{:02X}".format(type(device).__name__, device.address)
+        bus = _TracedBus(device.bus, device.sleep, name, self)
+        execute = device.execute
+        # None if execute() is the method of the class, otherwise the
+        # wrapper of e.g. a RecoveryEngine attached before
+        bus.replaced_execute = device.__dict__.get("execute")
+
+        def traced_execute(command):
+            bus.command = command
+            try:
+                return execute(command)
+            except Exception:
+                self.errors += 1
+                raise
+            finally:
+                bus.command = None
+
+        # the instance attributes hide SensirionI2cDevice.execute() and
+        # the bus and sleep function given to the driver
+        bus.traced_execute = traced_execute
+        device.execute = traced_execute
+        device.bus = bus
+        device.sleep = bus.sleep
+
+    @staticmethod
+    def detach(device):
+        """
+            Restores the execute(), bus and sleep function which attach()
+            replaced.
+            :raises ValueError:
+                If another wrapper of execute(), e.g. of a RecoveryEngine,
+                was attached after the tracer. Removing the tracer would
+                remove that wrapper as well.
+        """
+        bus = device.bus
+        if not isinstance(bus, _TracedBus):
+            return
+        if device.__dict__.get("execute") is not bus.traced_execute:
+            raise ValueError("execute() of {} was wrapped after the tracer "
+                             "was attached".format(bus.name))
+        if bus.replaced_execute is None:
+            del device.execute
+        else:
+            device.execute = bus.replaced_execute
+        device.bus = bus.bus
+        device.sleep = bus.plain_sleep
+
+    def record(self, name, code, phase, start, end):
+        key = (name, code, phase)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = PhaseHistogram()
+            self.histograms[key] = histogram
+        histogram.observe(end - start)
+        if self._file is not None:
+            # complete events, timestamps in microseconds
+            self._file.write(self._separator + json.dumps({
+                "name": "{} {}".format(_code_name(code), phase),
+                "cat": phase, "ph": "X", "pid": os.getpid(), "tid": name,
+                "ts": round((start - self._origin) * 1e6, 3),
+                "dur": round((end - start) * 1e6, 3),
+                "args": {"code": _code_name(code)}}))
+            self._separator = ",\n"
+
+    def statistics(self):
+        """
+            :return:
+                Dictionary (device name, command code, phase) -> count,
+                mean, min, max, p50 and p99 in seconds.
+        """
+        return {key: histogram.statistics()
+                for key, histogram in self.histograms.items()}
+
+    def report(self):
+        """
+            :return:
+                The statistics as text table, durations in microseconds.
+        """
+        lines = ["device\tcommand\tphase\tcount\tmean\tp50\tp99\tmax"]
+        for (name, code, phase), values in sorted(
+                self.statistics().items(),
+                key=lambda item: (item[0][0], _code_name(item[0][1]),
+                                  PHASES.index(item[0][2]))):
+            lines.append("{}\t{}\t{}\t{}\t{:.1f}\t{:.1f}\t{:.1f}\t{:.1f}".format(
+                name, _code_name(code), phase, values["count"],
+                values["mean"] * 1e6, values["p50"] * 1e6,
+                values["p99"] * 1e6, values["max"] * 1e6))
+        return "\n".join(lines)
+
+    def close(self):
+        if self._file is not None:
+            self._file.write("]\n")
+            self._file.close()
+            self._file = None
+
+
+class _TracedBus(object):
+    """
+        Bus and sleep function of a traced driver, records the phases of the
+        command set by the traced execute() and passes everything else on.
+    """
+
+    def __init__(self, bus, sleep, name, tracer):
+        self.bus = bus
+        self.plain_sleep = sleep
+        self.name = name
+        self.tracer = tracer
+        self.command = None
+        self.traced_execute = None
+        self.replaced_execute = None
+
+    def i2c_rdwr(self, *i2c_msgs):
+        command = self.command
+        if command is None:
+            return self.bus.i2c_rdwr(*i2c_msgs)
+        phase = "write" if i2c_msgs[0] is command.write_msg else "read"
+        clock = self.tracer.clock
+        start = clock()
+        try:
+            return self.bus.i2c_rdwr(*i2c_msgs)
+        finally:
+            self.tracer.record(self.name, command.code, phase, start, clock())
+
+    def sleep(self, seconds):
+        command = self.command
+        if command is None:
+            return self.plain_sleep(seconds)
+        clock = self.tracer.clock
+        start = clock()
+        try:
+            return self.plain_sleep(seconds)
+        finally:
+            self.tracer.record(self.name, command.code, "wait", start,
+                               clock())
+
+    def __getattr__(self, name):
+        # close() and any other attribute of the wrapped bus
+        return getattr(self.bus, name)
+
+
+def _code_name(code):
+    # sensors read without command, e.g. LD20 in continuous mode
+    return "read" if code is None else "0x{:04X}".format(code)
@@ -0,0 +1,297 @@
+# Copyright (c) 2022, Sensirion AG
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# # Redistributions of source code must retain the above copyright notice, this
+#   list of conditions and the following disclaimer.
+#
+# # Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+#
+# # Neither the name of Sensirion AG nor the names of its
+#   contributors may be used to endorse or promote products derived from
+#   this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+# (c) Copyright 2022 Sensirion AG, Switzerland
+
+# Periodic background checkpointing of the SEN5x VOC algorithm state
+#
+# The VOC algorithm state (0x6181) can be read while the measurement keeps
+# running. VocCheckpointer reads it on a configurable interval in a
+# background thread and writes it atomically to a JSON file per sensor,
+# tagged with the serial number and a timestamp. After a power loss only
+# the learning since the last checkpoint is lost, see load_checkpoint().
+#
+# The driver is not thread safe: the measurement loop has to hold the lock
+# passed to the checkpointer while it talks to the sensor.
+#
+# At boot warm_restart() writes the latest checkpoint and the warm start
+# parameter (0x60C6) in one idle window, starts the measurement and reports
+# the time until the first valid VOC index. Measure that time on the
+# sensor itself, under sensirion_simulator.py it only repeats the assumed
+# voc_startup and restored_voc_startup of the simulated SEN55.
+#
+# Usage:
+#
+#   lock = threading.Lock()
+#   checkpointer = VocCheckpointer(sen5x, "voc_state", interval=600,
+#                                  lock=lock)
+#   checkpointer.start()
+#   while True:
+#       with lock:
+#           words = sen5x.read_measured_values()
+#   checkpointer.stop()
+#
+#   result = warm_restart(sen5x, "voc_state", warm_start=65535)
+#   print(result.time_to_valid_voc)
+
+import json
+import os
+import threading
+import time
+
+from sensirion_crc import CrcError
+from sensirion_profile import SEN5X_REGISTERS, write_register
+
+VOC_STATE_CODE = 0x6181
+VOC_STATE_WORDS = 4
+VOC_STATE_DELAY = 0.02
+
+
+def checkpoint_path(directory, serial):
+    return os.path.join(directory, "voc_state_{}.json".format(serial))
+
+
+def write_checkpoint(directory, serial, state, timestamp=None):
+    """
+        Writes a VOC algorithm state atomically: the file is written under a
+        temporary name, synced and then renamed, so a power loss leaves
+        either the previous or the new checkpoint.
+        :param state:
+            The 4 raw words of 0x6181.
+        :return:
+            Path of the checkpoint.
+    """
+    path = checkpoint_path(directory, serial)
+    record = {
+        "serial": serial,
+        "timestamp": time.time() if timestamp is None else timestamp,
+        "state": [int(word) for word in state],
+    }
+    temporary = path + ".tmp"
+    with open(temporary, "w") as f:
+        json.dump(record, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+    # make the rename itself durable
+    if hasattr(os, "O_DIRECTORY"):
+        fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    return path
+
+
+def load_checkpoint(directory, serial):
+    """
+        :return:
+            Dictionary with serial, timestamp and state, None if there is no
+            valid checkpoint for the sensor.
+    """
+    try:
+        with open(checkpoint_path(directory, serial)) as f:
+            record = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if record.get("serial") != serial or \
+            len(record.get("state", ())) != VOC_STATE_WORDS:
+        return None
+    return record
+
+
+def write_voc_state(sen5x, state):
+    """
+        Restores the VOC algorithm state, only possible in idle mode.
+    """
+    sen5x.write(VOC_STATE_CODE, state, VOC_STATE_DELAY)
+
+
+def read_voc_state(sen5x):
+    """
+        :return:
+            The 4 raw words of the VOC algorithm state as list.
+    """
+    return list(sen5x.read(VOC_STATE_CODE, VOC_STATE_WORDS, VOC_STATE_DELAY))
+
+
+class VocCheckpointer(object):
+    """
+        Background thread writing the VOC algorithm state of one sensor.
+        :param sen5x:
+            Sen5x driver from sensirion_driver.py.
+        :param str directory:
+            Directory of the checkpoint files, created if needed.
+        :param float interval:
+            Seconds between two checkpoints.
+        :param lock:
+            threading.Lock shared with all other users of the sensor.
+        :ivar int checkpoints:
+            Number of written checkpoints.
+        :ivar int errors:
+            Number of failed attempts, the next attempt follows after the
+            regular interval.
+    """
+
+    def __init__(self, sen5x, directory, interval=600.0, lock=None):
+        self.sen5x = sen5x
+        self.directory = directory
+        self.interval = interval
+        self.lock = threading.Lock() if lock is None else lock
+        self.serial = None
+        self.checkpoints = 0
+        self.errors = 0
+        self.last_checkpoint = None
+        self.last_error = None
+        self._stop = threading.Event()
+        self._thread = None
+        os.makedirs(directory, exist_ok=True)
+
+    def checkpoint(self):
+        """
+            Reads the state and writes it immediately.
+            :return:
+                Path of the checkpoint.
+        """
+        with self.lock:
+            if self.serial is None:
+                self.serial = self.sen5x.read_serial_number()
+            state = read_voc_state(self.sen5x)
+        path = write_checkpoint(self.directory, self.serial, state)
+        self.checkpoints += 1
+        self.last_checkpoint = time.time()
+        return path
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.checkpoint()
+            except (OSError, CrcError) as error:
+                self.errors += 1
+                self.last_error = error
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run,
+                                        name="voc-checkpoint", daemon=True)
+        self._thread.start()
+
+    def stop(self, final_checkpoint=True):
+        """
+            Stops the thread, by default after writing a last checkpoint.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if final_checkpoint:
+            self.checkpoint()
+
+
+class WarmRestartResult(object):
+    """
+        :ivar bool restored:
+            True if a checkpoint was written to the sensor.
+        :ivar checkpoint_age:
+            Age of the restored checkpoint in seconds, None if there was
+            none.
+        :ivar float idle_window:
+            Seconds from the first transfer until the measurement started.
+        :ivar time_to_valid_voc:
+            Seconds from the start of the measurement until the VOC index
+            was valid, None if it did not become valid before the timeout.
+        :ivar int polls:
+            Number of measured value reads until then.
+    """
+
+    def __init__(self):
+        self.serial = None
+        self.restored = False
+        self.checkpoint_age = None
+        self.idle_window = 0.0
+        self.time_to_valid_voc = None
+        self.polls = 0
+
+
+def warm_restart(sen5x, directory, warm_start=None, max_age=None,
+                 timeout=600.0, poll_interval=1.0, clock=time.monotonic,
+                 sleep=time.sleep):
+    """
+        Restores the VOC algorithm state and the warm start parameter of an
+        idle sensor and starts the measurement, without a fixed wait in
+        idle mode.
+        :param sen5x:
+            Sen5x driver from sensirion_driver.py.
+        :param str directory:
+            Directory of the VocCheckpointer files.
+        :param warm_start:
+            Raw value of the warm start parameter (0x60C6), not written if
+            None.
+        :param max_age:
+            Checkpoints older than this many seconds are ignored and the
+            sensor starts cold.
+        :param float timeout:
+            Seconds to wait for a valid VOC index, 0 returns right after the
+            start.
+        :param float poll_interval:
+            Seconds between two reads of the measured values.
+        :param clock:
+            Monotonic clock used for the timeout and the reported
+            durations.
+        :param sleep:
+            Waits between two reads, must let the time of clock pass, e.g.
+            VirtualClock.sleep with VirtualClock.monotonic.
+        :return:
+            WarmRestartResult
+    """
+    result = WarmRestartResult()
+    begin = clock()
+    result.serial = sen5x.read_serial_number()
+    checkpoint = load_checkpoint(directory, result.serial)
+    if checkpoint is not None:
+        age = time.time() - checkpoint["timestamp"]
+        if max_age is None or age <= max_age:
+            write_voc_state(sen5x, checkpoint["state"])
+            result.restored = True
+            result.checkpoint_age = age
+    if warm_start is not None:
+        write_register(sen5x, SEN5X_REGISTERS["warm_start"],
+                       {"parameter": warm_start})
+    sen5x.start_measurement()
+    started = clock()
+    result.idle_window = started - begin
+
+    while clock() - started < timeout:
+        sleep(poll_interval)
+        result.polls += 1
+        # the VOC index is 0x7FFF until the algorithm has started up
+        if sen5x.read_measured_values()[6] != 0x7FFF:
+            result.time_to_valid_voc = clock() - started
+            break
+    return result